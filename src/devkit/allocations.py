@@ -0,0 +1,378 @@
+"""Find out what the frame loop allocates.
+
+On MicroPython every allocation brings the next garbage collection
+closer, so the per-frame path should allocate as little as possible.
+`AllocationTracker` wraps a `FrameTicker`'s `tick` method and uses
+`tracemalloc` to attribute every allocation made during a tick to
+the source line that made it, including short-lived objects like
+generators and float temporaries that are freed before the tick
+returns.
+
+A line execution that allocates is counted as one allocation, however
+many objects it makes.  CPython keeps free lists of some objects,
+which hide their allocations from `tracemalloc`.  By default, free
+floats are used up before every line, so float temporaries do show
+up; with `floats=False` the free list is filled up instead, so they
+don't.  Tuples are only seen when they hold newly-made objects.
+
+By default only code in the `target` package is traced.  Allocations
+made by code elsewhere, for example the emulator, are not counted,
+since on the device that code is written in C.
+
+How much tracing itself allocates, where generators resume, and how
+big the float free list is are all details of CPython 3.11, so the
+tracker refuses to run on anything else rather than report wrong
+numbers.
+"""
+import platform
+import sys
+import tracemalloc
+
+from argparse import ArgumentParser
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from dis import get_instructions
+from inspect import CO_ASYNC_GENERATOR, CO_COROUTINE, CO_GENERATOR
+from io import StringIO
+from linecache import getline
+from statistics import fmean
+from types import CodeType, FrameType
+from typing import Any, Optional, TextIO
+from weakref import WeakSet
+
+from .instrument import shorten, wrap_tick
+
+import target
+
+LineKey = tuple[str, int]
+TraceFunction = Callable[[FrameType, str, Any], Any]
+
+TARGET_PATHS = tuple(target.__path__)
+
+_RESUMABLE = CO_GENERATOR | CO_COROUTINE | CO_ASYNC_GENERATOR
+
+SUPPORTED = (sys.implementation.name == "cpython"
+             and sys.version_info[:2] == (3, 11))
+
+
+@dataclass
+class LineStats:
+    count: int = 0
+    size: int = 0
+
+
+@dataclass(frozen=True)
+class TickStats:
+    count: int
+    size: int
+
+
+class AllocationTracker:
+    def __init__(
+            self,
+            ticker: Any = None,
+            *,
+            paths: Iterable[str] = TARGET_PATHS,
+            floats: bool = True,
+            warmup: int = 10,
+    ) -> None:
+        if not SUPPORTED:
+            raise RuntimeError(
+                "allocation tracking needs CPython 3.11, not"
+                f" {platform.python_implementation()}"
+                f" {platform.python_version()}")
+        self.ticker = ticker
+        self.paths = tuple(paths)
+        self.floats = floats
+        self.warmup = warmup
+
+        self.lines: dict[LineKey, LineStats] = {}
+        self.ticks: list[TickStats] = []
+
+        self._unwrap: Optional[Callable[[], None]] = None
+        self._old_trace: Any = None
+        self._frame: Optional[FrameType] = None
+        self._started_tracemalloc = False
+
+        self._key: Optional[LineKey] = None
+        self._stack: list[Optional[LineKey]] = []
+        self._untraced_depth = 0
+        self._base = 0
+        self._returned: Optional[FrameType] = None
+        self._held_floats: Optional[list[float]] = None
+        self._tick_count = 0
+        self._tick_size = 0
+
+        # bound once, so returning them from trace functions
+        # doesn't allocate while allocations are being counted
+        self._trace_call: TraceFunction = self._on_call
+        self._trace_traced: TraceFunction = self._on_traced_event
+        self._trace_untraced: TraceFunction = self._on_untraced_event
+
+    def install(self) -> None:
+        """Start tracking every call of `self.ticker.tick`, which is
+        wrapped with `wrap_tick`.
+        """
+        if self._unwrap is not None:
+            raise RuntimeError("already installed")
+        self._unwrap = wrap_tick(self.ticker, self.track)
+
+    def uninstall(self) -> None:
+        if self._unwrap is None:
+            return
+        self._unwrap()
+        self._unwrap = None
+
+    def __enter__(self) -> "AllocationTracker":
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.uninstall()
+
+    @property
+    def steady_ticks(self) -> list[TickStats]:
+        """Ticks after the first `warmup`."""
+        return self.ticks[self.warmup:]
+
+    @property
+    def allocations_per_tick(self) -> float:
+        """Mean steady-state allocations per tick."""
+        return fmean(t.count for t in self.steady_ticks or [TickStats(0, 0)])
+
+    def track(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Call `func`, tracking its allocations as one tick."""
+        self.start()
+        try:
+            return func(*args)
+        finally:
+            self.stop()
+
+    def start(self, frame: Optional[FrameType] = None) -> None:
+        """Start tracking a tick.  If `frame` is given, its lines
+        from the next one on are tracked too, whatever its filename.
+        """
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+        self._old_trace = sys.gettrace()
+        self._stack.clear()
+        self._untraced_depth = 0
+        self._tick_count = self._tick_size = 0
+        self._key = None  # counting starts at the next line
+        self._frame = frame
+        if frame is not None:
+            frame.f_trace = self._trace_traced
+        self._restart()
+        sys.settrace(self._trace_call)
+
+    def stop(self) -> None:
+        """Stop tracking the tick started by `start`."""
+        sys.settrace(self._old_trace)
+        if self._frame is not None:
+            self._frame.f_trace = None
+            self._frame = None
+        # if an untraced function is stopping us, what it allocated
+        # doesn't count
+        self._record(count=not self._untraced_depth)
+        self._returned = None
+        self._held_floats = None
+        self.ticks.append(TickStats(self._tick_count, self._tick_size))
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def _wants(self, filename: str) -> bool:
+        return filename.startswith(self.paths)
+
+    def _on_call(self, frame: FrameType, event: str, arg: Any) -> Any:
+        if self._untraced_depth:
+            self._untraced_depth += 1
+            frame.f_trace_lines = False
+            return self._trace_untraced
+
+        # Tracing makes CPython allocate frame objects it otherwise
+        # wouldn't, and line number tables, just before calling us;
+        # don't count them.
+        peak = tracemalloc.get_traced_memory()[1]
+        code = frame.f_code
+        if _is_first_call(frame):
+            peak -= sys.getsizeof(frame)
+        if code not in _traced_code:
+            peak -= _line_array_size(code)
+            _traced_code.add(code)
+        self._record(peak)
+        del peak
+
+        if not self._wants(code.co_filename):
+            self._untraced_depth = 1
+            frame.f_trace_lines = False
+            return self._trace_untraced
+
+        # CPython's tracing machinery allocates a little between
+        # the call and the first line, so don't count until then
+        self._stack.append(self._key)
+        self._key = None
+        self._restart()
+        return self._trace_traced
+
+    def _on_traced_event(self, frame: FrameType, event: str, arg: Any) -> Any:
+        self._record()
+        if event == "line":
+            self._key = (frame.f_code.co_filename, frame.f_lineno)
+        elif event == "return":
+            self._key = self._stack.pop() if self._stack else None
+            self._returned = frame  # freed in _record, not mid-line
+        self._restart()
+        return self._trace_traced
+
+    def _on_untraced_event(self, frame: FrameType, event: str, arg: Any) -> Any:
+        if event == "return":
+            self._untraced_depth -= 1
+            if not self._untraced_depth:
+                self._returned = frame
+                self._record(count=False)
+                self._restart()
+        return self._trace_untraced
+
+    def _record(self, peak: Optional[int] = None, count: bool = True) -> None:
+        if peak is None:
+            peak = tracemalloc.get_traced_memory()[1]
+        size = peak - self._base
+        self._returned = None
+        if not count or size <= 0 or (key := self._key) is None:
+            return
+        stats = self.lines.get(key)
+        if stats is None:
+            stats = self.lines[key] = LineStats()
+        stats.count += 1
+        stats.size += size
+        self._tick_count += 1
+        self._tick_size += size
+
+    def _restart(self) -> None:
+        # Holding on to more floats than CPython keeps free means
+        # the next line must allocate any floats it makes.  Letting
+        # go of them means it won't need to.
+        self._held_floats = None
+        floats = [i + 0.5 for i in range(128)]
+        if self.floats:
+            self._held_floats = floats
+        del floats
+        self._base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def report(self, file: TextIO = sys.stdout, limit: int = 20) -> None:
+        """Print the lines that allocate the most."""
+        steady = self.steady_ticks
+        num_ticks = len(steady) or 1
+        print(f"{len(steady)} ticks after {self.warmup} warmup,"
+              f" {self.allocations_per_tick:.1f} allocations per tick,"
+              f" {fmean(t.size for t in steady or [TickStats(0, 0)]):.0f}"
+              " bytes per tick", file=file)
+        if not steady:
+            return
+
+        # the line stats include the warmup, so scale accordingly
+        scale = num_ticks / len(self.ticks)
+        lines = sorted(self.lines.items(), key=lambda item: -item[1].count)
+        for (filename, lineno), stats in lines[:limit]:
+            source = getline(filename, lineno).strip()
+            where = f"{shorten(filename)}:{lineno}"
+            print(f"{stats.count * scale / num_ticks:8.2f}"
+                  f" {stats.size * scale / num_ticks:8.0f}B"
+                  f"  {where:24} {source}", file=file)
+
+
+def assert_allocates_at_most(
+        ticker: Any,
+        max_allocations: int,
+        *,
+        ticks: int = 100,
+        delta_t: float = 1 / 60,
+        **kwargs: Any,
+) -> AllocationTracker:
+    """Tick `ticker` and assert no steady-state tick runs more than
+    `max_allocations` allocating lines, each of which may make any
+    number of objects.  Extra arguments are passed on to
+    `AllocationTracker`.
+    """
+    tracker = AllocationTracker(ticker, **kwargs)
+    with tracker:
+        for _ in range(tracker.warmup + ticks):
+            ticker.tick(delta_t)
+    worst = max(t.count for t in tracker.steady_ticks)
+    if worst > max_allocations:
+        report = StringIO()
+        tracker.report(report)
+        raise AssertionError(
+            f"tick ran {worst} allocating lines (max {max_allocations}):\n"
+            + report.getvalue())
+    return tracker
+
+
+_first_resumes: dict[CodeType, int] = {}
+_traced_code: "WeakSet[CodeType]" = WeakSet()
+
+
+def _is_first_call(frame: FrameType) -> bool:
+    """Is this the first time `frame` is being entered?"""
+    code = frame.f_code
+    if not code.co_flags & _RESUMABLE:
+        return True
+    if (first_resume := _first_resumes.get(code)) is None:
+        first_resume = _first_resumes[code] = next(
+            i.offset for i in get_instructions(code) if i.opname == "RESUME")
+    return frame.f_lasti <= first_resume
+
+
+def _line_array_size(code: CodeType) -> int:
+    """How much CPython 3.11 allocates for `code` the first time it's
+    traced.  This is a guess if something else traced it first.
+    """
+    max_line = max((line for _, _, line in code.co_lines() if line), default=0)
+    return len(code.co_code) * (2 if max_line < 1 << 15 else 4) // 2
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    import random
+
+    from target.engine import PicoScroll
+    from target.pong import Game
+
+    from .headless import PicoScroll as HeadlessPicoScroll
+    from .sim.bots import DOWN, UP, TrackingBot
+    from .sim.farm import PLAYER_BUTTONS, insert_coin
+
+    parser = ArgumentParser(
+        description="Report what a headless game of Pong allocates.")
+    parser.add_argument(
+        "-n", "--ticks", type=int, default=600,
+        help="ticks to play for (default: %(default)s)")
+    parser.add_argument(
+        "--no-floats", action="store_false", dest="floats",
+        help="don't count float temporaries")
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="random seed (default: %(default)s)")
+    opts = parser.parse_args(args)
+
+    random.seed(opts.seed)
+    scroll = HeadlessPicoScroll()
+    game = Game(PicoScroll(scroll), max_framerate=None)
+    bots = [TrackingBot(random.Random(opts.seed)) for _ in game.players]
+    delta_t = 1 / 60
+    insert_coin(game, scroll, delta_t)
+
+    with AllocationTracker(game, floats=opts.floats) as tracker:
+        for _ in range(opts.ticks):
+            for bot, player, (up, down) in zip(
+                    bots, game.players, PLAYER_BUTTONS):
+                move = bot.move(player, game.ball)
+                scroll.press(up, move == UP)
+                scroll.press(down, move == DOWN)
+            game.tick(delta_t)
+    tracker.report()
+
+
+if __name__ == "__main__":
+    main()
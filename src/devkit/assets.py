@@ -0,0 +1,283 @@
+"""Compile a directory of images into a module of packed bitmaps.
+
+Each PNG in the directory becomes a constant named after the file,
+in capitals, of a kind chosen by the rest of its name:
+
+ - `name.png` is a 1-bit bitmap, one byte per column with the top
+   row in the least significant bit, as `show_bitmap_1d` expects.
+   Pixels at least half as bright as white are set.
+ - `name.grey.png` is an 8-bit greyscale frame, one byte per pixel
+   indexed as `y * width + x`, as `set_pixels` expects.
+ - `name.WxH.png` or `name.grey.WxH.png` is a sprite sheet of W×H
+   frames, left to right then top to bottom, and becomes a tuple.
+ - `.rle` before the size, or before `.png` if there isn't one, packs
+   the columns run-length compressed, in the format `RLEBitmap` in the
+   device code decodes.  These are for images that are too big to keep
+   in memory whole, like long messages to scroll.
+
+The generated module records a hash of each image it was compiled
+from, and images that haven't changed since are copied from it
+rather than compiled again.
+"""
+import hashlib
+import os
+import re
+import sys
+
+from argparse import ArgumentParser
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from PIL import Image
+
+FORMAT = 1  # bump to recompile everything
+
+HEADER = "# Generated by devkit.assets from {}; do not edit.\n"
+
+_FILENAME_RE = re.compile(
+    r"^(?P<name>[A-Za-z_][A-Za-z0-9_]*)"
+    r"(?P<grey>\.grey)?"
+    r"(?P<rle>\.rle)?"
+    r"(?:\.(?P<w>\d+)x(?P<h>\d+))?"
+    r"\.png$")
+_ASSET_RE = re.compile(r"^# (?P<filename>\S+) sha256=(?P<hash>[0-9a-f]+)\n", re.M)
+
+Pixels = npt.NDArray[np.uint8]
+
+
+class AssetError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Asset:
+    filename: str
+    name: str
+    grey: bool = False
+    frame_size: Optional[tuple[int, int]] = None
+    rle: bool = False
+
+    @classmethod
+    def from_filename(cls, filename: str) -> Optional["Asset"]:
+        if (match := _FILENAME_RE.match(filename)) is None:
+            return None
+        frame_size = None
+        if match["w"]:
+            frame_size = int(match["w"]), int(match["h"])
+        return cls(filename, match["name"].upper(), bool(match["grey"]),
+                   frame_size, bool(match["rle"]))
+
+
+@dataclass
+class Report:
+    compiled: list[str] = field(default_factory=list)
+    reused: list[str] = field(default_factory=list)
+
+
+def pack_columns(pixels: Pixels) -> bytes:
+    """Pack a greyscale image, at most 8 rows high, into one byte per
+    column, top row in the least significant bit.
+    """
+    height = pixels.shape[0]
+    if height > 8:
+        raise AssetError(f"1-bit bitmaps can't be {height} rows high")
+    bits = (pixels >= 128).astype(np.uint8)
+    weights = np.left_shift(1, np.arange(height, dtype=np.uint8))
+    return bytes((bits * weights[:, np.newaxis]).sum(axis=0, dtype=np.uint8))
+
+
+def pack_rle(pixels: Pixels, grey: bool = False) -> bytes:
+    """Pack a greyscale image into run-length compressed columns, as
+    1-bit columns like `pack_columns`, or if `grey` is true as 8-bit
+    ones, a byte per row, top-down.
+    """
+    height, width = pixels.shape
+    if height > 0xff:
+        raise AssetError(f"RLE bitmaps can't be {height} rows high")
+    if width > 0xffff:
+        raise AssetError(f"RLE bitmaps can't be {width} columns wide")
+    if grey:
+        stream = pixels.T.tobytes()
+    else:
+        stream = pack_columns(pixels)
+    header = bytes((int(grey), height, width & 0xff, width >> 8))
+    return header + packbits(stream)
+
+
+def packbits(data: bytes) -> bytes:
+    """Compress `data` into packets, each a control byte `n` then
+    either `n + 1` literal bytes, if `n` is less than 128, or one byte
+    repeated `n - 125` times.
+    """
+    result = bytearray()
+    literal = bytearray()
+
+    def flush() -> None:
+        for i in range(0, len(literal), 128):
+            chunk = literal[i:i + 128]
+            result.append(len(chunk) - 1)
+            result.extend(chunk)
+        literal.clear()
+
+    i = 0
+    while i < len(data):
+        run = 1
+        while i + run < len(data) and run < 130 and data[i + run] == data[i]:
+            run += 1
+        if run < 3:
+            literal.extend(data[i:i + run])
+        else:
+            flush()
+            result.extend((run + 125, data[i]))
+        i += run
+    flush()
+    return bytes(result)
+
+
+def split_frames(pixels: Pixels, width: int, height: int) -> Iterator[Pixels]:
+    rows, cols = pixels.shape
+    if rows % height or cols % width:
+        raise AssetError(f"{cols}x{rows} isn't a whole number of"
+                         f" {width}x{height} frames")
+    for y in range(0, rows, height):
+        for x in range(0, cols, width):
+            yield pixels[y:y + height, x:x + width]
+
+
+def compile_asset(asset: Asset, path: str) -> str:
+    """Return the Python source defining `asset`, compiled from the
+    image at `path`.
+    """
+    with Image.open(path) as image:
+        pixels: Pixels = np.asarray(image.convert("L"))
+
+    def pack(pixels: Pixels) -> bytes:
+        if asset.rle:
+            return pack_rle(pixels, asset.grey)
+        if asset.grey:
+            return pixels.tobytes()
+        return pack_columns(pixels)
+
+    if asset.frame_size is None:
+        return f"{asset.name} = {format_bytes(pack(pixels))}\n"
+    frames = "".join(
+        f"    {format_bytes(pack(frame), indent=4)},\n"
+        for frame in split_frames(pixels, *asset.frame_size))
+    return f"{asset.name} = (\n{frames})\n"
+
+
+def format_bytes(data: bytes, indent: int = 0, width: int = 17) -> str:
+    """Format `data` as a bytes literal, split every `width` bytes,
+    which is a row of a Pico Scroll Pack frame by default.
+    """
+    if len(data) <= width:
+        return _bytes_literal(data)
+    lines = [_bytes_literal(data[i:i + width])
+             for i in range(0, len(data), width)]
+    sep = "\n" + " " * (indent + 4)
+    return f"({sep}{sep.join(lines)}\n{' ' * indent})"
+
+
+def _bytes_literal(data: bytes) -> str:
+    chars = []
+    for byte in data:
+        char = chr(byte)
+        if byte < 32 or byte > 126 or char in '"\\':
+            char = f"\\x{byte:02x}"
+        chars.append(char)
+    return f'b"{"".join(chars)}"'
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256(f"{FORMAT}\n".encode())
+    with open(path, "rb") as fp:
+        digest.update(fp.read())
+    return digest.hexdigest()[:16]
+
+
+def previous_assets(output: str) -> dict[tuple[str, str], str]:
+    """Return the definitions in a module this generated earlier,
+    keyed by the filename and hash they were compiled from.
+    """
+    try:
+        with open(output) as fp:
+            source = fp.read()
+    except FileNotFoundError:
+        return {}
+    matches = list(_ASSET_RE.finditer(source))
+    result = {}
+    for match, next_match in zip(matches, matches[1:] + [None]):
+        end = len(source) if next_match is None else next_match.start()
+        definition = source[match.end():end].rstrip("\n") + "\n"
+        result[(match["filename"], match["hash"])] = definition
+    return result
+
+
+def compile_assets(src_dir: str, output: str) -> Report:
+    """Compile the images in `src_dir` into the module `output`."""
+    assets = []
+    for filename in sorted(os.listdir(src_dir)):
+        if not filename.endswith(".png"):
+            continue
+        if (asset := Asset.from_filename(filename)) is None:
+            raise AssetError(f"{filename}: can't make a name from this")
+        assets.append(asset)
+
+    names: dict[str, str] = {}
+    for asset in assets:
+        other = names.setdefault(asset.name, asset.filename)
+        if other != asset.filename:
+            raise AssetError(f"{other} and {asset.filename} are both {asset.name}")
+
+    previous = previous_assets(output)
+    report = Report()
+    chunks = [HEADER.format(src_dir)]
+    for asset in assets:
+        path = os.path.join(src_dir, asset.filename)
+        digest = hash_file(path)
+        definition = previous.get((asset.filename, digest))
+        if definition is None:
+            try:
+                definition = compile_asset(asset, path)
+            except AssetError as e:
+                raise AssetError(f"{asset.filename}: {e}") from None
+            report.compiled.append(asset.filename)
+        else:
+            report.reused.append(asset.filename)
+        chunks.append(f"\n# {asset.filename} sha256={digest}\n{definition}")
+
+    source = "".join(chunks)
+    tmp = f"{output}.tmp"
+    with open(tmp, "w") as fp:
+        fp.write(source)
+    os.replace(tmp, output)
+    return report
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "src_dir", metavar="DIR",
+        help="the directory of images to compile")
+    parser.add_argument(
+        "-o", "--output", metavar="FILE", required=True,
+        help="the module to write")
+    opts = parser.parse_args(args)
+
+    try:
+        report = compile_assets(opts.src_dir, opts.output)
+    except AssetError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"wrote {opts.output}: {len(report.compiled)} compiled,"
+          f" {len(report.reused)} unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Choose which PicoScroll provider the device code gets.
+
+On the device, `picoscroll.PicoScroll` is Pimoroni's driver.  On the
+host it's `PicoScroll` here, which makes an instance of the selected
+backend the first time one is needed, so that importing the device
+code doesn't import, for example, pygame.  The backend is the one
+passed to `select`, or else the one named by the `DEVKIT_BACKEND`
+environment variable, or else pygame.
+"""
+import os
+
+from collections.abc import Callable
+from importlib import import_module
+from typing import Any, Optional, Union
+
+from .stubs.pimoroni.picoscroll import PicoScroll as _PicoScroll
+
+ENV_VAR = "DEVKIT_BACKEND"
+DEFAULT = "pygame"
+
+Factory = Callable[..., Any]
+
+# name -> factory, or "module:attr" to import when first used
+BACKENDS: dict[str, Union[str, Factory]] = {
+    "headless": "devkit.headless:PicoScroll",
+    "pygame": "devkit.pygame:PicoScroll",
+    "pygame-threaded": "devkit.pygame:ThreadedPicoScroll",
+    "recording": "devkit.headless:RecordingPicoScroll",
+}
+
+_selected: Optional[str] = None
+
+
+def register(name: str, factory: Union[str, Factory]) -> None:
+    """Add a backend, or replace one.  `factory` is a callable that
+    returns a provider, or a "module:attr" string naming one.
+    """
+    BACKENDS[name] = factory
+
+
+def select(name: Optional[str]) -> None:
+    """Use backend `name`, or go back to the default if `None`."""
+    global _selected
+    if name is not None and name not in BACKENDS:
+        raise ValueError(_unknown(name))
+    _selected = name
+
+
+def selected() -> str:
+    """Return the name of the backend that will be used."""
+    return _selected or os.environ.get(ENV_VAR) or DEFAULT
+
+
+def load(name: Optional[str] = None) -> Factory:
+    """Return the factory for backend `name`, importing it if need be.
+    The default is the selected backend.
+    """
+    name = name or selected()
+    if (factory := BACKENDS.get(name)) is None:
+        raise ValueError(_unknown(name))
+    if isinstance(factory, str):
+        module_name, attr = factory.split(":")
+        factory = BACKENDS[name] = getattr(import_module(module_name), attr)
+    return factory
+
+
+def _unknown(name: str) -> str:
+    return f"unknown backend {name!r} (choose from {', '.join(sorted(BACKENDS))})"
+
+
+class PicoScroll(_PicoScroll):
+    """Stands in for the selected backend's PicoScroll class: making
+    one of these makes one of those.
+    """
+    def __new__(cls, *args: Any, **kwargs: Any) -> Any:
+        return load()(*args, **kwargs)
@@ -0,0 +1,294 @@
+"""Measure the cost of the per-frame hot path.
+
+Each benchmark times many calls of one operation, several times
+over, with the garbage collector off, and keeps the fastest run.
+Results are reported both in nanoseconds per call and as a fraction
+of a 60 fps frame, and may be saved as JSON and compared with a
+previously saved baseline.
+"""
+import gc
+import json
+import os
+import platform
+import random
+import sys
+
+from argparse import ArgumentParser
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from statistics import median
+from time import perf_counter_ns
+from typing import Any, Optional
+
+from target.engine import Display, PicoScroll, RateLimiter
+from target.pong import COUNTDOWN, INSERT_COIN, PLAYER_SCORED, RUNNING, Game
+
+from .headless import PicoScroll as HeadlessPicoScroll
+from .sim.farm import insert_coin
+
+FRAME_RATE = 60
+FRAME_BUDGET_NS = 1_000_000_000 / FRAME_RATE
+
+DELTA_T = 1 / FRAME_RATE
+
+Setup = Callable[[], Callable[[], object]]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Setup  # returns the operation to time
+    calls: int  # calls per run
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    ns: float  # per call, fastest run
+    median_ns: float  # per call, median run
+
+    @property
+    def budget_fraction(self) -> float:
+        return self.ns / FRAME_BUDGET_NS
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(name: str, calls: int = 1000) -> Callable[[Setup], Setup]:
+    def decorator(setup: Setup) -> Setup:
+        BENCHMARKS.append(Benchmark(name, setup, calls))
+        return setup
+    return decorator
+
+
+def measure(bench: Benchmark, repeat: int = 5, scale: float = 1) -> Result:
+    """Time `bench`, scaling its number of calls by `scale`."""
+    calls = max(1, round(bench.calls * scale))
+    runs = []
+    for _ in range(repeat):
+        func = bench.setup()
+        func()  # warm up
+        gc.collect()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start_ns = perf_counter_ns()
+            for _ in range(calls):
+                func()
+            runs.append((perf_counter_ns() - start_ns) / calls)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    return Result(bench.name, min(runs), median(runs))
+
+
+def compare(
+        results: Iterable[Result],
+        baseline: dict[str, Any],
+        threshold: float,
+) -> list[str]:
+    """Return a message for every result more than `threshold` times
+    slower than its baseline.
+    """
+    regressions = []
+    baseline_results = baseline["results"]
+    for result in results:
+        if (base := baseline_results.get(result.name)) is None:
+            continue
+        limit = base["ns"] * (1 + threshold)
+        if result.ns > limit:
+            regressions.append(
+                f"{result.name}: {result.ns:.0f}ns > {limit:.0f}ns"
+                f" ({result.ns / base['ns'] - 1:+.0%})")
+    return regressions
+
+
+def to_json(results: Iterable[Result]) -> dict[str, Any]:
+    return {
+        "python": platform.python_implementation(),
+        "python_version": platform.python_version(),
+        "machine": platform.machine(),
+        "frame_budget_ns": FRAME_BUDGET_NS,
+        "results": {
+            result.name: {
+                "ns": result.ns,
+                "median_ns": result.median_ns,
+                "budget_fraction": result.budget_fraction,
+            }
+            for result in results
+        },
+    }
+
+
+# Benchmarks
+
+def _headless_game(state: object) -> Game:
+    random.seed(0)
+    scroll = HeadlessPicoScroll()
+    game = Game(PicoScroll(scroll), max_framerate=None)
+    if state is not INSERT_COIN:
+        insert_coin(game, scroll, DELTA_T)
+        while game.state is not state:
+            game.tick(DELTA_T)
+    if state is RUNNING:
+        game.ball.reset()
+    return game
+
+
+def _tick_in(
+        state: object,
+        restart: Callable[[Game], object],
+) -> Callable[[], object]:
+    """Tick a game in `state`, calling `restart` to put it back into
+    that state whenever it leaves it, so every tick timed is one of
+    that state's however many calls are made.
+    """
+    game = _headless_game(state)
+
+    def tick() -> None:
+        game.tick(DELTA_T)
+        if game.state is not state:
+            restart(game)
+    return tick
+
+
+@benchmark("display.set_pixel", calls=10_000)
+def _set_pixel() -> Callable[[], object]:
+    display = Display(HeadlessPicoScroll(), gamma=3)
+    return lambda: display.set_pixel(8, 3, 170.5)
+
+
+@benchmark("game.tick[insert_coin]")
+def _tick_insert_coin() -> Callable[[], object]:
+    return _tick_in(INSERT_COIN, Game.reset)
+
+
+@benchmark("game.tick[countdown]")
+def _tick_countdown() -> Callable[[], object]:
+    return _tick_in(COUNTDOWN, Game.start_countdown)
+
+
+@benchmark("game.tick[running]")
+def _tick_running() -> Callable[[], object]:
+    return _tick_in(RUNNING, Game.serve)
+
+
+@benchmark("game.tick[player_scored]")
+def _tick_player_scored() -> Callable[[], object]:
+    game = _headless_game(PLAYER_SCORED)
+    return lambda: game.tick(DELTA_T)
+
+
+@benchmark("rate_limiter.wait_us[unlimited]", calls=10_000)
+def _wait_us_unlimited() -> Callable[[], object]:
+    wait_us: Callable[[], object] = RateLimiter().wait_us
+    return wait_us
+
+
+@benchmark("rate_limiter.wait_us[limited]", calls=10_000)
+def _wait_us_limited() -> Callable[[], object]:
+    # a 1us interval, which is checked on every call
+    wait_us: Callable[[], object] = RateLimiter(1e6).wait_us
+    return wait_us
+
+
+def _emulator() -> Any:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    from .pygame import PicoScroll as EmulatedPicoScroll
+    return EmulatedPicoScroll()
+
+
+@benchmark("emulator.show", calls=100)
+def _emulator_show() -> Callable[[], object]:
+    # alternates between two frames that differ at every LED, since
+    # the emulator only redraws the LEDs that changed
+    scroll = _emulator()
+    frame = bytearray(i * 2 % 256 for i in range(scroll.WIDTH * scroll.HEIGHT))
+    frames = [frame, frame.translate(bytes(range(255, -1, -1)))]
+    calls = 0
+
+    def show() -> None:
+        nonlocal calls
+        scroll.set_pixels(frames[calls & 1])
+        scroll.show()
+        calls += 1
+    return show
+
+
+@benchmark("emulator.show[unchanged]", calls=100)
+def _emulator_show_unchanged() -> Callable[[], object]:
+    scroll = _emulator()
+    for i in range(scroll.WIDTH * scroll.HEIGHT):
+        scroll.set_pixel(i % scroll.WIDTH, i // scroll.WIDTH, i * 2)
+    show: Callable[[], object] = scroll.show
+    return show
+
+
+@benchmark("emulator.show_bitmap_1d", calls=100)
+def _emulator_show_bitmap_1d() -> Callable[[], object]:
+    scroll = _emulator()
+    bitmap = bytearray(range(128))
+    return lambda: scroll.show_bitmap_1d(bitmap, 255, 42)
+
+
+# Command line
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "-k", "--filter", default="",
+        help="only run benchmarks whose names contain this")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=5,
+        help="runs per benchmark (default: %(default)s)")
+    parser.add_argument(
+        "--scale", type=float, default=1,
+        help="multiply the calls per run by this (default: %(default)s)")
+    parser.add_argument(
+        "-o", "--output", metavar="PATH",
+        help="write the results to this JSON file")
+    parser.add_argument(
+        "-b", "--baseline", metavar="PATH",
+        help="compare the results with this JSON file")
+    parser.add_argument(
+        "-t", "--threshold", type=float, default=0.2,
+        help="fail if anything is this much slower than the baseline"
+        " (default: %(default)s)")
+    opts = parser.parse_args(args)
+
+    benchmarks = [b for b in BENCHMARKS if opts.filter in b.name]
+    if "pygame" not in sys.modules:
+        try:
+            import pygame  # noqa: F401
+        except ImportError:  # pragma: no cover
+            print("pygame not installed, skipping emulator benchmarks")
+            benchmarks = [b for b in benchmarks
+                          if not b.name.startswith("emulator.")]
+
+    results = []
+    width = max((len(b.name) for b in benchmarks), default=0)
+    for bench in benchmarks:
+        result = measure(bench, opts.repeat, opts.scale)
+        results.append(result)
+        print(f"{result.name:{width}}  {result.ns:12,.0f}ns"
+              f"  {result.budget_fraction:8.3%} of a frame")
+
+    if opts.output:
+        with open(opts.output, "w") as fp:
+            json.dump(to_json(results), fp, indent=2)
+            print(file=fp)
+
+    if not opts.baseline:
+        return 0
+    with open(opts.baseline) as fp:
+        baseline = json.load(fp)
+    regressions = compare(results, baseline, opts.threshold)
+    for message in regressions:
+        print(f"regression: {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+"""Combine the device code into one module, ready to deploy.
+
+The device imports its code from source at boot, compiling every
+module it finds into RAM.  `bundle` starts from an entry module in
+the `target` package, follows its imports of other `target` modules,
+and joins them all into a single module, dependencies first, with
+the cross-module imports removed.  Along the way it strips
+docstrings and asserts, and rewrites integer module-level constants
+to use MicroPython's `const()`.  If `mpy-cross` is available, the
+bundle is also precompiled to `.mpy`, so the device needn't compile
+anything at all.
+
+Imports of modules that aren't in `target`, for example `utime` or
+`picoscroll`, are left for the device to resolve.
+"""
+import ast
+import os
+import shutil
+import subprocess
+import sys
+
+from argparse import ArgumentParser
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from time import perf_counter_ns
+from typing import Optional
+
+import target
+
+TARGET_PATHS = tuple(target.__path__)
+
+MARCH = "armv6m"  # the Pico's Cortex-M0+, for @micropython.native
+
+HEADER = "# Generated by devkit.bundle from {}; do not edit.\n"
+
+
+class BundleError(Exception):
+    pass
+
+
+@dataclass
+class Module:
+    name: str
+    path: str
+    source: str
+
+    @property
+    def tree(self) -> ast.Module:
+        return ast.parse(self.source, self.path)
+
+
+@dataclass(frozen=True)
+class Report:
+    modules: tuple[str, ...]
+    source_bytes: int  # unbundled
+    source_compile_ns: int  # unbundled, on this host
+    bundle_bytes: int
+    bundle_compile_ns: int  # on this host
+    mpy_bytes: Optional[int] = None
+
+
+def find_module(name: str, paths: Iterable[str] = TARGET_PATHS) -> Optional[str]:
+    """Return the path of module `name` if it's one of ours."""
+    if name.startswith("target."):
+        name = name[len("target."):]
+    if "." in name:
+        return None
+    for dirname in paths:
+        path = os.path.join(dirname, f"{name}.py")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def find_modules(
+        entry: str,
+        paths: Iterable[str] = TARGET_PATHS,
+) -> list[Module]:
+    """Return `entry` and every module of ours it imports, each after
+    the modules it depends on.
+    """
+    paths = tuple(paths)
+    result: list[Module] = []
+    visiting: set[str] = set()
+    visited: set[str] = set()
+
+    def visit(name: str, importer: Optional[str]) -> None:
+        if name in visited:
+            return
+        if name in visiting:
+            raise BundleError(f"circular import of {name} from {importer}")
+        if (path := find_module(name, paths)) is None:
+            raise BundleError(f"no module named {name}")
+        visiting.add(name)
+        with open(path) as fp:
+            module = Module(name, path, fp.read())
+        for dependency in _imported_modules(module.tree, paths):
+            visit(dependency, name)
+        visiting.remove(name)
+        visited.add(name)
+        result.append(module)
+
+    visit(_short_name(entry), None)
+    return result
+
+
+def bundle(entry: str, paths: Iterable[str] = TARGET_PATHS) -> str:
+    """Return the source of a module combining `entry` and everything
+    of ours it imports.
+    """
+    paths = tuple(paths)
+    modules = find_modules(entry, paths)
+    definitions: dict[str, tuple[str, Optional[str]]] = {}
+    body: list[ast.stmt] = []
+    for module in modules:
+        tree = _Stripper().visit(module.tree)
+        is_entry = module is modules[-1]
+        for stmt in _inline_imports(tree, paths, is_entry):
+            _check_definitions(stmt, module.name, definitions)
+            body.append(stmt)
+
+    tree = ast.Module(body=body, type_ignores=[])
+    if rewrite_consts(tree):
+        tree.body.insert(0, ast.ImportFrom(
+            module="micropython",
+            names=[ast.alias(name="const")],
+            level=0))
+    names = ", ".join(module.name for module in modules)
+    return HEADER.format(names) + ast.unparse(tree) + "\n"
+
+
+def rewrite_consts(tree: ast.Module) -> bool:
+    """Wrap integer module-level constants in `const()`.  Only names
+    that are assigned exactly once, and never declared `global`, are
+    rewritten.  Return whether anything was.
+    """
+    assignments: dict[str, int] = {}
+    for stmt in tree.body:
+        for name in _assigned_names(stmt):
+            assignments[name] = assignments.get(name, 0) + 1
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Global):
+            for name in node.names:
+                assignments[name] = 2
+
+    rewrote = False
+    for stmt in tree.body:
+        if not (isinstance(stmt, ast.Assign)
+                and len(stmt.targets) == 1
+                and isinstance(lhs := stmt.targets[0], ast.Name)
+                and assignments[lhs.id] == 1):
+            continue
+        try:
+            value = ast.literal_eval(stmt.value)
+        except ValueError:
+            continue
+        if type(value) is not int:
+            continue
+        stmt.value = ast.Call(
+            func=ast.Name(id="const", ctx=ast.Load()),
+            args=[ast.Constant(value)],
+            keywords=[])
+        rewrote = True
+    return rewrote
+
+
+def build(
+        entry: str,
+        output_dir: str,
+        paths: Iterable[str] = TARGET_PATHS,
+        mpy_cross: Optional[str] = None,
+        march: str = MARCH,
+) -> Report:
+    """Write the bundle for `entry` into `output_dir`, precompiling
+    it with `mpy_cross` if given, and report on the result.
+    """
+    paths = tuple(paths)
+    modules = find_modules(entry, paths)
+    source = bundle(entry, paths)
+
+    os.makedirs(output_dir, exist_ok=True)
+    name = modules[-1].name
+    bundle_path = os.path.join(output_dir, f"{name}.py")
+    with open(bundle_path, "w") as fp:
+        fp.write(source)
+
+    mpy_bytes = None
+    if mpy_cross:
+        mpy_path = os.path.join(output_dir, f"{name}.mpy")
+        result = subprocess.run(
+            [mpy_cross, f"-march={march}", "-o", mpy_path, bundle_path],
+            capture_output=True, text=True)
+        if result.returncode:
+            raise BundleError(f"{mpy_cross} failed: {result.stderr.strip()}")
+        mpy_bytes = os.path.getsize(mpy_path)
+
+    return Report(
+        modules=tuple(module.name for module in modules),
+        source_bytes=sum(len(module.source.encode()) for module in modules),
+        source_compile_ns=sum(
+            _compile_ns(module.source, module.path) for module in modules),
+        bundle_bytes=len(source.encode()),
+        bundle_compile_ns=_compile_ns(source, bundle_path),
+        mpy_bytes=mpy_bytes,
+    )
+
+
+class _Stripper(ast.NodeTransformer):
+    """Remove docstrings and asserts."""
+
+    def visit_Assert(self, node: ast.Assert) -> None:
+        return None
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        node = super().generic_visit(node)
+        if isinstance(node, (ast.Module, ast.ClassDef,
+                             ast.FunctionDef, ast.AsyncFunctionDef)):
+            if ast.get_docstring(node, clean=False) is not None:
+                del node.body[0]
+        body = getattr(node, "body", None)
+        if body == [] and not isinstance(node, ast.Module):
+            body.append(ast.Pass())
+        return node
+
+
+def _short_name(name: str) -> str:
+    return name[len("target."):] if name.startswith("target.") else name
+
+
+def _imported_modules(tree: ast.Module, paths: Sequence[str]) -> list[str]:
+    result = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            if node.level:
+                raise BundleError("relative imports aren't supported")
+            if node.module and find_module(node.module, paths):
+                result.append(_short_name(node.module))
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if find_module(alias.name, paths):
+                    raise BundleError(
+                        f"use 'from {alias.name} import ...'"
+                        f" instead of 'import {alias.name}'")
+    return result
+
+
+def _inline_imports(
+        tree: ast.Module,
+        paths: Sequence[str],
+        is_entry: bool,
+) -> list[ast.stmt]:
+    """Replace imports of our modules with assignments where needed,
+    and drop `if __name__ == "__main__":` from all but the entry.
+    """
+    result: list[ast.stmt] = []
+    for stmt in tree.body:
+        if _is_main_check(stmt) and not is_entry:
+            continue
+        if not (isinstance(stmt, ast.ImportFrom)
+                and stmt.module
+                and find_module(stmt.module, paths)):
+            result.append(stmt)
+            continue
+        for alias in stmt.names:
+            if alias.asname and alias.asname != alias.name:
+                result.append(ast.copy_location(ast.Assign(
+                    targets=[ast.Name(id=alias.asname, ctx=ast.Store())],
+                    value=ast.Name(id=alias.name, ctx=ast.Load())), stmt))
+
+    for node in ast.walk(ast.Module(body=result, type_ignores=[])):
+        if (isinstance(node, ast.ImportFrom)
+                and node.module
+                and find_module(node.module, paths)):
+            raise BundleError(
+                f"imports of {node.module} must be at module level")
+    return result
+
+
+def _is_main_check(stmt: ast.stmt) -> bool:
+    if not isinstance(stmt, ast.If):
+        return False
+    test = stmt.test
+    return (isinstance(test, ast.Compare)
+            and isinstance(test.left, ast.Name)
+            and test.left.id == "__name__"
+            and len(test.comparators) == 1
+            and isinstance(value := test.comparators[0], ast.Constant)
+            and value.value == "__main__")
+
+
+def _assigned_names(stmt: ast.stmt) -> list[str]:
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [stmt.name]
+    if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+        return [(alias.asname or alias.name).split(".")[0]
+                for alias in stmt.names]
+    if isinstance(stmt, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+        targets = stmt.targets if isinstance(stmt, ast.Assign) \
+            else [stmt.target]
+        return [node.id
+                for target in targets
+                for node in ast.walk(target)
+                if isinstance(node, ast.Name)]
+    return []
+
+
+def _check_definitions(
+        stmt: ast.stmt,
+        module: str,
+        definitions: dict[str, tuple[str, Optional[str]]],
+) -> None:
+    """Raise `BundleError` if `stmt` redefines a name that another
+    module defined.  Importing the same thing twice is fine.
+    """
+    imported: dict[str, str] = {}
+    if isinstance(stmt, ast.Import):
+        for alias in stmt.names:
+            imported[(alias.asname or alias.name).split(".")[0]] = alias.name
+    elif isinstance(stmt, ast.ImportFrom):
+        for alias in stmt.names:
+            imported[alias.asname or alias.name] = f"{stmt.module}.{alias.name}"
+
+    for name in _assigned_names(stmt):
+        what = imported.get(name)
+        if (seen := definitions.get(name)) is None:
+            definitions[name] = (module, what)
+            continue
+        seen_module, seen_what = seen
+        if seen_module != module and (what is None or what != seen_what):
+            raise BundleError(
+                f"{name} is defined in both {seen_module} and {module}")
+
+
+def _compile_ns(source: str, filename: str, repeat: int = 5) -> int:
+    """Return the fastest of `repeat` compiles of `source`."""
+    times = []
+    for _ in range(repeat):
+        start_ns = perf_counter_ns()
+        compile(source, filename, "exec", dont_inherit=True)
+        times.append(perf_counter_ns() - start_ns)
+    return min(times)
+
+
+# Command line
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "entry", nargs="?", default="pong",
+        help="the module to bundle (default: %(default)s)")
+    parser.add_argument(
+        "-o", "--output", metavar="DIR", default="build",
+        help="where to write the bundle (default: %(default)s)")
+    parser.add_argument(
+        "--mpy-cross", metavar="PATH", default=shutil.which("mpy-cross"),
+        help="precompile with this (default: %(default)s)")
+    parser.add_argument(
+        "--no-mpy", action="store_const", const=None, dest="mpy_cross",
+        help="don't precompile the bundle")
+    parser.add_argument(
+        "--march", default=MARCH,
+        help="architecture for native code (default: %(default)s)")
+    opts = parser.parse_args(args)
+
+    try:
+        report = build(opts.entry, opts.output,
+                       mpy_cross=opts.mpy_cross, march=opts.march)
+    except BundleError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    def line(label: str, size: int, compile_ns: Optional[int]) -> None:
+        compile_ms = "none" if compile_ns is None \
+            else f"{compile_ns / 1e6:.2f}ms"
+        print(f"{label:24} {size:8,} bytes  compile: {compile_ms}")
+
+    print(f"bundled {', '.join(report.modules)} into {opts.output}")
+    line(f"unbundled ({len(report.modules)} modules)",
+         report.source_bytes, report.source_compile_ns)
+    line("bundled", report.bundle_bytes, report.bundle_compile_ns)
+    if report.mpy_bytes is not None:
+        line("precompiled", report.mpy_bytes, None)
+    print("(compile times are for this host)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
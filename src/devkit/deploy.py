@@ -0,0 +1,285 @@
+"""Copy the device code to a board, sending only what's changed.
+
+The device imports the modules in `target` by their short names, so
+`target/engine.py` is deployed as `engine.py`, or as `engine.mpy` if
+it's precompiled with `mpy-cross`.  Other files, like a module of
+compiled assets, can be deployed alongside them.
+
+A manifest on the device records a hash of every file deployed.
+Files whose hash matches are skipped, and files the manifest lists
+that are no longer being deployed are removed.  The manifest is
+written last, so an interrupted deploy is finished by the next one.
+
+The device's filesystem is reached through a transport: the board
+itself with `mpremote`, or a local directory standing in for it.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from argparse import ArgumentParser
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+
+from .bundle import MARCH, TARGET_PATHS
+
+MANIFEST = "devkit-manifest.json"
+
+FORMAT = 1  # of the manifest
+
+DEFAULT_DESTINATION = "mpremote"
+
+
+class DeployError(Exception):
+    pass
+
+
+class Transport(Protocol):
+    """Access to the files in the root of the device's filesystem."""
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Return the contents of file `name`, or None if there isn't
+        one.
+        """
+
+    def write(self, name: str, data: bytes) -> None:
+        """Create or replace file `name`."""
+
+    def remove(self, name: str) -> None:
+        """Remove file `name`, if there is one."""
+
+
+class DirectoryTransport:
+    """A local directory, standing in for the device's filesystem."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def read(self, name: str) -> Optional[bytes]:
+        try:
+            with open(self._path(name), "rb") as fp:
+                return fp.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name: str, data: bytes) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._path(name), "wb") as fp:
+            fp.write(data)
+
+    def remove(self, name: str) -> None:
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+
+class MpremoteTransport:
+    """A board connected to this host, reached with `mpremote`."""
+
+    def __init__(self, device: Optional[str] = None, mpremote: str = "mpremote"):
+        self.command = [mpremote]
+        if device:
+            self.command += ["connect", device]
+
+    def read(self, name: str) -> Optional[bytes]:
+        result = self._run("fs", "cat", f":{name}", check=False)
+        if result.returncode:
+            return None
+        return result.stdout
+
+    def write(self, name: str, data: bytes) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, name)
+            with open(path, "wb") as fp:
+                fp.write(data)
+            self._run("fs", "cp", path, f":{name}")
+
+    def remove(self, name: str) -> None:
+        self._run("fs", "rm", f":{name}", check=False)
+
+    def _run(
+            self,
+            *args: str,
+            check: bool = True,
+    ) -> "subprocess.CompletedProcess[bytes]":
+        try:
+            result = subprocess.run(self.command + list(args),
+                                    capture_output=True)
+        except FileNotFoundError:
+            raise DeployError(f"{self.command[0]} not found") from None
+        if check and result.returncode:
+            stderr = result.stderr.decode(errors="replace").strip()
+            raise DeployError(f"{' '.join(args)} failed: {stderr}")
+        return result
+
+
+def open_transport(destination: str) -> Transport:
+    """Return the transport for `destination`, which is "mpremote",
+    optionally followed by a colon and a device, like "mpremote:a0",
+    or the path of a directory.
+    """
+    if destination == "mpremote":
+        return MpremoteTransport()
+    if destination.startswith("mpremote:"):
+        return MpremoteTransport(destination[len("mpremote:"):])
+    return DirectoryTransport(destination)
+
+
+@dataclass
+class Report:
+    sent: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    bytes_sent: int = 0
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def target_modules(paths: Iterable[str] = TARGET_PATHS) -> list[str]:
+    """Return the paths of the modules in `target`."""
+    result = []
+    for dirname in paths:
+        for filename in sorted(os.listdir(dirname)):
+            if filename.endswith(".py") and filename != "__init__.py":
+                result.append(os.path.join(dirname, filename))
+    return result
+
+
+def compile_file(
+        path: str,
+        mpy_cross: Optional[str] = None,
+        march: str = MARCH,
+) -> tuple[str, bytes]:
+    """Return the name `path` is deployed as and its contents, which
+    are precompiled with `mpy_cross` if that's given and it's a module.
+    """
+    name = os.path.basename(path)
+    if not mpy_cross or not name.endswith(".py"):
+        with open(path, "rb") as fp:
+            return name, fp.read()
+
+    name = name[:-len(".py")] + ".mpy"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mpy_path = os.path.join(tmpdir, name)
+        result = subprocess.run(
+            [mpy_cross, f"-march={march}", "-o", mpy_path, path],
+            capture_output=True, text=True)
+        if result.returncode:
+            raise DeployError(f"{mpy_cross} failed: {result.stderr.strip()}")
+        with open(mpy_path, "rb") as fp:
+            return name, fp.read()
+
+
+def read_manifest(transport: Transport) -> dict[str, str]:
+    """Return the hashes of the files on the device, by name, or
+    nothing if there's no usable manifest.
+    """
+    data = transport.read(MANIFEST)
+    if data is None:
+        return {}
+    try:
+        manifest = json.loads(data)
+    except ValueError:
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("format") != FORMAT:
+        return {}
+    files = manifest.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def deploy(
+        transport: Transport,
+        paths: Iterable[str],
+        mpy_cross: Optional[str] = None,
+        march: str = MARCH,
+        force: bool = False,
+) -> Report:
+    """Send the files at `paths` to the device, precompiling modules
+    with `mpy_cross` if given, and skipping any the device's manifest
+    says it has already, unless `force` is true.
+    """
+    files: dict[str, bytes] = {}
+    for path in paths:
+        name, data = compile_file(path, mpy_cross, march)
+        if name == MANIFEST or name in files:
+            raise DeployError(f"{path}: there's already a file named {name}")
+        files[name] = data
+
+    deployed = read_manifest(transport)
+    hashes = {name: hash_bytes(data) for name, data in files.items()}
+    report = Report()
+    for name, data in files.items():
+        if not force and deployed.get(name) == hashes[name]:
+            report.unchanged.append(name)
+            continue
+        transport.write(name, data)
+        report.sent.append(name)
+        report.bytes_sent += len(data)
+
+    for name in sorted(deployed.keys() - files.keys()):
+        transport.remove(name)
+        report.removed.append(name)
+
+    if report.sent or report.removed or force:
+        manifest = {"format": FORMAT, "files": dict(sorted(hashes.items()))}
+        transport.write(MANIFEST, json.dumps(manifest, indent=1).encode())
+    return report
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "destination", nargs="?", default=DEFAULT_DESTINATION,
+        help="mpremote, mpremote:DEVICE, or a directory standing in"
+        " for the board (default: %(default)s)")
+    parser.add_argument(
+        "-i", "--include", metavar="FILE", action="append", default=[],
+        help="deploy this file too, for example an assets module")
+    parser.add_argument(
+        "--mpy-cross", metavar="PATH", default=shutil.which("mpy-cross"),
+        help="precompile modules with this (default: %(default)s)")
+    parser.add_argument(
+        "--no-mpy", action="store_const", const=None, dest="mpy_cross",
+        help="deploy modules as source")
+    parser.add_argument(
+        "--march", default=MARCH,
+        help="architecture for native code (default: %(default)s)")
+    parser.add_argument(
+        "-f", "--force", action="store_true",
+        help="send every file, whatever the manifest says")
+    opts = parser.parse_args(args)
+
+    try:
+        report = deploy(
+            open_transport(opts.destination),
+            target_modules() + opts.include,
+            mpy_cross=opts.mpy_cross,
+            march=opts.march,
+            force=opts.force,
+        )
+    except (DeployError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    for name in report.sent:
+        print(f"sent {name}")
+    for name in report.removed:
+        print(f"removed {name}")
+    print(f"{len(report.sent)} sent ({report.bytes_sent:,} bytes),"
+          f" {len(report.unchanged)} unchanged, {len(report.removed)} removed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+from .picoscroll import PicoScroll, RecordingPicoScroll
+
+__all__ = [
+    "PicoScroll",
+    "RecordingPicoScroll",
+]
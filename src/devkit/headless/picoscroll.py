@@ -0,0 +1,97 @@
+from collections import deque
+from collections.abc import Container
+from typing import Optional
+
+from ..stubs.micropython import machine
+from ..stubs.pimoroni.picoscroll import PicoScroll as _PicoScroll
+
+from target.engine import BUTTON_PINS
+
+
+class PicoScroll(_PicoScroll):
+    """A Pico Scroll Pack with no window, whose buttons are pressed
+    by calling `press()`.
+    """
+    def __init__(self) -> None:
+        w, h = self._get_size()
+
+        self._num_pixels = w * h
+        self._fb = bytearray()
+
+        self._is_pressed = [False] * 4
+        for pin in BUTTON_PINS:
+            machine.drive(pin, 1)
+
+        self.clear()
+
+    def _get_size(self) -> tuple[int, int]:
+        return self.get_width(), self.get_height()
+
+    def clear(self) -> None:
+        self._fb = bytearray(self._num_pixels)
+
+    def set_pixel(self, x: int, y: int, level: int) -> None:
+        width, height = self._get_size()
+
+        _raise_unless_valid_int(x, "x", range(width))
+        _raise_unless_valid_int(y, "y", range(height))
+        _raise_unless_valid_int(level, "level", range(256))
+
+        self._fb[y * width + x] = level
+
+    def set_pixels(self, image: bytearray) -> None:
+        try:
+            pixels = memoryview(image)
+        except TypeError:
+            raise TypeError("object with buffer protocol required") from None
+        if len(pixels) < self._num_pixels:
+            raise ValueError("image too small")
+        self._fb[:] = pixels[:self._num_pixels]
+
+    def show_bitmap_1d(self, bitmap: bytearray, level: int, offset: int) -> None:
+        if not isinstance(bitmap, bytearray):
+            raise TypeError("object with buffer protocol required")
+
+        columns = range(len(bitmap))
+        width, height = self._get_size()
+        for x in range(width):
+            if (i := offset + x) in columns:
+                col = bitmap[i]
+            else:
+                col = 0
+            for y in range(height):
+                self.set_pixel(x, y, level if col & 1 else 0)
+                col >>= 1
+
+    def show(self) -> None:
+        pass
+
+    def is_pressed(self, button: int) -> bool:
+        return self._is_pressed[button]
+
+    def press(self, button: int, is_pressed: bool = True) -> None:
+        self._is_pressed[button] = is_pressed
+        machine.drive(BUTTON_PINS[button], not is_pressed)
+
+
+class RecordingPicoScroll(PicoScroll):
+    """A headless Pico Scroll Pack that keeps a copy of every frame
+    shown, or of the last `max_frames` if that's given.
+    """
+    def __init__(self, max_frames: Optional[int] = None) -> None:
+        super().__init__()
+        self.frames: deque[bytes] = deque(maxlen=max_frames)
+
+    def show(self) -> None:
+        self.frames.append(bytes(self._fb))
+
+
+def _raise_unless_valid_int(
+        value: int,
+        name: str,
+        valid_values: Container[int],
+) -> None:
+    if not isinstance(value, int):
+        raise TypeError(f"{name}={value}")
+    if value not in valid_values:
+        raise ValueError(f"{name}={value}")
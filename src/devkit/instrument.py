@@ -0,0 +1,55 @@
+"""Helpers for the tools that watch a game as it runs.
+
+`wrap_tick` routes a `FrameTicker`'s `tick` calls through a wrapper,
+which is how the allocation tracker, the profiler and the reloader
+see each frame, and `shorten` makes the filenames they report
+relative to `sys.path`.
+"""
+import sys
+
+from collections.abc import Callable
+from typing import Any
+
+Tick = Callable[[Any, float], None]
+
+
+def wrap_tick(
+        ticker: Any,
+        wrapper: Callable[[Tick, Any, float], None],
+) -> Callable[[], None]:
+    """Make every call of `ticker.tick(delta_t)` call `wrapper(tick,
+    ticker, delta_t)` instead, where `tick` is the unbound method it
+    replaces.  The method is wrapped on the ticker's class, since
+    tickers with `__slots__` can't have it replaced on the instance,
+    and calls on other instances of the class go straight through.
+    Returns a function that puts the original method back.
+    """
+    cls = type(ticker)
+    tick = cls.tick
+    tick_was_inherited = "tick" not in cls.__dict__
+
+    def wrapped_tick(instance: Any, delta_t: float) -> None:
+        if instance is ticker:
+            wrapper(tick, instance, delta_t)
+        else:
+            tick(instance, delta_t)
+
+    def unwrap() -> None:
+        if tick_was_inherited:
+            del cls.tick
+        else:
+            cls.tick = tick
+
+    cls.tick = wrapped_tick
+    return unwrap
+
+
+def shorten(filename: str) -> str:
+    """Return `filename` relative to the longest `sys.path` entry it's
+    under, or as it is if it's under none of them.
+    """
+    prefixes = [prefix for prefix in sys.path
+                if prefix and filename.startswith(prefix)]
+    if not prefixes:
+        return filename
+    return filename[len(max(prefixes, key=len)):].lstrip("/")
@@ -0,0 +1,54 @@
+"""Play Pong on the host, optionally profiling it or reloading it
+as its code changes.
+"""
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from typing import Optional
+
+from target.pong import Game
+
+from . import backends
+from .profiler import DEFAULT_EVERY, SamplingProfiler
+from .reload import HotReloader
+
+DEFAULT_PROFILE_OUTPUT = "pong.collapsed"
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    parser = ArgumentParser(description="Play Pong.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--reload", action="store_true",
+        help="start a new game whenever the code in target changes")
+    mode.add_argument(
+        "--profile", metavar="N", type=int, nargs="?", const=DEFAULT_EVERY,
+        help="profile every Nth frame (default N: %(const)s), and write"
+        " collapsed stacks for a flame graph at exit")
+    parser.add_argument(
+        "--profile-output", metavar="FILE", default=DEFAULT_PROFILE_OUTPUT,
+        help="where to write the stacks (default: %(default)s)")
+    opts = parser.parse_args(args)
+    if opts.profile is not None and opts.profile < 1:
+        parser.error(f"--profile={opts.profile}: N must be at least 1")
+
+    if opts.reload:
+        HotReloader(backends.PicoScroll()).run()
+        return
+
+    game = Game()
+    if opts.profile is None:
+        game.run()
+        return
+
+    profiler = SamplingProfiler(game, every=opts.profile)
+    try:
+        with profiler:
+            game.run()
+    finally:
+        profiler.write_collapsed(opts.profile_output)
+        profiler.report()
+        print(f"wrote {opts.profile_output}")
+
+
+if __name__ == "__main__":
+    main()
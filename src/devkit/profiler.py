@@ -0,0 +1,145 @@
+"""Profile a sample of a game's frames.
+
+`SamplingProfiler` wraps a `FrameTicker`'s `tick` method, as
+`AllocationTracker` does, and runs every Nth tick under `cProfile`.
+One profile accumulates over the session, so its statistics are
+per-function totals for the sampled frames.  The frames in between
+run at full speed, so frame pacing stays close to that of a normal
+run.
+
+`write_collapsed` writes the profile as collapsed stacks, one line
+per stack with its self time in microseconds, which flame graph
+tools like `flamegraph.pl` and speedscope read.  cProfile records
+callers rather than stacks, so a function's time is split between
+the stacks it appears in in proportion to the time each caller
+spent calling it.
+"""
+import cProfile
+import pstats
+import sys
+
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from typing import Any, Optional, TextIO
+
+from .instrument import Tick, shorten, wrap_tick
+
+# (filename, line number, function name), as pstats has them
+Function = tuple[str, int, str]
+
+DEFAULT_EVERY = 10
+
+
+class SamplingProfiler:
+    def __init__(self, ticker: Any, every: int = DEFAULT_EVERY):
+        if every < 1:
+            raise ValueError(f"every={every}")
+        self.ticker = ticker
+        self.every = every
+        self.profile = cProfile.Profile()
+        self.ticks = 0
+        self.sampled_ticks = 0
+
+        self._unwrap: Optional[Callable[[], None]] = None
+
+    def install(self) -> None:
+        """Start profiling every `every`th call of `self.ticker.tick`,
+        starting with the first.  The method is wrapped with
+        `wrap_tick`, so calls on other instances go straight through.
+        """
+        if self._unwrap is not None:
+            raise RuntimeError("already installed")
+
+        def sampled_tick(tick: Tick, instance: Any, delta_t: float) -> None:
+            sample = not self.ticks % self.every
+            self.ticks += 1
+            if not sample:
+                tick(instance, delta_t)
+                return
+            self.sampled_ticks += 1
+            self.profile.runcall(tick, instance, delta_t)
+
+        self._unwrap = wrap_tick(self.ticker, sampled_tick)
+
+    def uninstall(self) -> None:
+        if self._unwrap is None:
+            return
+        self._unwrap()
+        self._unwrap = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.uninstall()
+
+    def stats(self) -> dict[Function, Any]:
+        """The profile's statistics, keyed by function, as `pstats`
+        has them, less the profiler's own.
+        """
+        stats = pstats.Stats(self.profile).stats  # type: ignore[attr-defined]
+        return {func: value for func, value in stats.items()
+                if not _is_profiler(func)}
+
+    def report(self, file: Optional[TextIO] = None, limit: int = 20) -> None:
+        """Print the functions with the most cumulative time."""
+        file = file or sys.stdout
+        print(f"profiled {self.sampled_ticks} of {self.ticks} frames",
+              file=file)
+        if not self.sampled_ticks:
+            return
+        stats = pstats.Stats(self.profile, stream=file)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w") as fp:
+            for stack, us in sorted(collapsed_stacks(self.stats()).items()):
+                fp.write(f"{stack} {us}\n")
+
+
+def collapsed_stacks(stats: dict[Function, Any]) -> Counter[str]:
+    """Return the self time of every stack in `stats`, in whole
+    microseconds, keyed by the stack's function labels joined with
+    semicolons, outermost first.  Stacks with no time are omitted.
+    """
+    callees: defaultdict[Function, list[tuple[Function, float]]]
+    callees = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, (_, _, _, edge_time) in callers.items():
+            if caller in stats:
+                callees[caller].append((func, edge_time))
+
+    seconds: Counter[str] = Counter()
+
+    def visit(func: Function, path: list[Function], share: float) -> None:
+        self_time = stats[func][2]
+        path.append(func)
+        seconds[";".join(label(f) for f in path)] += self_time * share
+        for callee, edge_time in callees[func]:
+            callee_time = stats[callee][3]
+            if callee in path or not callee_time:
+                continue  # recursion, or nothing to split
+            visit(callee, path, share * edge_time / callee_time)
+        path.pop()
+
+    for func, (_, _, _, _, callers) in stats.items():
+        if not any(caller in stats for caller in callers):
+            visit(func, [], 1)
+
+    result: Counter[str] = Counter()
+    for stack, time in seconds.items():
+        if (us := round(time * 1_000_000)) > 0:
+            result[stack] = us
+    return result
+
+
+def label(func: Function) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name  # a builtin, like "<built-in method math.sqrt>"
+    return f"{name} ({shorten(filename)}:{lineno})"
+
+
+def _is_profiler(func: Function) -> bool:
+    return "_lsprof.Profiler" in func[2]
@@ -1,5 +1,6 @@
-from .picoscroll import PicoScroll
+from .picoscroll import PicoScroll, ThreadedPicoScroll
 
 __all__ = [
     "PicoScroll",
+    "ThreadedPicoScroll",
 ]
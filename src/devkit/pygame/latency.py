@@ -0,0 +1,90 @@
+"""Measure the emulator's button-to-photon latency.
+
+The latency of an input is the time from the emulator handling a
+key event for a button to it presenting the first frame that
+differs from the one before.  That's an upper bound on how long
+the game took to respond: a frame that changes for some other
+reason, like the ball moving, counts too.  Inputs followed by no
+change within `TIMEOUT` seconds are counted separately.
+
+Set `DEVKIT_LATENCY=1` to have the emulator print a report at exit.
+"""
+import os
+import sys
+
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from time import perf_counter
+from typing import Optional, TextIO
+
+from ..stubs.pimoroni.picoscroll import PicoScroll
+
+ENV_VAR = "DEVKIT_LATENCY"
+
+BUTTON_NAMES = {
+    PicoScroll.BUTTON_A: "A",
+    PicoScroll.BUTTON_B: "B",
+    PicoScroll.BUTTON_X: "X",
+    PicoScroll.BUTTON_Y: "Y",
+}
+
+
+def enabled() -> bool:
+    return bool(os.environ.get(ENV_VAR))
+
+
+class LatencyMonitor:
+    TIMEOUT = 1.0
+
+    def __init__(self, clock: Callable[[], float] = perf_counter):
+        self.latencies: defaultdict[int, list[float]] = defaultdict(list)
+        self.unseen: Counter[int] = Counter()
+        self._clock = clock
+        self._pending: list[tuple[int, float]] = []
+        self._last_frame = b""
+
+    def input(self, button: int) -> None:
+        """Call when an input for `button` is handled."""
+        self._pending.append((button, self._clock()))
+
+    def presented(self, frame: bytearray) -> None:
+        """Call when `frame` has been presented."""
+        now = self._clock()
+        pending = self._pending
+        if pending and now - pending[0][1] > self.TIMEOUT:
+            self._expire(now)
+        if frame == self._last_frame:
+            return
+        self._last_frame = bytes(frame)
+        for button, time in pending:
+            self.latencies[button].append(now - time)
+        pending.clear()
+
+    def _expire(self, now: float) -> None:
+        pending = self._pending
+        while pending and now - pending[0][1] > self.TIMEOUT:
+            button, _ = pending.pop(0)
+            self.unseen[button] += 1
+
+    def report(self, file: Optional[TextIO] = None) -> None:
+        file = file or sys.stderr
+        if not self.latencies and not self.unseen:
+            print("button-to-photon latency: no inputs", file=file)
+            return
+        print("button-to-photon latency (ms):", file=file)
+        print(f"  {'button':6} {'inputs':>6} {'min':>7} {'median':>7}"
+              f" {'p95':>7} {'max':>7}", file=file)
+        for button in sorted(self.latencies):
+            times = sorted(self.latencies[button])
+            stats = (times[0], _percentile(times, 50),
+                     _percentile(times, 95), times[-1])
+            print(f"  {BUTTON_NAMES.get(button, button):6} {len(times):6}"
+                  + "".join(f" {t * 1000:7.1f}" for t in stats), file=file)
+        for button, count in sorted(self.unseen.items()):
+            print(f"  {count} {BUTTON_NAMES.get(button, button)} input(s)"
+                  f" changed nothing within {self.TIMEOUT}s", file=file)
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    index = round((len(sorted_values) - 1) * percent / 100)
+    return sorted_values[index]
@@ -1,12 +1,20 @@
-from collections.abc import Container
-from typing import ClassVar
+import atexit
+import threading
+
+from typing import ClassVar, Optional
 
 import pygame
 
-from ..stubs.pimoroni.picoscroll import PicoScroll as _PicoScroll
+from ..headless.picoscroll import PicoScroll as _PicoScroll
+from . import latency
+from .latency import LatencyMonitor
 
 
 class PicoScroll(_PicoScroll):
+    # Key events are only handled as frames are shown and buttons are
+    # polled, so games can't wait for presses by IRQ.
+    buttons_are_polled: ClassVar[bool] = True
+
     _KEYMAP: ClassVar[dict[int, int]] = {
         pygame.K_a: _PicoScroll.BUTTON_A,
         pygame.K_b: _PicoScroll.BUTTON_B,
@@ -24,75 +32,101 @@ class PicoScroll(_PicoScroll):
         pygame.K_m: _PicoScroll.BUTTON_Y,
     }
 
-    def __init__(self, *, window_title: str = "Pico Scroll", gamma: float = 3):
-        if not pygame.get_init():
-            pygame.init()
+    def __init__(self, *, window_title: str = "Pico Scroll", gamma: float = 3,
+                 report_latency: Optional[bool] = None):
+        self._open_window(window_title)
+        super().__init__()
+        self._init_gamma(gamma)
+        self._init_latency(report_latency)
 
-        w, h = self._get_size()
-
-        display_info = pygame.display.Info()
-        self._scale = display_info.current_w // (w * 3)
-        display_size = w * self._scale, h * self._scale
-        self._display = pygame.display.set_mode(display_size)
+        self.show()
 
-        pygame.display.set_caption(window_title)
+    def _init_gamma(self, gamma: float) -> None:
+        self._gamma = gamma
+        self._lut: Optional[bytes] = None
+        self.negotiate_gamma(1)
 
-        self._num_pixels = w * h
-        self._fb = bytearray()
-        self._gamma = 1 / gamma
+    def negotiate_gamma(self, gamma: float) -> bool:
+        """Take over gamma correction from a display that would
+        correct levels by `gamma` before setting them.  Whatever the
+        display sends is shown through one lookup that fuses its curve
+        with the inverse of this emulator's, or none if they cancel.
+        """
+        if gamma == self._gamma:
+            self._lut = None
+        else:
+            exponent = gamma / self._gamma
+            self._lut = bytes(round(255 * ((v / 255) ** exponent))
+                              for v in range(256))
+        return True
 
-        self._is_pressed = [False] * 4
+    def _init_latency(self, report: Optional[bool]) -> None:
+        self.latency = LatencyMonitor()
+        if report is None:
+            report = latency.enabled()
+        if report:
+            atexit.register(self.latency.report)
 
-        self.clear()
-        self.show()
+    def _open_window(self, window_title: str) -> None:
+        if not pygame.get_init():
+            pygame.init()
 
-    def _get_size(self) -> tuple[int, int]:
-        return self.get_width(), self.get_height()
+        w, h = self._get_size()
 
-    def clear(self) -> None:
-        self._fb = bytearray(self._num_pixels)
+        display_info = pygame.display.Info()
+        scale = display_info.current_w // (w * 3)
+        display_size = w * scale, h * scale
+        self._display = pygame.display.set_mode(display_size, pygame.RESIZABLE)
+        self._set_scale(scale, display_size)
 
-    def set_pixel(self, x: int, y: int, level: int) -> None:
-        width, height = self._get_size()
+        pygame.display.set_caption(window_title)
 
-        _raise_unless_valid_int(x, "x", range(width))
-        _raise_unless_valid_int(y, "y", range(height))
-        _raise_unless_valid_int(level, "level", range(256))
+    def _set_scale(self, scale: int, display_size: tuple[int, int]) -> None:
+        """Render the LEDs at `scale`, centred in a window of
+        `display_size`.
+        """
+        w, h = self._get_size()
+        left = (display_size[0] - w * scale) // 2
+        top = (display_size[1] - h * scale) // 2
 
-        self._fb[y * width + x] = level
+        self._scale = scale
+        self._atlas, self._sprites = _render_atlas(scale)
+        self._dests = [(left + x * scale, top + y * scale)
+                       for y in range(h) for x in range(w)]
+        self._drawn = [-1] * len(self._dests)  # so every LED is drawn
 
-    def show_bitmap_1d(self, bitmap: bytearray, level: int, offset: int) -> None:
-        if not isinstance(bitmap, bytearray):
-            raise TypeError("object with buffer protocol required")
+    def show(self) -> None:
+        self._draw(self._fb)
+        pygame.display.flip()
+        self.latency.presented(self._fb)
+        self._handle_events()  # for games that don't poll the buttons
 
-        columns = range(len(bitmap))
-        width, height = self._get_size()
-        for x in range(width):
-            if (i := offset + x) in columns:
-                col = bitmap[i]
-            else:
-                col = 0
-            for y in range(height):
-                self.set_pixel(x, y, level if col & 1 else 0)
-                col >>= 1
+    def _draw(self, fb: bytearray) -> None:
+        """Draw the LEDs whose levels differ from those last drawn."""
+        if (lut := self._lut) is not None:
+            fb = fb.translate(lut)
 
-    def show(self) -> None:
-        surface = self._display
-        gamma = self._gamma
-        scale = self._scale
-        width, height = self._get_size()
-
-        rect = pygame.Rect(0, 0, scale, scale)
-        for y in range(height):
-            rect.y = y * scale
-            for x in range(width):
-                raw_v = self._fb[y * width + x]
-                v = round(255 * ((raw_v / 255) ** gamma))
-                rect.x = x * scale
-                pygame.draw.rect(surface, (v, v, v), rect)
+        atlas, sprites, dests = self._atlas, self._sprites, self._dests
+        self._display.blits(
+            [(atlas, dests[i], sprites[v])
+             for i, (v, drawn) in enumerate(zip(fb, self._drawn))
+             if v != drawn],
+            doreturn=False)
+        self._drawn[:] = fb
 
+    def _redraw(self) -> None:
+        """Draw the last frame presented again."""
+        self._draw(self._fb)
         pygame.display.flip()
 
+    def _resize(self, size: tuple[int, int]) -> None:
+        w, h = self._get_size()
+        scale = max(1, min(size[0] // w, size[1] // h))
+        self._display = pygame.display.get_surface()
+        self._display.fill((0, 0, 0))
+        self._set_scale(scale, size)
+        self._redraw()
+
     def is_pressed(self, button: int) -> bool:
         self._handle_events()
         return self._is_pressed[button]
@@ -108,20 +142,170 @@ class PicoScroll(_PicoScroll):
                     if event.key == pygame.K_q:
                         raise SystemExit  # pragma: no cover
                     self._handle_keyevent(event.key, False)
+                case pygame.VIDEORESIZE:
+                    self._resize(event.size)
 
     def _handle_keyevent(self, keycode: int, is_pressed: bool) -> None:
         button = self._KEYMAP.get(keycode)
         if button is None:
             return
-        self._is_pressed[button] = is_pressed
-
-
-def _raise_unless_valid_int(
-        value: int,
-        name: str,
-        valid_values: Container[int],
-) -> None:
-    if not isinstance(value, int):
-        raise TypeError(f"{name}={value}")
-    if value not in valid_values:
-        raise ValueError(f"{name}={value}")
+        self.press(button, is_pressed)
+        self.latency.input(button)
+
+
+class ThreadedPicoScroll(PicoScroll):
+    """A Pico Scroll Pack emulator whose window is drawn by a thread
+    of its own.  `show()` copies the framebuffer and returns, and the
+    render thread presents the newest frame it's been given and
+    handles the window's events, so the game loop's frame times don't
+    include window system stalls.  Frames shown faster than they can
+    be presented are dropped.
+
+    The window is opened by the render thread, which SDL doesn't
+    support on macOS.
+    """
+    EVENT_INTERVAL = 0.01  # seconds between event checks when idle
+    buttons_are_polled = False
+
+    def __init__(self, *, window_title: str = "Pico Scroll", gamma: float = 3,
+                 report_latency: Optional[bool] = None):
+        _PicoScroll.__init__(self)
+        self._init_gamma(gamma)
+        self._init_latency(report_latency)
+
+        self.frames_shown = 0
+        self.frames_presented = 0
+
+        self._buffers = _TripleBuffer(len(self._fb))
+        self._frame_shown = threading.Event()
+        self._started = threading.Event()
+        self._stopping = False
+        self._error: Optional[BaseException] = None
+
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(window_title,),
+            name="pygame-render",
+            daemon=True,
+        )
+        self._thread.start()
+        self._started.wait()
+
+        self.show()
+
+    def show(self) -> None:
+        self._raise_if_stopped()
+        buffers = self._buffers
+        buffers.back[:] = self._fb
+        buffers.publish()
+        self._frame_shown.set()
+        self.frames_shown += 1
+
+    def is_pressed(self, button: int) -> bool:
+        self._raise_if_stopped()
+        return self._is_pressed[button]
+
+    def close(self) -> None:
+        """Stop the render thread."""
+        self._stopping = True
+        self._frame_shown.set()
+        self._thread.join()
+
+    def _raise_if_stopped(self) -> None:
+        """Raise whatever stopped the render thread, on this thread.
+        Closing the window raises `SystemExit`.
+        """
+        if self._error is not None:
+            raise self._error
+
+    def _run(self, window_title: str) -> None:
+        buffers = self._buffers
+        frame_shown = self._frame_shown
+        try:
+            self._open_window(window_title)
+            self._started.set()
+            while not self._stopping:
+                frame_shown.wait(self.EVENT_INTERVAL)
+                frame_shown.clear()
+                if buffers.swap_front():
+                    self._draw(buffers.front)
+                    pygame.display.flip()
+                    self.latency.presented(buffers.front)
+                    self.frames_presented += 1
+                self._handle_events()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._started.set()
+
+    def _redraw(self) -> None:
+        self._draw(self._buffers.front)
+        pygame.display.flip()
+
+
+def _render_atlas(scale: int) -> tuple[pygame.Surface, list[pygame.Rect]]:
+    """Render an LED at every brightness level, `scale` pixels square,
+    into one surface, so a frame can be drawn with one batch of blits.
+    Returns the surface and the area of each level's sprite on it.
+
+    Each LED is a dim disc, its diffuser, with a glow added over it
+    that's white at the core and fades out just past the disc's edge.  The
+    glow is rendered once and scaled by each level.  Its centre pixel is
+    always white, so LEDs too small to have a core still light up.
+    """
+    radius = scale / 2
+    core = radius * 0.3
+
+    glow = pygame.Surface((scale, scale))
+    for r in range(round(radius), 0, -1):
+        brightness = min(1, (radius - r) / (radius - core))
+        v = round(255 * brightness ** 2)
+        pygame.draw.circle(glow, (v, v, v), (radius, radius), r)
+    glow.set_at((scale // 2, scale // 2), (255, 255, 255))  # however small
+
+    columns = 16
+    atlas = pygame.Surface((columns * scale, 256 // columns * scale))
+    sprites = []
+    sprite = pygame.Surface((scale, scale))
+    for level in range(256):
+        y, x = divmod(level, columns)
+        area = pygame.Rect(x * scale, y * scale, scale, scale)
+        pygame.draw.circle(atlas, _DIFFUSER, area.center, radius * 0.9)
+        sprite.blit(glow, (0, 0))
+        sprite.fill((level, level, level), special_flags=pygame.BLEND_MULT)
+        atlas.blit(sprite, area, special_flags=pygame.BLEND_ADD)
+        sprites.append(area)
+    return atlas, sprites
+
+
+_DIFFUSER = (24, 24, 24)  # an unlit LED
+
+
+class _TripleBuffer:
+    """Three framebuffers: the game thread writes to `back`, the
+    render thread reads from `front`, and the newest complete frame
+    waits between them, so neither thread ever waits for the other.
+    """
+    def __init__(self, size: int):
+        self.back = bytearray(size)
+        self.front = bytearray(size)
+        self._ready = bytearray(size)
+        self._is_fresh = False
+        self._lock = threading.Lock()
+
+    def publish(self) -> None:
+        """Make `back` the newest frame, and reuse the one it replaces."""
+        with self._lock:
+            self.back, self._ready = self._ready, self.back
+            self._is_fresh = True
+
+    def swap_front(self) -> bool:
+        """Make the newest frame `front`, if there's one that hasn't
+        been presented.
+        """
+        with self._lock:
+            if not self._is_fresh:
+                return False
+            self.front, self._ready = self._ready, self.front
+            self._is_fresh = False
+            return True
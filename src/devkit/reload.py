@@ -0,0 +1,190 @@
+"""Reload the device code in a running emulator when it changes.
+
+`HotReloader` runs a game against a provider it's given, and checks
+the device code's source files for changes as the game ticks.  When
+one changes, every module loaded from them is dropped, along with
+the shims that import them under their device names, and a new game
+is made from freshly imported code against the same provider.  The
+emulator's window stays open throughout.
+
+Code that fails to import or crashes is reported, and the last frame
+stays up until the next change.
+"""
+import os
+import sys
+import traceback
+
+from collections.abc import Callable, Iterable
+from time import monotonic, sleep, time
+from typing import Any, Optional, TextIO
+
+from .instrument import Tick, wrap_tick
+
+import target
+
+DEFAULT_INTERVAL = 0.1  # seconds between checks for changes
+
+TARGET_PATHS = tuple(target.__path__)
+
+Factory = Callable[[Any], Any]
+
+
+class Watcher:
+    """Checks the Python files under `paths` for changes, at most
+    every `interval` seconds.
+    """
+    def __init__(
+            self,
+            paths: Iterable[str],
+            interval: float = DEFAULT_INTERVAL,
+            clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.paths = tuple(paths)
+        self.interval = interval
+        self._clock = clock
+        self._next_check = clock() + interval
+        self._mtimes = self._scan()
+
+    def changed(self) -> list[str]:
+        """Return the files added, modified or removed since the last
+        check, or nothing if it's not time to check again.
+        """
+        now = self._clock()
+        if now < self._next_check:
+            return []
+        self._next_check = now + self.interval
+        old, new = self._mtimes, self._scan()
+        self._mtimes = new
+        return sorted(path for path in old.keys() | new.keys()
+                      if old.get(path) != new.get(path))
+
+    def _scan(self) -> dict[str, float]:
+        mtimes = {}
+        for top in self.paths:
+            for dirpath, _, filenames in os.walk(top):
+                for filename in filenames:
+                    if not filename.endswith(".py"):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        mtimes[path] = os.stat(path).st_mtime
+                    except FileNotFoundError:
+                        continue  # mid-save
+        return mtimes
+
+
+def purge(paths: Iterable[str]) -> list[str]:
+    """Remove every module loaded from under `paths` from
+    `sys.modules`, so the next import of it loads it afresh.  Modules
+    next to the package they're in with the same name as one of these,
+    like the `engine` shim for `target.engine`, go too.  Returns the
+    names removed.
+    """
+    prefixes = tuple(os.path.join(os.path.abspath(path), "") for path in paths)
+    purged = []
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if not filename or not os.path.abspath(filename).startswith(prefixes):
+            continue
+        del sys.modules[name]
+        purged.append(name)
+
+        device_name = name.rsplit(".", 1)[-1]
+        shim = sys.modules.get(device_name)
+        shim_filename = getattr(shim, "__file__", None)
+        if shim_filename is None or device_name == name:
+            continue
+        package_dir = os.path.dirname(os.path.abspath(filename))
+        if os.path.dirname(os.path.abspath(shim_filename)) \
+           == os.path.dirname(package_dir):
+            del sys.modules[device_name]
+            purged.append(device_name)
+    return purged
+
+
+def make_pong(provider: Any) -> Any:
+    from target.engine import PicoScroll
+    from target.pong import Game
+
+    return Game(PicoScroll(provider))
+
+
+class _Reload(Exception):
+    pass
+
+
+class HotReloader:
+    def __init__(
+            self,
+            provider: Any,
+            factory: Factory = make_pong,
+            *,
+            paths: Iterable[str] = TARGET_PATHS,
+            interval: float = DEFAULT_INTERVAL,
+            file: Optional[TextIO] = None,
+    ) -> None:
+        self.provider = provider
+        self.factory = factory
+        self.paths = tuple(paths)
+        self.watcher = Watcher(self.paths, interval)
+        self.file = file or sys.stderr
+        self.game: Any = None
+        self.edit_latencies: list[float] = []
+
+        self._edit_time: Optional[float] = None
+
+    def run(self) -> None:
+        """Run games until one exits, making a new one each time
+        the code changes.
+        """
+        while True:
+            try:
+                self.game = self.factory(self.provider)
+                self._run(self.game)
+            except _Reload:
+                pass
+            except Exception:
+                traceback.print_exc(file=self.file)
+                self._wait_for_change()
+            purge(self.paths)
+
+    def _run(self, game: Any) -> None:
+        def watched_tick(tick: Tick, instance: Any, delta_t: float) -> None:
+            tick(instance, delta_t)
+            if self._edit_time is not None:
+                self._first_frame()
+            if changed := self.watcher.changed():
+                self._changed(changed)
+                raise _Reload
+
+        unwrap = wrap_tick(game, watched_tick)
+        try:
+            game.run()
+        finally:
+            unwrap()
+
+    def _wait_for_change(self) -> None:
+        """Keep showing the last frame until the code changes."""
+        while not (changed := self.watcher.changed()):
+            self.provider.show()  # and handle the window's events
+            sleep(self.watcher.interval)
+        self._changed(changed)
+
+    def _changed(self, paths: list[str]) -> None:
+        mtimes = []
+        for path in paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime)
+            except FileNotFoundError:
+                continue
+        self._edit_time = max(mtimes, default=time())
+        names = ", ".join(os.path.basename(path) for path in paths)
+        print(f"reloading: {names} changed", file=self.file)
+
+    def _first_frame(self) -> None:
+        assert self._edit_time is not None
+        latency = time() - self._edit_time
+        self._edit_time = None
+        self.edit_latencies.append(latency)
+        print(f"reloaded: first frame {latency * 1000:.0f}ms after the edit",
+              file=self.file)
@@ -0,0 +1,194 @@
+"""Step thousands of Pong balls at once with NumPy.
+
+`BallBatch` follows the same wall, paddle and spin rules as
+`target.pong.Ball.update`, but holds every ball's state in arrays
+and advances them all together.  It's a host-side analysis tool;
+use `target.pong.Ball` on the device.
+"""
+from collections.abc import Sequence
+from math import pi
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+Array = npt.NDArray[np.float64]
+Mask = npt.NDArray[np.bool_]
+
+
+class BallBatch:
+    def __init__(
+            self,
+            size: int,
+            *,
+            radius: float = 0.5,
+            max_english: float = pi / 5,
+            speedup: float = 0.02,
+            spin_decay: float = 1,
+            rng: Optional[np.random.Generator] = None,
+    ) -> None:
+        self.size = size
+        self.radius = radius
+        self.max_english = max_english
+        self.speedup = speedup
+        self.spin_decay = spin_decay
+        self.rng = rng or np.random.default_rng()
+
+        self.x: Array = np.zeros(size)
+        self.y: Array = np.zeros(size)
+        self.vx: Array = np.zeros(size)
+        self.vy: Array = np.zeros(size)
+        self.spin: Array = np.zeros(size)
+
+    @classmethod
+    def from_balls(cls, balls: Sequence[Any], **kwargs: Any) -> "BallBatch":
+        """Make a batch whose state and parameters copy `balls`."""
+        first = balls[0]
+        for attr in ("radius", "max_english", "speedup", "spin_decay"):
+            kwargs.setdefault(attr, getattr(first, attr))
+        batch = cls(len(balls), **kwargs)
+        for attr in ("x", "y", "vx", "vy", "spin"):
+            getattr(batch, attr)[:] = [getattr(ball, attr) for ball in balls]
+        return batch
+
+    def reset(self, speed: float = 10) -> None:
+        """Serve every ball, as `Ball.reset` does."""
+        rng = self.rng
+        size = self.size
+        self.x[:] = 8.5
+        margin = self.radius + 0.1
+        self.y[:] = rng.uniform(margin, 7 - margin, size)
+        rx = rng.choice((0, 16), size) - self.x
+        ry = rng.uniform(-6, 12, size) - self.y
+        scale = speed / np.sqrt(rx * rx + ry * ry)
+        self.vx[:] = rx * scale
+        self.vy[:] = ry * scale
+        self.spin[:] = 0
+
+    def in_play(self) -> Mask:
+        """Which balls haven't yet gone past a paddle and off-screen."""
+        radius = self.radius
+        result: Mask = (self.x + radius >= 0) & (self.x - radius <= 16)
+        return result
+
+    def update(
+            self,
+            delta_t: float,
+            paddle_y: npt.ArrayLike,
+            paddle_vy: npt.ArrayLike = 0,
+    ) -> None:
+        """Advance every ball by `delta_t` seconds.
+
+        `paddle_y` and `paddle_vy` give the left and right paddles'
+        positions and speeds, as anything that broadcasts to shape
+        `(2, size)`: one pair for all balls, or a pair per ball.
+        """
+        size = self.size
+        py = np.broadcast_to(paddle_y, (2, size))
+        pvy = np.broadcast_to(paddle_vy, (2, size))
+
+        radius = self.radius
+        # top and bottom edges of screen
+        top = radius
+        bottom = 7 - radius
+        # left and right edges of paddles
+        left = 1 + radius
+        right = 16 - radius
+
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+
+        dt = np.full(size, float(delta_t))
+        live = dt > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            while live.any():
+                # always be moving towards a player
+                chk_vx = np.abs(vx)
+                m = live & (chk_vx < 0.05)
+                if m.any():
+                    vx[m] = self.rng.uniform(-1, 1, np.count_nonzero(m))
+                vx[live & (chk_vx >= 0.05) & (chk_vx < 0.1)] *= 1.1
+
+                dx = vx * dt
+                dy = vy * dt
+                nx = x + dx
+                ny = y + dy
+
+                pending = live.copy()
+
+                # top edge?
+                excess_dy = ny - top
+                m = pending & (excess_dy < 0)
+                excess_dt = dt * excess_dy / dy
+                x[m] += vx[m] * (dt[m] - excess_dt[m])
+                y[m] = top
+                vy[m] *= -1
+                self._english(m)
+                dt[m] = excess_dt[m]
+                pending &= ~m
+
+                # bottom edge?
+                excess_dy = ny - bottom
+                m = pending & (excess_dy > 0)
+                excess_dt = dt * excess_dy / dy
+                x[m] += vx[m] * (dt[m] - excess_dt[m])
+                y[m] = bottom
+                vy[m] *= -1
+                self._english(m)
+                dt[m] = excess_dt[m]
+                pending &= ~m
+
+                # left player
+                excess_dx = nx - left
+                excess_dt = dt * excess_dx / dx
+                hit_y = y + vy * (dt - excess_dt)
+                m = pending & (excess_dx < 0) & _is_at(py[0], hit_y)
+                x[m] = left
+                y[m] = hit_y[m]
+                vx[m] *= -1
+                self.spin[m] -= pvy[0][m]
+                self._english(m)
+                vx[m & (vx < 0)] *= -1  # move AWAY from the player!
+                dt[m] = excess_dt[m]
+                pending &= ~m
+
+                # right player
+                excess_dx = nx - right
+                excess_dt = dt * excess_dx / dx
+                hit_y = y + vy * (dt - excess_dt)
+                m = pending & (excess_dx > 0) & _is_at(py[1], hit_y)
+                x[m] = right
+                y[m] = hit_y[m]
+                vx[m] *= -1
+                self.spin[m] += pvy[1][m]
+                self._english(m)
+                vx[m & (vx > 0)] *= -1  # move AWAY from the player!
+                dt[m] = excess_dt[m]
+                pending &= ~m
+
+                x[pending] = nx[pending]
+                y[pending] = ny[pending]
+                live &= ~pending & (dt > 0)
+
+        k = min(delta_t, 0.1)
+        self.spin *= (1 - k * self.spin_decay)  # decay
+        kk = 1 + k * self.speedup
+        vx *= kk  # faster!
+        vy *= kk
+
+    def _english(self, mask: Mask, spinfrac: float = 0.6) -> None:
+        if not mask.any():
+            return
+        spin = self.spin[mask] * spinfrac
+        self.spin[mask] -= spin
+        spin = np.clip(spin, -self.max_english, self.max_english)
+        vx = self.vx[mask]
+        vy = self.vy[mask]
+        r = np.sqrt(vx * vx + vy * vy)
+        theta = np.arctan2(vy, vx) + spin
+        self.vx[mask] = r * np.cos(theta)
+        self.vy[mask] = r * np.sin(theta)
+
+
+def _is_at(paddle_y: Array, y: Array) -> Mask:
+    result: Mask = (y >= paddle_y - 1.25) & (y <= paddle_y + 1.25)
+    return result
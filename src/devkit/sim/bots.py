@@ -0,0 +1,70 @@
+"""Scripted players for headless Pong games.
+
+Each frame, a bot looks at its paddle and the ball and says which
+way it wants the paddle to move; the caller turns that into button
+presses, so the game sees exactly what a human would give it.
+"""
+from random import Random
+from typing import Any, ClassVar
+
+UP = -1
+STAY = 0
+DOWN = 1
+
+
+class Bot:
+    name: ClassVar[str]
+
+    def __init__(self, rng: Random) -> None:
+        self.rng = rng
+
+    def move(self, player: Any, ball: Any) -> int:
+        """Return `UP`, `STAY` or `DOWN`."""
+        raise NotImplementedError
+
+
+class IdleBot(Bot):
+    """Never moves."""
+    name = "idle"
+
+    def move(self, player: Any, ball: Any) -> int:
+        return STAY
+
+
+class TrackingBot(Bot):
+    """Follows the ball, give or take a little slack."""
+    name = "tracker"
+
+    def __init__(self, rng: Random, slack: float = 0.25) -> None:
+        super().__init__(rng)
+        self.slack = slack
+
+    def move(self, player: Any, ball: Any) -> int:
+        error = ball.y - player.y
+        if error < -self.slack:
+            return UP
+        if error > self.slack:
+            return DOWN
+        return STAY
+
+
+class RandomBot(Bot):
+    """Mashes buttons, holding each choice for a random while."""
+    name = "random"
+
+    def __init__(self, rng: Random) -> None:
+        super().__init__(rng)
+        self._choice = STAY
+        self._frames_left = 0
+
+    def move(self, player: Any, ball: Any) -> int:
+        if self._frames_left <= 0:
+            self._choice = self.rng.choice((UP, STAY, DOWN))
+            self._frames_left = self.rng.randrange(5, 30)
+        self._frames_left -= 1
+        return self._choice
+
+
+BOTS: dict[str, type[Bot]] = {
+    bot.name: bot for bot in (IdleBot, TrackingBot, RandomBot)
+}
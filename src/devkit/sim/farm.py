@@ -0,0 +1,239 @@
+"""Run lots of headless Pong games in parallel and summarise them.
+
+Every game gets its own seed, and is played in virtual time by a
+pair of bots, so a run can be repeated exactly and a parameter sweep
+can compare like with like: the same seeds are used for every
+combination of `Ball` parameters.
+"""
+import json
+import random
+import sys
+
+from argparse import ArgumentParser
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import product
+from math import pi
+from os import cpu_count
+from statistics import fmean, median
+from time import perf_counter_ns
+from typing import Any, Optional
+
+from target.engine import PicoScroll
+from target.pong import INSERT_COIN, PLAYER_SCORED, RUNNING, Ball, Game
+
+from ..headless import PicoScroll as HeadlessPicoScroll
+from .bots import BOTS, DOWN, UP
+
+PLAYER_BUTTONS = (
+    (HeadlessPicoScroll.BUTTON_A, HeadlessPicoScroll.BUTTON_B),
+    (HeadlessPicoScroll.BUTTON_X, HeadlessPicoScroll.BUTTON_Y),
+)
+
+
+@dataclass(frozen=True)
+class BallParams:
+    max_english: float = pi / 5
+    speedup: float = 0.02
+    spin_decay: float = 1
+
+
+@dataclass(frozen=True)
+class GameSpec:
+    seed: int
+    bots: tuple[str, str] = ("tracker", "tracker")
+    ball: BallParams = field(default_factory=BallParams)
+    frame_rate: float = 60
+    max_seconds: float = 120
+
+
+@dataclass(frozen=True)
+class GameResult:
+    spec: GameSpec
+    frames: int  # frames the ball was in play
+    returns: int  # times a paddle hit the ball
+    collisions: int  # paddle hits plus wall bounces
+    winner: Optional[int]  # None if the rally timed out
+    frame_ns_mean: float
+    frame_ns_max: int
+
+    @property
+    def rally_seconds(self) -> float:
+        return self.frames / self.spec.frame_rate
+
+
+class CountingBall(Ball):  # type: ignore[misc]
+    """A `Ball` that counts its collisions."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.collisions = 0
+        self.returns = 0
+        super().__init__(*args, **kwargs)
+
+    def _english(self, *args: Any, **kwargs: Any) -> None:
+        self.collisions += 1
+        radius = self.radius
+        if self.x in (1 + radius, 16 - radius):
+            self.returns += 1
+        super()._english(*args, **kwargs)
+
+
+def insert_coin(game: Any, scroll: HeadlessPicoScroll, delta_t: float) -> None:
+    """Start a game by holding a button past the debounce, then
+    letting go.
+    """
+    hold = int(game.DEBOUNCE / delta_t) + 2
+    frame = 0
+    while game.state is INSERT_COIN:
+        scroll.press(scroll.BUTTON_A, frame < hold)
+        game.tick(delta_t)
+        frame += 1
+
+
+def run_game(spec: GameSpec) -> GameResult:
+    """Play one rally, from inserting a coin until someone scores."""
+    random.seed(spec.seed)  # the game uses the module-level RNG
+    rng = random.Random(spec.seed)
+
+    scroll = HeadlessPicoScroll()
+    game = Game(PicoScroll(scroll), max_framerate=None)
+    ball = game.ball = CountingBall(**asdict(spec.ball))
+    bots = [BOTS[name](rng) for name in spec.bots]
+
+    delta_t = 1 / spec.frame_rate
+    insert_coin(game, scroll, delta_t)
+
+    max_frames = int(spec.max_seconds * spec.frame_rate)
+    frames = 0
+    total_ns = max_ns = 0
+    while game.state is not PLAYER_SCORED and frames < max_frames:
+        for bot, player, (up, down) in zip(bots, game.players, PLAYER_BUTTONS):
+            move = bot.move(player, ball)
+            scroll.press(up, move == UP)
+            scroll.press(down, move == DOWN)
+
+        start_ns = perf_counter_ns()
+        game.tick(delta_t)
+        frame_ns = perf_counter_ns() - start_ns
+
+        if game.state is RUNNING or game.state is PLAYER_SCORED:
+            frames += 1
+            total_ns += frame_ns
+            max_ns = max(max_ns, frame_ns)
+
+    if game.state is PLAYER_SCORED:
+        winner: Optional[int] = 1 if ball.x < 8 else 0
+    else:
+        winner = None
+
+    return GameResult(
+        spec=spec,
+        frames=frames,
+        returns=ball.returns,
+        collisions=ball.collisions,
+        winner=winner,
+        frame_ns_mean=total_ns / frames if frames else 0,
+        frame_ns_max=max_ns,
+    )
+
+
+def run_games(
+        specs: Sequence[GameSpec],
+        jobs: Optional[int] = None,
+) -> list[GameResult]:
+    """Play every game in `specs`, spread over `jobs` processes."""
+    if jobs == 1:
+        return list(map(run_game, specs))
+    jobs = jobs or cpu_count() or 1
+    chunksize = max(1, len(specs) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(run_game, specs, chunksize=chunksize))
+
+
+def summarize(results: Iterable[GameResult]) -> list[dict[str, Any]]:
+    """Aggregate results by ball parameters."""
+    groups: dict[BallParams, list[GameResult]] = {}
+    for result in results:
+        groups.setdefault(result.spec.ball, []).append(result)
+
+    summaries = []
+    for params, group in groups.items():
+        wins = [r.winner for r in group]
+        summaries.append({
+            **asdict(params),
+            "games": len(group),
+            "timeouts": wins.count(None),
+            "left_wins": wins.count(0),
+            "right_wins": wins.count(1),
+            "rally_seconds_mean": fmean(r.rally_seconds for r in group),
+            "rally_seconds_median": median(r.rally_seconds for r in group),
+            "returns_mean": fmean(r.returns for r in group),
+            "collisions_mean": fmean(r.collisions for r in group),
+            "frame_us_mean": fmean(r.frame_ns_mean for r in group) / 1000,
+            "frame_us_max": max(r.frame_ns_max for r in group) / 1000,
+        })
+    return summaries
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    defaults = BallParams()
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "-n", "--games", type=int, default=100,
+        help="games per combination of ball parameters (default: %(default)s)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="worker processes (default: one per CPU)")
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="seed of the first game (default: %(default)s)")
+    parser.add_argument(
+        "--bots", nargs=2, choices=sorted(BOTS), default=("tracker", "tracker"),
+        metavar=("LEFT", "RIGHT"),
+        help=f"bots to play with, from {{{','.join(sorted(BOTS))}}}")
+    parser.add_argument(
+        "--max-seconds", type=float, default=GameSpec.max_seconds,
+        help="give up on rallies longer than this (default: %(default)s)")
+    for name in ("max_english", "speedup", "spin_decay"):
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=float, nargs="+",
+            default=[getattr(defaults, name)], metavar="VALUE",
+            help="value(s) to sweep (default: %(default)s)")
+    parser.add_argument(
+        "--json", action="store_true",
+        help="print the summary as JSON")
+    opts = parser.parse_args(args)
+
+    specs = [
+        GameSpec(
+            seed=opts.seed + i,
+            bots=tuple(opts.bots),
+            ball=BallParams(max_english, speedup, spin_decay),
+            max_seconds=opts.max_seconds,
+        )
+        for max_english, speedup, spin_decay in product(
+                opts.max_english, opts.speedup, opts.spin_decay)
+        for i in range(opts.games)
+    ]
+
+    start_ns = perf_counter_ns()
+    summaries = summarize(run_games(specs, opts.jobs))
+    elapsed = (perf_counter_ns() - start_ns) / 1e9
+
+    if opts.json:
+        json.dump(summaries, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"{len(specs)} games in {elapsed:.1f}s")
+    for summary in summaries:
+        print()
+        for key, value in summary.items():
+            if isinstance(value, float):
+                value = f"{value:.4g}"
+            print(f"  {key:22} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Mirror frames between the host and a device over a byte stream.
+
+`devkit-stream receive` shows frames sent by `target.stream` on an
+emulator: from a device running the game over USB serial, with
+`--device /dev/ttyACM0`, or from the host over TCP, with `--listen`.
+`devkit-stream send` runs a game on the host and sends its frames,
+to a device running `target/stream.py` over USB serial, or to a
+receiver listening on TCP.  Buttons stay where the game is running.
+Serial devices are put in raw mode, so the terminal driver doesn't
+translate or act on bytes in the frames.
+"""
+import socket
+import sys
+
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable, Sequence
+from contextlib import ExitStack
+from importlib import import_module
+from io import FileIO
+from typing import Any, Optional
+
+from . import backends
+
+from target.stream import StreamingPicoScroll, receive
+
+DEFAULT_ADDRESS = "localhost:5317"
+
+Write = Callable[[Any], Any]
+ReadInto = Callable[[Any], Optional[int]]
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "localhost", int(port)
+
+
+def _open_device(path: str, mode: str, stack: ExitStack) -> FileIO:
+    """Open a device for unbuffered binary I/O.  If it's a terminal,
+    it's put in raw mode until `stack` closes.
+    """
+    f = stack.enter_context(FileIO(path, mode))
+    if f.isatty():
+        import termios  # only on Unix
+        import tty
+
+        fd = f.fileno()
+        attrs = termios.tcgetattr(fd)
+        tty.setraw(fd)
+        stack.callback(termios.tcsetattr, fd, termios.TCSADRAIN, attrs)
+    return f
+
+
+def _open_reader(opts: Namespace, stack: ExitStack) -> ReadInto:
+    if opts.device:
+        return _open_device(opts.device, "rb", stack).readinto
+    server = stack.enter_context(
+        socket.create_server(parse_address(opts.listen)))
+    print(f"listening on {opts.listen}", file=sys.stderr)
+    conn, _ = server.accept()
+    return stack.enter_context(conn).recv_into
+
+
+def _open_writer(opts: Namespace, stack: ExitStack) -> Write:
+    if opts.device:
+        return _open_device(opts.device, "wb", stack).write
+    conn = socket.create_connection(parse_address(opts.connect))
+    return stack.enter_context(conn).sendall
+
+
+def run_receiver(opts: Namespace) -> None:
+    with ExitStack() as stack:
+        readinto = _open_reader(opts, stack)
+        receive(readinto, backends.load(opts.backend)())
+
+
+def run_sender(opts: Namespace) -> Optional[StreamingPicoScroll]:
+    """Run the game, sending its frames, until it exits."""
+    scrolls = []
+    local_backend = opts.backend or backends.selected()
+
+    with ExitStack() as stack:
+        write = _open_writer(opts, stack)
+
+        def factory() -> StreamingPicoScroll:
+            local = backends.load(local_backend)()
+            scroll = StreamingPicoScroll(
+                write, local, keyframe_interval=opts.keyframe_interval)
+            scrolls.append(scroll)
+            return scroll
+
+        backends.register("stream", factory)
+        backends.select("stream")
+        try:
+            import_module(f"target.{opts.game}").main()
+        except (KeyboardInterrupt, SystemExit, ConnectionError):
+            pass
+
+    return scrolls[0] if scrolls else None
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    receiver = commands.add_parser(
+        "receive", help="show frames that are sent here")
+    source = receiver.add_mutually_exclusive_group()
+    source.add_argument(
+        "--listen", metavar="HOST:PORT", default=DEFAULT_ADDRESS,
+        help="accept a connection on this address (default: %(default)s)")
+    source.add_argument(
+        "--device", metavar="PATH",
+        help="read from this serial device instead")
+    receiver.add_argument(
+        "--backend", default=None,
+        help="where to show the frames (default: $DEVKIT_BACKEND or pygame)")
+
+    sender = commands.add_parser(
+        "send", help="run a game here and send its frames")
+    sender.add_argument(
+        "game", nargs="?", default="pong",
+        help="the module in target to run (default: %(default)s)")
+    destination = sender.add_mutually_exclusive_group()
+    destination.add_argument(
+        "--connect", metavar="HOST:PORT", default=DEFAULT_ADDRESS,
+        help="send to this address (default: %(default)s)")
+    destination.add_argument(
+        "--device", metavar="PATH",
+        help="write to this serial device instead")
+    sender.add_argument(
+        "--backend", default=None,
+        help=("where to show the game here, and read its buttons from"
+              " (default: $DEVKIT_BACKEND or pygame)"))
+    sender.add_argument(
+        "--keyframe-interval", metavar="N", type=int, default=60,
+        help="send every Nth frame whole (default: %(default)s)")
+    opts = parser.parse_args(args)
+
+    if opts.command == "receive":
+        run_receiver(opts)
+        return 0
+
+    scroll = run_sender(opts)
+    if scroll is not None:
+        encoder = scroll.encoder
+        frames = encoder.frames_sent
+        print(f"sent {frames:,} frames ({encoder.keyframes_sent:,} keyframes)"
+              f" in {encoder.bytes_sent:,} bytes,"
+              f" {encoder.bytes_sent / max(frames, 1):.1f} bytes per frame")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Stub for the `_thread` MicroPython module.
+
+The original module's source and documentation are here:
+ - https://github.com/micropython/micropython/blob/master/py/modthread.c
+ - https://github.com/micropython/micropython/blob/master/docs/library/_thread.rst
+
+MicroPython is "Copyright (c) 2013-2025 Damien P. George" and
+was released under the MIT License:
+ - https://github.com/micropython/micropython/blob/master/LICENSE
+ - https://opensource.org/license/MIT
+
+The documentation strings in this module were derived from the
+original module's documentation.
+
+CPython's `_thread` is built in, so it can't be shadowed by a shim
+the way `utime` is, and device code that imports `_thread` gets
+CPython's.  That's fine, because MicroPython's is a subset of it,
+and on the host the second "core" is a thread.  This module
+documents the subset, and is what host code should use to stay
+within it.
+"""
+import _thread as _cpython
+
+from collections.abc import Callable
+from typing import Any
+
+LockType = _cpython.LockType
+
+
+def start_new_thread(function: Callable[..., Any], args: tuple[Any, ...]) -> int:
+    """Start a new thread that calls `function` with `args`.  On the
+    RP2040 this runs on the second core, and only one can be started.
+    """
+    return _cpython.start_new_thread(function, args)
+
+
+def allocate_lock() -> LockType:
+    """Return a new lock.  Its `acquire(waitflag=1, timeout=-1)` and
+    `release()` methods work as CPython's do.
+    """
+    return _cpython.allocate_lock()
+
+
+def get_ident() -> int:
+    """Return the identifier of the current thread."""
+    return _cpython.get_ident()
+
+
+def stack_size(size: int = 0) -> int:
+    """Return the stack size used for new threads, setting it to
+    `size` if that's not zero.
+    """
+    return _cpython.stack_size(size)
+
+
+def exit() -> None:
+    """Raise `SystemExit`, which ends the current thread."""
+    raise SystemExit
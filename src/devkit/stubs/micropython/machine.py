@@ -0,0 +1,200 @@
+"""Stub for the `machine` MicroPython module.
+
+The original module's source and documentation are here:
+ - https://github.com/micropython/micropython/blob/master/ports/rp2/modmachine.c
+ - https://github.com/micropython/micropython/blob/master/docs/library/machine.rst
+
+MicroPython is "Copyright (c) 2013-2025 Damien P. George" and
+was released under the MIT License:
+ - https://github.com/micropython/micropython/blob/master/LICENSE
+ - https://opensource.org/license/MIT
+
+The documentation strings in this module were derived from the
+original module's documentation.
+
+On the host, input pins are driven with `drive()`, which the devkit's
+emulated Pico Scroll Packs call as their buttons are pressed and
+released.  Pin IRQ handlers run in the thread that drives the pin,
+and timer callbacks run in a thread of their own, so both can
+interrupt the main thread much as they would on the device.
+"""
+import threading
+
+from collections.abc import Callable
+from time import monotonic
+from typing import Any, Optional
+
+Handler = Callable[[Any], None]
+
+_interrupt = threading.Event()
+
+
+def idle() -> None:
+    """Gate the clock to the CPU until an interrupt happens, which
+    on the device is at most a millisecond away.
+    """
+    if _interrupt.wait(0.001):
+        _interrupt.clear()
+
+
+class _PinState:
+    def __init__(self) -> None:
+        self.level = 1
+        self.handler: Optional[Handler] = None
+        self.trigger = 0
+        self.pin: Optional["Pin"] = None
+
+
+_pins: dict[int, _PinState] = {}
+
+
+def drive(id: int, level: int) -> None:
+    """Host only: set the level of input pin `id`, calling its IRQ
+    handler if that's an edge it's waiting for.
+    """
+    state = _pins.setdefault(id, _PinState())
+    level = 1 if level else 0
+    if level == state.level:
+        return
+    state.level = level
+    edge = Pin.IRQ_RISING if level else Pin.IRQ_FALLING
+    if state.handler is not None and state.trigger & edge:
+        _interrupt.set()
+        state.handler(state.pin)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id: int, mode: int = -1, pull: int = -1,
+                 *, value: Optional[int] = None):
+        """Access the pin peripheral (GPIO pin) associated with `id`.
+        Unconnected input pins read as 1 on the host, as if pulled up.
+        """
+        self._id = id
+        self._state = _pins.setdefault(id, _PinState())
+        if value is not None:
+            self._state.level = 1 if value else 0
+
+    def value(self, x: Optional[int] = None) -> Optional[int]:
+        """Get the value of the pin if `x` isn't given, or set it to
+        `x` if it is.
+        """
+        if x is None:
+            return self._state.level
+        self._state.level = 1 if x else 0
+        return None
+
+    def __call__(self, x: Optional[int] = None) -> Optional[int]:
+        return self.value(x)
+
+    def on(self) -> None:
+        self.value(1)
+
+    def off(self) -> None:
+        self.value(0)
+
+    def irq(
+            self,
+            handler: Optional[Handler] = None,
+            trigger: int = IRQ_FALLING | IRQ_RISING,
+            hard: bool = False,
+    ) -> None:
+        """Configure an interrupt handler to be called when the
+        trigger source of the pin is active.  The handler is called
+        with the pin as its argument.  Passing `None` disables it.
+        """
+        state = self._state
+        state.handler = handler
+        state.trigger = trigger
+        state.pin = self
+
+    def __repr__(self) -> str:
+        return f"Pin({self._id})"
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id: int = -1, **kwargs: Any):
+        """Construct a new timer object.  If keyword arguments are
+        given they're passed to `init()`.
+        """
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(
+            self,
+            *,
+            mode: int = PERIODIC,
+            freq: Optional[float] = None,
+            period: Optional[int] = None,
+            callback: Optional[Handler] = None,
+    ) -> None:
+        """Start the timer, calling `callback` with the timer as its
+        argument after `period` milliseconds, or at `freq` Hz, once
+        if `mode` is `Timer.ONE_SHOT` or repeatedly if it's
+        `Timer.PERIODIC`.
+        """
+        self.deinit()
+        if freq is not None:
+            if freq <= 0:
+                raise ValueError(f"freq={freq}")
+            interval = 1 / freq
+        elif period is not None:
+            if period <= 0:
+                raise ValueError(f"period={period}")
+            interval = period / 1000
+        else:
+            raise ValueError("freq or period required")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._stop, mode, interval, callback),
+            name="machine.Timer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def deinit(self) -> None:
+        """Stop the timer."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(
+            self,
+            stop: threading.Event,
+            mode: int,
+            interval: float,
+            callback: Optional[Handler],
+    ) -> None:
+        deadline = monotonic() + interval
+        while not stop.wait(max(deadline - monotonic(), 0)):
+            _interrupt.set()
+            if callback is not None:
+                callback(self)
+            if mode == self.ONE_SHOT:
+                return
+            deadline += interval
+            if deadline < (now := monotonic()):
+                deadline = now  # fell behind; don't try to catch up
+
+
+__all__ = [  # not drive(), which is for the host
+    "Pin",
+    "Timer",
+    "idle",
+]
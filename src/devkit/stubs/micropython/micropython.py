@@ -0,0 +1,159 @@
+"""Stub for the `micropython` MicroPython module.
+
+The original module's source and documentation are here:
+ - https://github.com/micropython/micropython/blob/master/py/modmicropython.c
+ - https://github.com/micropython/micropython/blob/master/docs/library/micropython.rst
+
+MicroPython is "Copyright (c) 2013-2025 Damien P. George" and
+was released under the MIT License:
+ - https://github.com/micropython/micropython/blob/master/LICENSE
+ - https://opensource.org/license/MIT
+
+The documentation strings in this module were derived from the
+original module's documentation.
+
+On CPython the code emitter decorators do nothing.  Locking the heap
+uses `devkit.allocations` to watch the code that runs while it's
+locked, so code that's meant to be allocation-free can be checked on
+the host.  The device raises `MemoryError` at the allocation, but
+here it's raised by the `heap_unlock` that unlocks the heap.  (An
+exception from a trace function would stop CPython tracing, and
+would skip the `heap_unlock` in a `finally` block.)  CPython makes
+some objects MicroPython doesn't, like iterators for `for` loops, so
+it sees some allocations the device wouldn't.  Tracking allocations
+needs CPython 3.11, and on other interpreters locking the heap only
+counts how deeply it's locked.
+"""
+import sys
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from devkit.allocations import AllocationTracker
+
+T = TypeVar("T")
+
+# Whether floats are objects on the heap, as they are with
+# MicroPython's default object representation.  If not, code that
+# locks the heap may make float temporaries.  This is for the host,
+# so it isn't exported to the `micropython` shim: set it here, on
+# `devkit.stubs.micropython.micropython`.
+BOXED_FLOATS = True
+
+
+def const(expr: T) -> T:
+    """Used to declare that the expression is a constant so that the
+    compiler can optimise it.
+    """
+    return expr
+
+
+def native(func: Callable[..., T]) -> Callable[..., T]:
+    """Make the compiler emit native CPU opcodes rather than bytecode."""
+    return func
+
+
+def viper(func: Callable[..., T]) -> Callable[..., T]:
+    """Make the compiler emit native CPU opcodes using the viper code
+    emitter, which also supports type hints for faster integer and
+    pointer operations.
+    """
+    return func
+
+
+def alloc_emergency_exception_buf(size: int) -> None:
+    """Allocate `size` bytes of RAM for the emergency exception buffer,
+    so an exception can be created, with a traceback, when memory
+    can't otherwise be allocated, for example in an interrupt handler.
+    """
+
+
+def mem_info(verbose: Optional[object] = None) -> None:
+    """Print information about currently used memory.
+
+    On the host, this is what `tracemalloc` has seen, if it's tracing.
+    """
+    import tracemalloc  # only when needed, it's slow to import
+
+    if not tracemalloc.is_tracing():
+        print("GC: not tracing (start tracemalloc to see memory use)")
+        return
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"GC: used: {current}, peak: {peak}")
+
+
+_heap_lock: Optional["AllocationTracker"] = None
+_heap_lock_depth = 0
+
+
+def heap_lock() -> None:
+    """Lock the heap.  When locked, no memory allocation can occur and
+    a `MemoryError` will be raised if any heap allocation is attempted.
+
+    These functions can be nested, and `heap_unlock` must be called
+    the same number of times as `heap_lock` to unlock the heap.
+    """
+    global _heap_lock, _heap_lock_depth
+    if not _heap_lock_depth:
+        from devkit.allocations import (
+            SUPPORTED, TARGET_PATHS, AllocationTracker)
+
+        if SUPPORTED:
+            caller = sys._getframe(1)
+            tracker = AllocationTracker(
+                paths=TARGET_PATHS + (caller.f_code.co_filename,),
+                floats=BOXED_FLOATS)
+            tracker.start(caller)
+            _heap_lock = tracker
+    _heap_lock_depth += 1
+
+
+def heap_unlock() -> int:
+    """Unlock the heap, returning the lock depth after unlocking, so
+    zero means the heap is unlocked.
+
+    On the host, raise `MemoryError` if anything allocated while the
+    heap was locked.
+    """
+    global _heap_lock, _heap_lock_depth
+    if _heap_lock_depth:
+        _heap_lock_depth -= 1
+    if not _heap_lock_depth and _heap_lock is not None:
+        tracker, _heap_lock = _heap_lock, None
+        tracker.stop()
+        if tracker.lines:
+            filename, lineno = next(iter(tracker.lines))
+            raise MemoryError(
+                "memory allocation failed, heap is locked"
+                f" ({filename}:{lineno})")
+    return _heap_lock_depth
+
+
+def heap_locked() -> int:
+    """Return the heap lock depth, so nonzero means it's locked."""
+    return _heap_lock_depth
+
+
+def kbd_intr(chr: int) -> None:
+    """Set the character that will raise a `KeyboardInterrupt`
+    exception.  By default this is set to 3 during script execution,
+    corresponding to Ctrl-C.  Passing -1 to this function will disable
+    capture of Ctrl-C, and passing 3 will restore it.
+
+    On the host, Ctrl-C is handled by the terminal, so this does
+    nothing.
+    """
+
+
+__all__ = [  # not BOXED_FLOATS, which is for the host
+    "alloc_emergency_exception_buf",
+    "const",
+    "heap_lock",
+    "heap_locked",
+    "heap_unlock",
+    "kbd_intr",
+    "mem_info",
+    "native",
+    "viper",
+]
@@ -0,0 +1 @@
+from devkit.stubs.micropython.machine import *  # noqa: F401,F403
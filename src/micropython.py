@@ -0,0 +1 @@
+from devkit.stubs.micropython.micropython import *  # noqa: F401,F403
@@ -1 +1 @@
-from devkit.pygame.picoscroll import *  # noqa: F401,F403
+from devkit.backends import PicoScroll  # noqa: F401
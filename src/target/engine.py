@@ -1,11 +1,28 @@
+import _thread
+import micropython
+
+from array import array
+from heapq import heapify, heappop, heappush
+from machine import Pin, Timer, idle
 from picoscroll import PicoScroll as _PicoScroll
 from utime import ticks_us, ticks_diff, sleep_us
 
 _S_TO_US = 1_000_000
 _US_TO_S = 1 / _S_TO_US
 
+# The GPIO pins the Pico Scroll Pack's buttons are connected to,
+# indexed by button.  They're pulled up, and pressing a button pulls
+# its pin low.
+BUTTON_PINS = (12, 13, 14, 15)
+
+# Scheduler times are kept below this so they stay small ints on
+# the device, where ticks_us() wraps after 2**30 microseconds.
+_REBASE_US = 1 << 28
+
 
 class RateLimiter:
+    __slots__ = ("_min_interval_us", "_wait_limit_us", "_last_tick")
+
     def __init__(self, max_rate=None):
         self.max_rate = max_rate
         self._last_tick = None
@@ -42,6 +59,8 @@ class RateLimiter:
         if not value or value <= 0:
             value = 0
         self._min_interval_us = value
+        # for integer-only waiting; a limit under 1us still limits
+        self._wait_limit_us = max(1, round(value)) if value else 0
 
     def wait(self):
         return self.wait_us() * _US_TO_S
@@ -53,21 +72,20 @@ class RateLimiter:
         return this_tick
 
     def _maybe_wait(self):
-        min_interval = self._min_interval_us
+        min_interval = self._wait_limit_us
         if not min_interval:
             return
         last_tick = self._last_tick
-        if not last_tick:
+        if last_tick is None:
             return
-        this_tick = ticks_us()
-        interval = ticks_diff(this_tick, last_tick)
-        time_to_wait = round(min_interval - interval)
-        if time_to_wait < 0:
-            return
-        sleep_us(time_to_wait)
+        time_to_wait = min_interval - ticks_diff(ticks_us(), last_tick)
+        if time_to_wait > 0:
+            sleep_us(time_to_wait)
 
 
 class FrameTicker:
+    __slots__ = ("_limiter", "_tick_due")
+
     def __init__(self, *, limiter=None, max_framerate=60):
         self._limiter = limiter or RateLimiter()
         self.max_framerate = max_framerate
@@ -81,43 +99,614 @@ class FrameTicker:
         self._limiter.max_rate = max_framerate
 
     def run(self):
-        last_time = self._limiter.wait()
+        wait_us = self._limiter.wait_us
+        last_time = wait_us()
         while True:
-            time = self._limiter.wait()
-            self.tick(time - last_time)
+            time = wait_us()
+            self.tick(ticks_diff(time, last_time) / _S_TO_US)
             last_time = time
 
+    def run_with_timer(self):
+        """Like `run`, but paced by a hardware timer at the maximum
+        frame rate, with the CPU idling between ticks.
+        """
+        max_framerate = self.max_framerate
+        if not max_framerate:
+            raise ValueError("a maximum frame rate is required")
+        self._tick_due = False
+        timer = Timer(mode=Timer.PERIODIC, freq=max_framerate,
+                      callback=self._on_timer)
+        try:
+            last_time = ticks_us()
+            while True:
+                while not self._tick_due:
+                    idle()
+                self._tick_due = False
+                time = ticks_us()
+                self.tick(ticks_diff(time, last_time) / _S_TO_US)
+                last_time = time
+        finally:
+            timer.deinit()
+
+    def _on_timer(self, timer):
+        self._tick_due = True
+
+
+class Scheduler:
+    """Run tasks at rates of their own, sleeping until the next one
+    is due.  Each task is called with the time in seconds since it
+    was last called, like `FrameTicker.tick`.  A task that falls a
+    whole interval behind skips the runs it missed rather than
+    running repeatedly to catch up.
+    """
+
+    __slots__ = ("_tasks", "_seq", "_last_ticks", "_now")
+
+    def __init__(self):
+        # heap of [deadline_us, seq, interval_us, last_run_us, func]
+        self._tasks = []
+        self._seq = 0
+        self._last_ticks = ticks_us()
+        self._now = 0
+
+    def add(self, func, rate):
+        """Call `func` `rate` times a second, starting now.  Return
+        a task that can be passed to `remove`.
+        """
+        if not rate or rate <= 0:
+            raise ValueError(f"rate={rate}")
+        now = self._update_now()
+        task = [now, self._seq, round(_S_TO_US / rate), now, func]
+        self._seq += 1
+        heappush(self._tasks, task)
+        return task
+
+    def remove(self, task):
+        tasks = self._tasks
+        for i in range(len(tasks)):
+            if tasks[i] is task:
+                break
+        else:
+            raise ValueError("task not scheduled")
+        last = tasks.pop()
+        if last is not task:
+            tasks[i] = last
+            heapify(tasks)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def run_pending(self):
+        """Run the tasks that are due.  Return the number of
+        microseconds until the next one is, or None if there are
+        no tasks.
+        """
+        tasks = self._tasks
+        now = self._update_now()
+        while tasks:
+            task = tasks[0]
+            deadline = task[0]
+            if deadline > now:
+                return deadline - now
+            heappop(tasks)
+            interval = task[2]
+            delta_us = now - task[3]
+            task[3] = now
+            deadline += interval
+            if deadline <= now:
+                deadline = now + interval
+            task[0] = deadline
+            heappush(tasks, task)
+            task[4](delta_us * _US_TO_S)
+            now = self._update_now()
+        return None
+
+    def run(self):
+        """Run tasks until there are none."""
+        while True:
+            wait_us = self.run_pending()
+            if wait_us is None:
+                return
+            sleep_us(wait_us)
+
+    def _update_now(self):
+        ticks = ticks_us()
+        now = self._now + ticks_diff(ticks, self._last_ticks)
+        self._last_ticks = ticks
+        if now >= _REBASE_US:
+            for task in self._tasks:
+                task[0] -= now
+                task[3] -= now
+            now = 0
+        self._now = now
+        return now
+
 
 class Display:
-    def __init__(self, provider, gamma=1):
+    """Draws on a provider, keeping a shadow of the frame being drawn
+    and of the one last shown, so frames that are the same as the one
+    before aren't shown again.  On the device, showing a frame is an
+    I2C transfer of the whole matrix.
+
+    If `buffered` is true, drawing only touches the shadow, and frames
+    go to the provider with one `set_pixels()` call as they're shown,
+    so unchanged frames cost the provider nothing at all.
+
+    Levels are gamma-corrected as they're drawn, unless the provider
+    has a `negotiate_gamma(gamma)` method that returns true, in which
+    case it applies the curve itself and levels are sent as drawn.
+    The devkit's emulators do this, so they can fuse the curve with
+    their own into one lookup, rather than undoing it.
+    """
+
+    __slots__ = (
+        "_gamma_lut", "_gamma", "_negotiate_gamma", "width", "height", "size",
+        "_frame", "_shown", "_blank", "_is_shown", "_counts",
+        "_set_pixel", "_set_pixels", "_clear", "_show",
+        "provider", "buffered", "set_pixel",
+    )
+
+    def __init__(self, provider, gamma=1, buffered=False):
+        self.provider = provider
+        self._gamma_lut = bytearray(256)
+        self._negotiate_gamma = getattr(provider, "negotiate_gamma", None)
         self.gamma = gamma
 
         self.width = provider.get_width()
         self.height = provider.get_height()
         self.size = self.width, self.height
 
+        self._frame = bytearray(self.width * self.height)
+        self._shown = bytearray(len(self._frame))
+        self._blank = bytes(len(self._frame))
+        self._is_shown = False
+        # frames shown, and skipped; in an array, because growing ints
+        # are allocated on the host, which would hide real allocations
+        self._counts = array("I", (0, 0))
+
         self._set_pixel = provider.set_pixel
-        self.clear = provider.clear
-        self.show = provider.show
+        self._set_pixels = provider.set_pixels
+        self._clear = provider.clear
+        self._show = provider.show
+        self.buffered = buffered
+        if buffered:
+            self.set_pixel = self._buffer_pixel
+        else:
+            self.set_pixel = self._draw_pixel
+
+    def set_pixels(self, image):
+        frame = self._frame
+        if len(image) != len(frame):
+            raise ValueError(f"{len(image)} pixels, not {len(frame)}")
+        lut = self._gamma_lut
+        for i in range(len(frame)):
+            frame[i] = lut[image[i]]
+        if not self.buffered:
+            self._set_pixels(frame)
+
+    def _set_levels(self, levels):
+        """Set every pixel to `levels`, which are already corrected."""
+        self._frame[:] = levels
+        if not self.buffered:
+            self._set_pixels(levels)
+
+    def clear(self):
+        self._frame[:] = self._blank
+        if not self.buffered:
+            self._clear()
+
+    @property
+    def frames_shown(self):
+        return self._counts[0]
+
+    @property
+    def frames_skipped(self):
+        return self._counts[1]
+
+    def show(self):
+        counts = self._counts
+        counts[0] += 1
+        frame = self._frame
+        shown = self._shown
+        if self._is_shown and frame == shown:
+            counts[1] += 1
+            return
+        if self.buffered:
+            self._set_pixels(frame)
+        self._show()
+        shown[:] = frame
+        self._is_shown = True
+
+    @property
+    def gamma(self):
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, gamma):
+        self._gamma = gamma
+        lut = self._gamma_lut
+        negotiate = self._negotiate_gamma
+        if negotiate is not None and negotiate(gamma):
+            for v in range(256):
+                lut[v] = v
+            return
+        for v in range(256):
+            lut[v] = round(255 * ((v / 255) ** gamma))
+
+    # Fractional levels are rounded to the nearest entry of the lookup
+    # table.  Integer levels index it directly, since adding 0.5 to
+    # them would make a float on the heap.
+
+    @micropython.native
+    def _draw_pixel(self, x, y, v):
+        if type(v) is not int:
+            v = int(v + 0.5)
+        level = self._gamma_lut[v]
+        self._frame[y * self.width + x] = level
+        self._set_pixel(x, y, level)
+
+    @micropython.native
+    def _buffer_pixel(self, x, y, v):
+        if type(v) is not int:
+            v = int(v + 0.5)
+        self._frame[y * self.width + x] = self._gamma_lut[v]
+
+    def canvas(self, width, height=None):
+        return Canvas(self, width, height)
+
+
+class Canvas:
+    """An image bigger than the display, shown through a viewport
+    whose top-left corner is at (x, y).  Scrolling moves the viewport,
+    and showing copies what's in it to the display, so nothing needs
+    redrawing.  Pixels are gamma-corrected as they're drawn, using the
+    display's gamma at the time.
+    """
+
+    __slots__ = (
+        "display", "width", "height", "size", "x", "y",
+        "_pixels", "_view", "_blank_row", "_frame",
+    )
+
+    def __init__(self, display, width, height=None):
+        height = height or display.height
+        if width < display.width or height < display.height:
+            raise ValueError(f"{width}x{height} is smaller than the display")
+        self.display = display
+        self.width = width
+        self.height = height
+        self.size = width, height
+        self.x = self.y = 0
+
+        self._pixels = bytearray(width * height)
+        self._view = memoryview(self._pixels)
+        self._blank_row = bytes(width)
+        self._frame = bytearray(display.width * display.height)
 
+    def clear(self):
+        pixels = self._pixels
+        blank_row = self._blank_row
+        width = self.width
+        for start in range(0, len(pixels), width):
+            pixels[start:start + width] = blank_row
+
+    @micropython.native
     def set_pixel(self, x, y, v):
-        v = round(255 * ((v / 255) ** self.gamma))
-        self._set_pixel(x, y, v)
+        if type(v) is not int:
+            v = int(v + 0.5)  # rounded, as for Display.set_pixel
+        self._pixels[y * self.width + x] = self.display._gamma_lut[v]
+
+    def draw_bitmap_1d(self, bitmap, v, x=0, y=0):
+        """Draw a bitmap stored as the 7 least significant bits of
+        each byte, top-down, as for `show_bitmap_1d`, at (x, y).  Set
+        bits are drawn at brightness `v`; clear bits are left alone.
+        """
+        pixels = self._pixels
+        width = self.width
+        level = self.display._gamma_lut[int(v + 0.5)]
+        skip = max(-y, 0)  # rows above the top of the canvas
+        rows = range(y + skip, min(y + 7, self.height))
+        for i in range(len(bitmap)):
+            col = x + i
+            if col < 0 or col >= width:
+                continue
+            bits = bitmap[i] >> skip
+            for row in rows:
+                if bits & 1:
+                    pixels[row * width + col] = level
+                bits >>= 1
+
+    def scroll_to(self, x, y=0):
+        """Move the viewport, keeping it on the canvas."""
+        display = self.display
+        self.x = min(max(int(x), 0), self.width - display.width)
+        self.y = min(max(int(y), 0), self.height - display.height)
+
+    def scroll_by(self, dx, dy=0):
+        self.scroll_to(self.x + dx, self.y + dy)
+
+    def show(self):
+        """Copy what's in the viewport to the display, and show it."""
+        display = self.display
+        frame = self._frame
+        view = self._view
+        width = self.width
+        frame_width = display.width
+        start = self.y * width + self.x
+        for row in range(0, len(frame), frame_width):
+            frame[row:row + frame_width] = view[start:start + frame_width]
+            start += width
+        display._set_levels(frame)
+        display.show()
+
+
+class RLEBitmap:
+    """A bitmap kept run-length compressed, as `devkit.assets` packs
+    `.rle` images, and decoded a few columns at a time, so a long
+    message or animation takes a fraction of the memory it would
+    decompressed.
+
+    The data is a 4-byte header, with the kind (0 for 1-bit, 1 for
+    greyscale), the height, and the width as a little-endian 16-bit
+    number, followed by the columns, left to right, packed.  A 1-bit
+    column is one byte, top row in the least significant bit, as for
+    `show_bitmap_1d`; a greyscale column is a byte per row, top-down.
+    Packed, the columns are a series of packets, each a control byte
+    `n` then either `n + 1` literal bytes, if `n` is less than 128, or
+    one byte repeated `n - 125` times.
+
+    A seek index, made when the bitmap is, records where the packet
+    holding every `INDEX_EVERY`th column starts, so decoding from any
+    offset starts at most that many columns back.
+    """
+
+    INDEX_EVERY = 32
+
+    __slots__ = (
+        "width", "height", "grey", "_data", "_view", "_depth",
+        "_index_pos", "_index_start", "_buf",
+    )
+
+    def __init__(self, data):
+        kind, height = data[0], data[1]
+        if kind > 1:
+            raise ValueError(f"kind={kind}")
+        self.grey = grey = kind == 1
+        self.height = height
+        self.width = width = data[2] | (data[3] << 8)
+        self._data = data
+        self._view = memoryview(data)
+        self._depth = depth = height if grey else 1
+        self._buf = None
+
+        step = self.INDEX_EVERY * depth
+        end = width * depth
+        typecode = "H" if max(len(data), end) <= 0xffff else "I"
+        index_pos = self._index_pos = array(typecode)
+        index_start = self._index_start = array(typecode)
+        pos, start = 4, 0
+        while start < end and pos < len(data):
+            n = data[pos]
+            if n < 128:
+                count, size = n + 1, n + 2
+            else:
+                count, size = n - 125, 2
+            while len(index_pos) * step < start + count:
+                index_pos.append(pos)
+                index_start.append(start)
+            pos += size
+            start += count
+        if start != end or pos != len(data):
+            raise ValueError("bad packets")
+
+    def decode(self, offset, out):
+        """Fill `out` with the columns from `offset` onwards, laid out
+        as in the header's description.  Columns off either end of the
+        bitmap are blank.
+        """
+        depth = self._depth
+        start = offset * depth
+        end = start + len(out)
+        lo = max(start, 0)
+        hi = min(end, self.width * depth)
+        if lo >= hi:
+            lo = hi = end
+        for i in range(lo - start):
+            out[i] = 0
+        for i in range(hi - start, len(out)):
+            out[i] = 0
+        if lo == hi:
+            return
+
+        data = self._data
+        view = self._view
+        chunk = lo // (self.INDEX_EVERY * depth)
+        pos = self._index_pos[chunk]
+        at = self._index_start[chunk]
+        while at < hi:
+            n = data[pos]
+            if n < 128:
+                count = n + 1
+                next_at = at + count
+                if next_at > lo:
+                    a = max(at, lo)
+                    b = min(next_at, hi)
+                    src = pos + 1 + a - at
+                    out[a - start:b - start] = view[src:src + b - a]
+                pos += count + 1
+            else:
+                count = n - 125
+                next_at = at + count
+                if next_at > lo:
+                    v = data[pos + 1]
+                    for i in range(max(at, lo) - start,
+                                   min(next_at, hi) - start):
+                        out[i] = v
+                pos += 2
+            at = next_at
+
+    def draw(self, display, offset, v=255):
+        """Draw the columns from `offset` onwards across `display`.
+        Set bits of a 1-bit bitmap are drawn at brightness `v`, and
+        greyscale pixels at their own level; blank pixels are left
+        alone, as `Canvas.draw_bitmap_1d` does.
+        """
+        width = display.width
+        depth = self._depth
+        buf = self._buf
+        if buf is None or len(buf) != width * depth:
+            buf = self._buf = bytearray(width * depth)
+        self.decode(offset, buf)
+
+        set_pixel = display.set_pixel
+        rows = range(min(self.height, display.height))
+        if self.grey:
+            for x in range(width):
+                i = x * depth
+                for y in rows:
+                    level = buf[i + y]
+                    if level:
+                        set_pixel(x, y, level)
+            return
+        for x in range(width):
+            bits = buf[x]
+            for y in rows:
+                if bits & 1:
+                    set_pixel(x, y, v)
+                bits >>= 1
+
+
+class Presenter:
+    """Stands between a display and its provider, pushing frames to
+    the provider from a second thread, which on the device runs on
+    the second core.  Drawing goes into a back buffer, and `show()`
+    only copies that to the front buffer under a lock, so the cost
+    of the provider's `show()` leaves the main loop.  Frames shown
+    faster than they can be pushed are dropped.
+
+    Buttons are still read from the main thread, so this is for
+    providers whose buttons can be read while their display is being
+    updated: the Pico Scroll Pack, and the devkit's headless and
+    threaded emulators, but not its single-threaded pygame one.
+    """
+
+    POLL_US = 1000
+
+    __slots__ = (
+        "_provider", "_width", "_height", "_back", "_front", "_blank",
+        "_lock", "_is_fresh", "_running", "_stopped",
+        "frames_shown", "frames_pushed",
+    )
+
+    def __init__(self, provider):
+        self._provider = provider
+        self._width = width = provider.get_width()
+        self._height = provider.get_height()
+        self._back = bytearray(width * self._height)
+        self._front = bytearray(len(self._back))
+        self._blank = bytes(len(self._back))
+        self._lock = _thread.allocate_lock()
+        self._is_fresh = False
+        self._running = True
+        self._stopped = _thread.allocate_lock()
+        self._stopped.acquire()
+        self.frames_shown = 0
+        self.frames_pushed = 0
+        _thread.start_new_thread(self._run, ())
+
+    def get_width(self):
+        return self._width
+
+    def get_height(self):
+        return self._height
+
+    def set_pixel(self, x, y, level):
+        self._back[y * self._width + x] = level
+
+    def set_pixels(self, image):
+        self._back[:] = image
+
+    def clear(self):
+        self._back[:] = self._blank
+
+    def show(self):
+        with self._lock:
+            self._front[:] = self._back
+            self._is_fresh = True
+        self.frames_shown += 1
+
+    def is_pressed(self, button):
+        return self._provider.is_pressed(button)
+
+    def negotiate_gamma(self, gamma):
+        negotiate = getattr(self._provider, "negotiate_gamma", None)
+        return negotiate is not None and negotiate(gamma)
+
+    def close(self):
+        """Stop the second thread, once it's pushed the last frame."""
+        self._running = False
+        self._stopped.acquire()
+        self._stopped.release()
+
+    def _run(self):
+        provider = self._provider
+        lock = self._lock
+        front = self._front
+        try:
+            while self._running or self._is_fresh:
+                if not self._is_fresh:
+                    sleep_us(self.POLL_US)
+                    continue
+                with lock:
+                    provider.set_pixels(front)
+                    self._is_fresh = False
+                provider.show()
+                self.frames_pushed += 1
+        finally:
+            self._stopped.release()
 
 
 class Buttons:
-    def __init__(self, provider, **buttons):
-        self._all = []
-        for attr, code in buttons.items():
-            button = Button(provider, code)
-            setattr(self, attr, button)
-            self._all.append(button)
+    """Buttons by name, as attributes: `buttons.A` and so on."""
+
+    __slots__ = ("_by_name", "_all")
+
+    def __init__(self, provider, irq=False, **buttons):
+        # An emulator that only reads its input as its buttons are
+        # polled would never see a press that's waited for by IRQ.
+        if irq and getattr(provider, "buttons_are_polled", False):
+            raise ValueError("irq buttons need an unpolled provider")
+        by_name = {}
+        for name, code in buttons.items():
+            if irq:
+                button = IRQButton(BUTTON_PINS[code])
+            else:
+                button = Button(provider, code)
+            by_name[name] = button
+        self._by_name = by_name
+        self._all = tuple(by_name.values())
+
+    def __getattr__(self, name):
+        if name == "_by_name":
+            raise AttributeError(name)  # before __init__, e.g. copying
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise AttributeError(name) from None
 
     def __iter__(self):
         return iter(self._all)
 
+    def any_pressed(self):
+        for button in self._all:
+            if button.is_pressed():
+                return True
+        return False
+
 
 class Button:
+    __slots__ = ("_provider", "_button")
+
     def __init__(self, provider, code):
         self._provider = provider
         self._button = code
@@ -126,12 +715,43 @@ class Button:
         return self._provider.is_pressed(self._button)
 
 
+class IRQButton:
+    """A button that's watched by a pin interrupt rather than polled,
+    so reading it doesn't touch the hardware, and it reads as pressed
+    at least once for every press, however short.
+    """
+
+    __slots__ = ("_down", "_latched")
+
+    def __init__(self, pin_id):
+        pin = Pin(pin_id, Pin.IN, Pin.PULL_UP)
+        self._down = not pin.value()
+        self._latched = False
+        pin.irq(self._on_edge, Pin.IRQ_FALLING | Pin.IRQ_RISING)
+
+    def _on_edge(self, pin):
+        if pin.value():
+            self._down = False
+        else:
+            self._down = self._latched = True
+
+    def is_pressed(self):
+        pressed = self._down or self._latched
+        self._latched = False
+        return pressed
+
+
 class PicoScroll:
-    def __init__(self, scroll=None, gamma=3):
+    __slots__ = ("presenter", "display", "buttons")
+
+    def __init__(self, scroll=None, gamma=3, irq_buttons=False,
+                 presenter=False):
         scroll = scroll or _PicoScroll()
-        self.display = Display(scroll, gamma)
+        self.presenter = Presenter(scroll) if presenter else None
+        self.display = Display(self.presenter or scroll, gamma)
         self.buttons = Buttons(
             scroll,
+            irq=irq_buttons,
             A=scroll.BUTTON_A,
             B=scroll.BUTTON_B,
             X=scroll.BUTTON_X,
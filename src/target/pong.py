@@ -1,3 +1,4 @@
+import micropython
 import random
 
 from math import atan2, cos, pi, sin, sqrt
@@ -17,12 +18,19 @@ ALL_BUTTONS_UP = object()
 class Game(FrameTicker):
     DEBOUNCE = 0.25
 
+    __slots__ = (
+        "display", "buttons", "_set_pixel", "players", "ball",
+        "state", "draw_ball", "draw_field", "draw_players",
+        "animation", "countdown", "_awaiting_interaction", "_debounce",
+    )
+
     def __init__(self, scroll=None, **kwargs):
         super().__init__(**kwargs)
 
         scroll = scroll or PicoScroll()
         self.display = scroll.display
         self.buttons = buttons = scroll.buttons
+        self._set_pixel = self.display.set_pixel
 
         self.players = [
             Player(buttons.A, buttons.B, 0),
@@ -40,6 +48,16 @@ class Game(FrameTicker):
         self.animation = None
         self.wait_for_button_press()
 
+    def serve(self):
+        """Put a new ball in play."""
+        self.state = RUNNING
+        self.draw_ball = True
+        self.draw_field = True
+        self.draw_players = True
+        self.animation = None
+        self._awaiting_interaction = None
+        self.ball.reset()
+
     def start_countdown(self, duration=2):
         self.state = COUNTDOWN
         self.draw_ball = False
@@ -79,13 +97,13 @@ class Game(FrameTicker):
             self._debounce = None
 
         if self._awaiting_interaction is ANY_BUTTON_DOWN:
-            if not any(b.is_pressed() for b in self.buttons):
+            if not self.buttons.any_pressed():
                 return
             self._awaiting_interaction = ALL_BUTTONS_UP
             return
 
         if self._awaiting_interaction is ALL_BUTTONS_UP:
-            if any(b.is_pressed() for b in self.buttons):
+            if self.buttons.any_pressed():
                 return
             self._awaiting_interaction = None
             if self.state is PLAYER_SCORED:
@@ -101,11 +119,7 @@ class Game(FrameTicker):
             self.countdown -= delta_t
             if self.countdown > 0:
                 return
-            self.animation = None
-            self.ball.reset()
-            self.draw_ball = True
-            self.draw_field = True
-            self.state = RUNNING
+            self.serve()
             return
 
         ball = self.ball
@@ -117,7 +131,7 @@ class Game(FrameTicker):
 
     def _draw(self):
         d = self.display
-        set_pixel = d.set_pixel
+        set_pixel = self._set_pixel
         d.clear()
         try:
             if self.animation:
@@ -136,6 +150,8 @@ class Game(FrameTicker):
 
 
 class Player:
+    __slots__ = ("x", "y", "up", "down", "speed", "vy")
+
     def __init__(self, up_button, down_button, column):
         self.x = column
         self.y = 3.5  # bat at [2.5..4.5)
@@ -186,23 +202,125 @@ class Player:
 
 
 class Ball:
-    def __init__(self, radius=0.5, max_english=pi / 5):
+    __slots__ = (
+        "radius", "max_english", "speedup", "spin_decay",
+        "_x", "_y", "_vx", "_vy", "spin", "_t_event",
+    )
+
+    def __init__(self, radius=0.5, max_english=pi / 5, speedup=0.02,
+                 spin_decay=1):
         self.radius = radius
         self.max_english = max_english  # do not let it turn around!
+        self.speedup = speedup
+        self.spin_decay = spin_decay
         self.reset()
 
     def reset(self, speed=10):
-        self.x = 8.5  # ball at [8..9)
+        self._x = 8.5  # ball at [8..9)
         margin = self.radius + 0.1
-        self.y = random.uniform(margin, 7 - margin)
-        rx = random.choice((0, 16)) - self.x
-        ry = random.uniform(-6, 12) - self.y
+        self._y = random.uniform(margin, 7 - margin)
+        rx = random.choice((0, 16)) - self._x
+        ry = random.uniform(-6, 12) - self._y
         scale = speed / sqrt(rx * rx + ry * ry)
-        self.vx = rx * scale
-        self.vy = ry * scale
+        self._vx = rx * scale
+        self._vy = ry * scale
         self.spin = 0
+        self._predict()
 
     def update(self, delta_t, players):
+        if delta_t < self._t_event:
+            # nothing to hit this frame
+            self._x += self._vx * delta_t
+            self._y += self._vy * delta_t
+            self._t_event -= delta_t
+        else:
+            self._sweep(delta_t, players)
+            self._predict()
+
+        k = min(delta_t, 0.1)
+        self.spin *= (1 - k * self.spin_decay)  # decay
+        kk = 1 + k * self.speedup
+        self._vx *= kk  # faster!
+        self._vy *= kk
+        self._t_event /= kk
+
+    # Setting the position or velocity from outside invalidates the
+    # prediction, so the next update sweeps.
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, x):
+        self._x = x
+        self._t_event = 0
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, y):
+        self._y = y
+        self._t_event = 0
+
+    @property
+    def vx(self):
+        return self._vx
+
+    @vx.setter
+    def vx(self, vx):
+        self._vx = vx
+        self._t_event = 0
+
+    @property
+    def vy(self):
+        return self._vy
+
+    @vy.setter
+    def vy(self, vy):
+        self._vy = vy
+        self._t_event = 0
+
+    def invalidate(self):
+        self._t_event = 0
+
+    def _predict(self):
+        # Time until the ball next reaches a wall or a paddle plane.
+        # Whether a paddle is actually there is decided by `_sweep`
+        # when the time comes, so moving paddles don't affect this.
+        vx = self._vx
+        if -0.1 < vx < 0.1:
+            self._t_event = 0  # let `_sweep` nudge it
+            return
+
+        radius = self.radius
+        x = self._x
+        y = self._y
+        top = radius
+        bottom = 7 - radius
+        left = 1 + radius
+        right = 16 - radius
+
+        if x < left or x > right or y < top or y > bottom:
+            self._t_event = 0  # behind a paddle, or out of bounds
+            return
+
+        if vx < 0:
+            t = (left - x) / vx
+        else:
+            t = (right - x) / vx
+
+        vy = self._vy
+        if vy < 0:
+            t = min(t, (top - y) / vy)
+        elif vy > 0:
+            t = min(t, (bottom - y) / vy)
+
+        self._t_event = t
+
+    def _sweep(self, delta_t, players):
         radius = self.radius
         # top and bottom edges of screen
         top = radius
@@ -214,25 +332,25 @@ class Ball:
         dt = delta_t
         while dt > 0:
             # always be moving towards a player
-            chk_vx = abs(self.vx)
+            chk_vx = abs(self._vx)
             if chk_vx < 0.05:
-                self.vx = random.uniform(-1, 1)
+                self._vx = random.uniform(-1, 1)
             elif chk_vx < 0.1:
-                self.vx *= 1.1
+                self._vx *= 1.1
 
-            dx = self.vx * dt
-            dy = self.vy * dt
+            dx = self._vx * dt
+            dy = self._vy * dt
 
-            x = self.x + dx
-            y = self.y + dy
+            x = self._x + dx
+            y = self._y + dy
 
             # top edge?
             excess_dy = y - top
             if excess_dy < 0:
                 excess_dt = dt * excess_dy / dy
-                self.x += self.vx * (dt - excess_dt)
-                self.y = top
-                self.vy *= -1
+                self._x += self._vx * (dt - excess_dt)
+                self._y = top
+                self._vy *= -1
                 self._english()
                 dt = excess_dt
                 continue
@@ -241,9 +359,9 @@ class Ball:
             excess_dy = y - bottom
             if excess_dy > 0:
                 excess_dt = dt * excess_dy / dy
-                self.x += self.vx * (dt - excess_dt)
-                self.y = bottom
-                self.vy *= -1
+                self._x += self._vx * (dt - excess_dt)
+                self._y = bottom
+                self._vy *= -1
                 self._english()
                 dt = excess_dt
                 continue
@@ -252,16 +370,16 @@ class Ball:
             excess_dx = x - left
             if excess_dx < 0:
                 excess_dt = dt * excess_dx / dx
-                hit_y = self.y + self.vy * (dt - excess_dt)
+                hit_y = self._y + self._vy * (dt - excess_dt)
                 player = players[0]
                 if player.is_at(hit_y):
-                    self.x = left
-                    self.y = hit_y
-                    self.vx *= -1
+                    self._x = left
+                    self._y = hit_y
+                    self._vx *= -1
                     self.spin -= player.vy
                     self._english()
-                    if self.vx < 0:
-                        self.vx *= -1  # move AWAY from the player!
+                    if self._vx < 0:
+                        self._vx *= -1  # move AWAY from the player!
                     dt = excess_dt
                     continue
 
@@ -269,29 +387,23 @@ class Ball:
             excess_dx = x - right
             if excess_dx > 0:
                 excess_dt = dt * excess_dx / dx
-                hit_y = self.y + self.vy * (dt - excess_dt)
+                hit_y = self._y + self._vy * (dt - excess_dt)
                 player = players[1]
                 if player.is_at(hit_y):
-                    self.x = right
-                    self.y = hit_y
-                    self.vx *= -1
+                    self._x = right
+                    self._y = hit_y
+                    self._vx *= -1
                     self.spin += player.vy
                     self._english()
-                    if self.vx > 0:
-                        self.vx *= -1  # move AWAY from the player!
+                    if self._vx > 0:
+                        self._vx *= -1  # move AWAY from the player!
                     dt = excess_dt
                     continue
 
-            self.x = x
-            self.y = y
+            self._x = x
+            self._y = y
             break
 
-        k = min(delta_t, 0.1)
-        self.spin *= (1 - k)  # decay
-        kk = 1 + k * 0.02
-        self.vx *= kk  # faster!
-        self.vy *= kk
-
     def _english(self, spinfrac=0.6):
         spin = self.spin * spinfrac
         self.spin -= spin
@@ -299,16 +411,17 @@ class Ball:
             spin = max(spin, -self.max_english)
         else:
             spin = min(spin, self.max_english)
-        vx = self.vx
-        vy = self.vy
+        vx = self._vx
+        vy = self._vy
         r = sqrt(vx * vx + vy * vy)
         theta = atan2(vy, vx) + spin
-        self.vx = r * cos(theta)
-        self.vy = r * sin(theta)
+        self._vx = r * cos(theta)
+        self._vy = r * sin(theta)
 
+    @micropython.native
     def draw(self, set_pixel):
-        x = self.x - 0.5
-        y = self.y - 0.5
+        x = self._x - 0.5
+        y = self._y - 0.5
 
         # A B
         # C D
@@ -331,16 +444,27 @@ class Ball:
         vcd = y - yab
         vab = 1 - vcd
 
-        for x, y, v in (
-                (xac, yab, vac * vab),
-                (xbd, yab, vbd * vab),
-                (xac, ycd, vac * vcd),
-                (xbd, ycd, vbd * vcd)):
-            if 0 <= x < 17 and 0 <= y < 7:
-                set_pixel(x, y, v * 255)
+        # Unrolled, so drawing doesn't allocate.  We know xbd>=0 and
+        # ycd>=0 from above.
+        ac_on = 0 <= xac < 17
+        bd_on = xbd < 17
+        if 0 <= yab < 7:
+            v = vab * 255
+            if ac_on:
+                set_pixel(xac, yab, vac * v)
+            if bd_on:
+                set_pixel(xbd, yab, vbd * v)
+        if ycd < 7:
+            v = vcd * 255
+            if ac_on:
+                set_pixel(xac, ycd, vac * v)
+            if bd_on:
+                set_pixel(xbd, ycd, vbd * v)
 
 
 class CountdownAnimation:
+    __slots__ = ("value", "speed")
+
     def __init__(self):
         self.value = 0
         self.speed = 4
@@ -352,26 +476,27 @@ class CountdownAnimation:
         width, height = display.size
         x = width // 2
 
-        set_pixel = display.set_pixel
         value = int(self.value)
         if value == 0:
             lit = -1
         else:
             lit = (value - 1) % height
-        for y in range(height):
-            if y & 1:
-                continue
-            set_pixel(x, y, 255 if y == lit else 64 if lit & 1 else 128)
+        for y in range(0, height, 2):
+            display.set_pixel(
+                x, y, 255 if y == lit else 64 if lit & 1 else 128)
 
 
 class ScoreAnimation:
     BITMAP = b'""*>\x14\x00\x1c\x08\x08\x08\x1c\x00"2*&"'
 
+    __slots__ = ("rotate_180", "offsets", "period", "time", "offset", "_yrange")
+
     def __init__(self, rotate_180=False):
         self.rotate_180 = rotate_180
         self.offsets = (0, 1, 2)
         self.period = 0.09
         self.time = 0
+        self._yrange = None
         self.update(0)
 
     def update(self, delta_t):
@@ -384,14 +509,19 @@ class ScoreAnimation:
     def draw(self, display):
         width, height = display.size
 
-        if (rotate := self.rotate_180):
-            yrange = range(height - 1, -1, -1)
-        else:
-            yrange = range(height)
+        rotate = self.rotate_180
+        yrange = self._yrange
+        if yrange is None or len(yrange) != height:
+            if rotate:
+                yrange = range(height - 1, -1, -1)
+            else:
+                yrange = range(height)
+            self._yrange = yrange
 
         offset = self.offset
-        set_pixel = display.set_pixel
-        for x, bits in enumerate(self.BITMAP):
+        bitmap = self.BITMAP
+        for x in range(len(bitmap)):
+            bits = bitmap[x]
             bx = width - x + offset
             if rotate:
                 x = width - 1 - x
@@ -402,7 +532,7 @@ class ScoreAnimation:
                 if not bit_set:
                     continue
                 v = 192 if ((bx - abs(y - 3)) & 2) else 160
-                set_pixel(x, y, v)
+                display.set_pixel(x, y, v)
 
 
 def main(*args, **kwargs):
@@ -0,0 +1,237 @@
+"""Send frames over a byte stream, and show frames received from one.
+
+Each frame is sent either as a keyframe, b"K" followed by every
+pixel, or as a delta, b"D" followed by the number of pixels that
+changed and then an (index, level) byte pair for each of them.
+A keyframe is sent first, whenever a delta wouldn't be smaller,
+and every `keyframe_interval` frames, so a receiver that misses
+something catches up.  Streams must start at a frame boundary.
+
+On a device, `main()` shows the frames it reads from USB serial,
+and `send()` runs a game, sending the frames it shows to USB serial
+too.  Either way, Ctrl-C is disabled while it runs, so a 0x03 byte
+in a frame doesn't interrupt it.
+"""
+_KEYFRAME = 75  # b"K"
+_DELTA = 68  # b"D"
+
+
+class Encoder:
+    def __init__(self, write, num_pixels, keyframe_interval=60):
+        if num_pixels > 256:
+            raise ValueError("too many pixels")
+        self._write = write
+        self._last = bytearray(num_pixels)
+        self._buf = bytearray(1 + num_pixels)
+        self._view = memoryview(self._buf)
+        self._max_changes = (num_pixels - 2) // 2  # else keyframe
+        self._frames_to_keyframe = 0
+        self.keyframe_interval = keyframe_interval
+        self.frames_sent = 0
+        self.keyframes_sent = 0
+        self.bytes_sent = 0
+
+    def send(self, frame):
+        size = 0
+        if self._frames_to_keyframe:
+            size = self._encode_delta(frame)
+        if size:
+            self._frames_to_keyframe -= 1
+        else:
+            size = self._encode_keyframe(frame)
+            self._frames_to_keyframe = self.keyframe_interval - 1
+            self.keyframes_sent += 1
+        self._write(self._view[:size])
+        self.frames_sent += 1
+        self.bytes_sent += size
+
+    def _encode_keyframe(self, frame):
+        buf = self._buf
+        num_pixels = len(self._last)
+        buf[0] = _KEYFRAME
+        buf[1:] = frame
+        self._last[:] = frame
+        return 1 + num_pixels
+
+    def _encode_delta(self, frame):
+        last = self._last
+        buf = self._buf
+        max_changes = self._max_changes
+        buf[0] = _DELTA
+        n = 0
+        for i in range(len(last)):
+            v = frame[i]
+            if v == last[i]:
+                continue
+            if n == max_changes:
+                return 0
+            last[i] = v
+            j = 2 + 2 * n
+            buf[j] = i
+            buf[j + 1] = v
+            n += 1
+        buf[1] = n
+        return 2 + 2 * n
+
+
+class Decoder:
+    def __init__(self, readinto, num_pixels):
+        self._readinto = readinto
+        self.frame = bytearray(num_pixels)
+        self._buf = bytearray(num_pixels)
+        self._view = memoryview(self._buf)
+        self._frame_view = memoryview(self.frame)
+        self._have_keyframe = False
+
+    def read_frame(self):
+        """Read the next frame into `frame`.  Return False if the
+        stream ended, or True otherwise.  Deltas that arrive before
+        the first keyframe are skipped.
+        """
+        while True:
+            if not self._read(self._view[:1], at_frame_start=True):
+                return False
+            tag = self._buf[0]
+            if tag == _KEYFRAME:
+                self._read(self._frame_view)
+                self._have_keyframe = True
+                return True
+            if tag != _DELTA:
+                raise ValueError(f"bad frame type {tag}")
+            self._read(self._view[:1])
+            n = self._buf[0]
+            if 2 * n > len(self._buf):
+                raise ValueError(f"bad delta size {n}")
+            if n:
+                self._read(self._view[:2 * n])
+            if not self._have_keyframe:
+                continue
+            frame = self.frame
+            buf = self._buf
+            for j in range(0, 2 * n, 2):
+                frame[buf[j]] = buf[j + 1]
+            return True
+
+    def _read(self, view, at_frame_start=False):
+        readinto = self._readinto
+        got = 0
+        size = len(view)
+        while got < size:
+            n = readinto(view[got:])
+            if not n:
+                if got or not at_frame_start:
+                    raise EOFError("stream ended mid-frame")
+                return False
+            got += n
+        return True
+
+
+class StreamingPicoScroll:
+    """A Pico Scroll Pack that sends every frame it shows to `write`.
+    If `scroll` is given, frames are shown on it too, and its buttons
+    are this one's buttons.
+    """
+    BUTTON_A = 0
+    BUTTON_B = 1
+    BUTTON_X = 2
+    BUTTON_Y = 3
+
+    def __init__(self, write, scroll=None, keyframe_interval=60,
+                 width=17, height=7):
+        if scroll is not None:
+            width = scroll.get_width()
+            height = scroll.get_height()
+        self._scroll = scroll
+        self.buttons_are_polled = getattr(scroll, "buttons_are_polled", False)
+        self._width = width
+        self._height = height
+        self._fb = bytearray(width * height)
+        self.encoder = Encoder(write, len(self._fb), keyframe_interval)
+
+    def get_width(self):
+        return self._width
+
+    def get_height(self):
+        return self._height
+
+    def set_pixel(self, x, y, level):
+        self._fb[y * self._width + x] = level
+
+    def set_pixels(self, image):
+        self._fb[:] = image
+
+    def clear(self):
+        fb = self._fb
+        for i in range(len(fb)):
+            fb[i] = 0
+
+    def show_bitmap_1d(self, bitmap, level, offset):
+        fb = self._fb
+        width = self._width
+        height = self._height
+        for x in range(width):
+            i = offset + x
+            col = bitmap[i] if 0 <= i < len(bitmap) else 0
+            for y in range(height):
+                fb[y * width + x] = level if col & 1 else 0
+                col >>= 1
+
+    def show(self):
+        scroll = self._scroll
+        if scroll is not None:
+            scroll.set_pixels(self._fb)
+            scroll.show()
+        self.encoder.send(self._fb)
+
+    def is_pressed(self, button):
+        scroll = self._scroll
+        if scroll is None:
+            return False
+        return scroll.is_pressed(button)
+
+
+def receive(readinto, scroll):
+    """Show frames read with `readinto` on `scroll` until the stream
+    ends.
+    """
+    decoder = Decoder(readinto, scroll.get_width() * scroll.get_height())
+    frame = decoder.frame
+    while decoder.read_frame():
+        scroll.set_pixels(frame)
+        scroll.show()
+
+
+def _binary_stdio():
+    """Stop stdin's Ctrl-C from raising `KeyboardInterrupt`, and
+    return stdin and stdout's binary streams.
+    """
+    import sys
+    import micropython
+
+    micropython.kbd_intr(-1)
+    return sys.stdin.buffer, sys.stdout.buffer
+
+
+def main():
+    from picoscroll import PicoScroll
+
+    stdin, _ = _binary_stdio()
+    receive(stdin.readinto, PicoScroll())
+
+
+def send(game="pong", keyframe_interval=60):
+    """Run the game in module `game`, showing it here and sending its
+    frames to stdout.
+    """
+    from engine import PicoScroll
+    from picoscroll import PicoScroll as _PicoScroll
+
+    _, stdout = _binary_stdio()
+    scroll = StreamingPicoScroll(
+        stdout.write, _PicoScroll(), keyframe_interval)
+    module = __import__(game, None, None, ("main",))
+    module.main(scroll=PicoScroll(scroll))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from typing import Any
 from unittest.mock import Mock, NonCallableMock
 
@@ -10,18 +11,40 @@ from pygame import Rect
 from devkit.pygame import picoscroll as module
 
 
+class Display:
+    """The window's surface, which records the level of the sprite
+    last blitted to each position from the atlas.
+    """
+    def __init__(self, scale: int = 37):
+        self.scale = scale
+        self.levels: dict[tuple[int, int], int] = {}
+        self.num_blitted = 0
+
+    def blits(
+            self,
+            blits: Iterable[tuple[Any, tuple[int, int], Rect]],
+            doreturn: bool = True,
+    ) -> None:
+        assert not doreturn
+        for _, dest, area in blits:
+            assert area.w == area.h == self.scale
+            self.levels[dest] = area.y // area.h * 16 + area.x // area.w
+            self.num_blitted += 1
+
+    def fill(self, color: Any) -> None:
+        self.levels.clear()
+
+
 @pytest.fixture
 def pygame(monkeypatch: pytest.MonkeyPatch) -> Mock:
     pygame = NonCallableMock()
 
-    display = object()
-
-    def checked_draw_rect(surface: Any, color: Any, rect: Rect) -> None:
-        assert surface is display
-        assert rect.w == 37
-        assert rect.h == 37
+    display = Display()
 
-    DIRECT_ATTRS = "K_a K_b K_q K_x K_y KEYUP KEYDOWN QUIT".split()
+    DIRECT_ATTRS = (
+        "K_a K_b K_q K_x K_y KEYUP KEYDOWN QUIT VIDEORESIZE RESIZABLE"
+        " BLEND_ADD BLEND_MULT Rect Surface"
+    ).split()
     for attr in DIRECT_ATTRS:
         setattr(pygame, attr, getattr(_pygame, attr))
 
@@ -30,8 +53,9 @@ def pygame(monkeypatch: pytest.MonkeyPatch) -> Mock:
     pygame.display.Info.return_value = NonCallableMock()
     pygame.display.Info.return_value.current_w = 1913
     pygame.display.set_mode.return_value = display
-    pygame.Rect = Rect
-    pygame.draw.rect = checked_draw_rect
+    pygame.display.get_surface.return_value = display
+    pygame.draw.circle = _pygame.draw.circle
+    pygame.event.get.return_value = []
 
     assert len(pygame.mock_calls) == 0  # sanity
 
@@ -0,0 +1,68 @@
+from typing import Any
+from unittest.mock import Mock, NonCallableMock
+
+import pygame as _pygame
+import pytest
+
+from devkit.pygame import PicoScroll
+from devkit.pygame.picoscroll import _render_atlas
+
+
+@pytest.fixture
+def window(pygame: Mock) -> Any:
+    return pygame.display.set_mode.return_value
+
+
+@pytest.mark.parametrize("scale", (1, 2, 20, 37))
+def test_atlas(scale: int) -> None:
+    atlas, sprites = _render_atlas(scale)
+    assert len(sprites) == 256
+    assert all(area.size == (scale, scale) for area in sprites)
+    assert atlas.get_rect().contains(sprites[-1])
+
+    centers = [atlas.get_at(area.center)[0] for area in sprites]
+    assert centers == sorted(centers)  # brighter levels glow brighter
+    assert centers[-1] == 255  # however small the LEDs are
+
+
+def test_leds_are_round() -> None:
+    atlas, sprites = _render_atlas(37)
+    area = sprites[255]
+    assert atlas.get_at(area.center) == (255, 255, 255, 255)
+    assert atlas.get_at(area.topleft) == (0, 0, 0, 255)
+    assert atlas.get_at(sprites[0].center) != (0, 0, 0, 255)  # unlit
+
+
+def test_only_changes_are_drawn(window: Any) -> None:
+    scroll = PicoScroll()
+    scroll.negotiate_gamma(3)  # so levels are drawn as they're set
+    assert window.num_blitted == 17 * 7
+    assert set(window.levels.values()) == {0}
+
+    scroll.set_pixel(1, 0, 192)
+    scroll.set_pixel(16, 6, 255)
+    scroll.show()
+    assert window.num_blitted == 17 * 7 + 2
+    assert window.levels[37, 0] == 192
+    assert window.levels[16 * 37, 6 * 37] == 255
+
+    scroll.show()
+    assert window.num_blitted == 17 * 7 + 2
+
+
+def test_resize(pygame: Mock, window: Any) -> None:
+    scroll = PicoScroll()
+    scroll.negotiate_gamma(3)
+    scroll.set_pixel(0, 0, 64)
+    scroll.show()
+    num_flips = pygame.display.flip.call_count
+
+    window.scale = 10
+    pygame.event.get.return_value = [NonCallableMock(
+        type=_pygame.VIDEORESIZE, size=(175, 100))]
+    scroll.is_pressed(scroll.BUTTON_A)
+
+    assert pygame.display.flip.call_count == num_flips + 1
+    assert len(window.levels) == 17 * 7
+    assert window.levels[2, 15] == 64  # centred in the window
+    assert window.levels[162, 75] == 0
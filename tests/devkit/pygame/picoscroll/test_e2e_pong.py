@@ -9,8 +9,9 @@ from unittest.mock import Mock, NonCallableMock
 
 import pytest
 
-from pygame import K_a, K_b, K_x, K_y, K_s, KEYUP, KEYDOWN
+from pygame import K_a, K_b, K_x, K_y, K_s, KEYUP, KEYDOWN, RESIZABLE
 
+from target.engine import Display
 from target.pong import Game, main
 
 logger = logging.getLogger(__name__)
@@ -37,9 +38,14 @@ def test_pong_e2e(pygame: Mock, monkeypatch: pytest.MonkeyPatch) -> None:
         return [next(key_sequence)]
 
     deadliner = Deadliner(timeout=1)
+    show = Display.show
+
+    def counting_show(self: Display) -> None:
+        deadliner()
+        show(self)
 
     pygame.event.get = keysmasher
-    pygame.display.flip = deadliner
+    monkeypatch.setattr(Display, "show", counting_show)
 
     assert len(pygame.mock_calls) == 0  # sanity
 
@@ -54,15 +60,17 @@ def test_pong_e2e(pygame: Mock, monkeypatch: pytest.MonkeyPatch) -> None:
         for i, call in enumerate(pygame.mock_calls[:20]):
             d(f"call {i+1}: {call}")
 
-    assert len(pygame.mock_calls) == 5
+    num_flips = pygame.display.flip.call_count
+    assert len(pygame.mock_calls) == 5 + num_flips
 
     pygame.init.assert_called_once_with()
-    pygame.display.set_mode.assert_called_once_with((629, 259))
+    pygame.display.set_mode.assert_called_once_with((629, 259), RESIZABLE)
     pygame.display.set_caption.called_once_with("Pico Scroll")
 
     num_frames = deadliner.num_calls
-    d(f"num_frames={num_frames}")
+    d(f"num_frames={num_frames}, num_flips={num_flips}")
     assert 55 < num_frames < 65  # it targets 60fps
+    assert 0 < num_flips < num_frames  # unchanged frames aren't shown
 
 
 # Helpers
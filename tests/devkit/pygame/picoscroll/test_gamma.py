@@ -0,0 +1,40 @@
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+
+from devkit.pygame import PicoScroll
+
+from target.engine import PicoScroll as EnginePicoScroll
+
+
+@pytest.fixture
+def window(pygame: Mock) -> Any:
+    return pygame.display.set_mode.return_value
+
+
+def first_pixel_drawn(window: Any, level: int, gamma: float = 3) -> int:
+    """Set the top-left pixel through a display, and show it."""
+    display = EnginePicoScroll(PicoScroll(), gamma=gamma).display
+    display.set_pixel(0, 0, level)
+    display.show()
+    return window.levels[0, 0]
+
+
+@pytest.mark.parametrize("level", (0, 1, 5, 128, 254, 255))
+def test_matching_curves_cancel(window: Any, level: int) -> None:
+    """Levels the old round trip quantized away are shown as drawn."""
+    assert first_pixel_drawn(window, level) == level
+
+
+def test_curves_are_fused(window: Any) -> None:
+    assert first_pixel_drawn(window, 64, gamma=1.5) == round(
+        255 * ((64 / 255) ** 0.5))
+
+
+def test_without_negotiation(window: Any) -> None:
+    """Levels that were gamma-corrected by the sender are uncorrected."""
+    scroll = PicoScroll()
+    scroll.set_pixel(0, 0, 8)
+    scroll.show()
+    assert window.levels[0, 0] == round(255 * ((8 / 255) ** (1 / 3)))
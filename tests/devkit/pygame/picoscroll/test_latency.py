@@ -0,0 +1,36 @@
+from unittest.mock import Mock, NonCallableMock
+
+import pytest
+
+from pygame import K_a, K_x, KEYDOWN, KEYUP
+
+from devkit.pygame import PicoScroll
+
+
+def test_latency(pygame: Mock) -> None:
+    scroll = PicoScroll(report_latency=False)
+    pygame.event.get.return_value = [
+        NonCallableMock(type=KEYDOWN, key=K_a),
+        NonCallableMock(type=KEYUP, key=K_x),
+    ]
+    assert scroll.is_pressed(scroll.BUTTON_A)
+    pygame.event.get.return_value = []
+
+    scroll.show()
+    assert not scroll.latency.latencies
+    scroll.set_pixel(0, 0, 1)
+    scroll.show()
+    latencies = scroll.latency.latencies
+    assert sorted(latencies) == [scroll.BUTTON_A, scroll.BUTTON_X]
+    assert 0 < latencies[scroll.BUTTON_A][0] < 1
+
+
+@pytest.mark.parametrize("env,report", (("", True), ("1", False), ("1", None)))
+def test_report_at_exit(pygame: Mock, monkeypatch: pytest.MonkeyPatch,
+                        env: str, report: bool) -> None:
+    registered = []
+    monkeypatch.setattr("atexit.register", registered.append)
+    monkeypatch.setenv("DEVKIT_LATENCY", env)
+    scroll = PicoScroll(report_latency=report)
+    should_report = bool(env) if report is None else report
+    assert registered == ([scroll.latency.report] if should_report else [])
@@ -0,0 +1,25 @@
+from unittest.mock import Mock
+
+import pytest
+
+from devkit.pygame import PicoScroll
+
+
+def test_basics(pygame: Mock) -> None:
+    scroll = PicoScroll()
+    image = bytes(range(119))
+    scroll.set_pixels(image)
+    assert scroll._fb == image
+
+    scroll.set_pixels(bytearray(120))  # the extra pixel is ignored
+    assert scroll._fb == bytes(119)
+
+
+def test_errors(pygame: Mock) -> None:
+    scroll = PicoScroll()
+    with pytest.raises(TypeError) as e:
+        scroll.set_pixels(list(range(119)))  # type: ignore[arg-type]
+    assert str(e.value) == "object with buffer protocol required"
+    with pytest.raises(ValueError) as e:
+        scroll.set_pixels(bytearray(118))
+    assert str(e.value) == "image too small"
@@ -0,0 +1,90 @@
+from collections.abc import Callable, Iterator
+from time import monotonic, sleep
+from unittest.mock import Mock, NonCallableMock
+
+import pytest
+
+from pygame import K_a, KEYDOWN, QUIT, VIDEORESIZE
+
+from devkit.pygame import ThreadedPicoScroll
+
+from engine import PicoScroll
+
+
+@pytest.fixture
+def scroll(pygame: Mock) -> Iterator[ThreadedPicoScroll]:
+    pygame.event.get.return_value = []
+    scroll = ThreadedPicoScroll()
+    try:
+        yield scroll
+    finally:
+        scroll.close()
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = monotonic() + timeout
+    while not predicate():
+        assert monotonic() < deadline
+        sleep(0.001)
+
+
+def test_show_does_not_wait(pygame: Mock, scroll: ThreadedPicoScroll) -> None:
+    pygame.display.flip.side_effect = lambda: sleep(0.05)  # a slow window
+
+    start_time = monotonic()
+    for level in range(1, 11):
+        scroll.set_pixel(0, 0, level)
+        scroll.show()
+    assert monotonic() - start_time < 0.05
+
+    # the newest frame is presented, and the ones before it are dropped
+    wait_for(lambda: scroll._buffers.front[0] == 10)
+    assert scroll.frames_shown == 11  # including the first
+    assert scroll.frames_presented < scroll.frames_shown
+
+
+def test_keys(pygame: Mock, scroll: ThreadedPicoScroll) -> None:
+    assert not scroll.is_pressed(scroll.BUTTON_A)
+    pygame.event.get.return_value = [NonCallableMock(type=KEYDOWN, key=K_a)]
+    wait_for(lambda: scroll.is_pressed(scroll.BUTTON_A))
+
+    # presenting a changed frame measures the latency
+    scroll.set_pixel(0, 0, 1)
+    scroll.show()
+    wait_for(lambda: bool(scroll.latency.latencies))
+
+
+def test_irq_buttons(pygame: Mock, scroll: ThreadedPicoScroll) -> None:
+    buttons = PicoScroll(scroll, irq_buttons=True).buttons
+    pygame.event.get.return_value = [NonCallableMock(type=KEYDOWN, key=K_a)]
+    wait_for(buttons.A.is_pressed)
+
+
+def test_resize(pygame: Mock, scroll: ThreadedPicoScroll) -> None:
+    scroll.negotiate_gamma(3)
+    scroll.set_pixel(0, 0, 64)
+    scroll.show()
+    wait_for(lambda: scroll._buffers.front[0] == 64)
+
+    window = pygame.display.get_surface.return_value
+    window.scale = 10
+    events = [[NonCallableMock(type=VIDEORESIZE, size=(170, 70))]]
+    pygame.event.get.side_effect = lambda: events.pop() if events else []
+    wait_for(lambda: scroll._scale == 10 and len(window.levels) == 17 * 7)
+    assert window.levels[0, 0] == 64
+
+
+def test_quit(pygame: Mock, scroll: ThreadedPicoScroll) -> None:
+    pygame.event.get.return_value = [NonCallableMock(type=QUIT)]
+    wait_for(lambda: not scroll._thread.is_alive())
+    with pytest.raises(SystemExit):
+        scroll.is_pressed(scroll.BUTTON_A)
+    with pytest.raises(SystemExit):
+        scroll.show()
+
+
+def test_window_fails(pygame: Mock) -> None:
+    pygame.display.set_mode.side_effect = RuntimeError("no display")
+    with pytest.raises(RuntimeError) as e:
+        ThreadedPicoScroll()
+    assert str(e.value) == "no display"
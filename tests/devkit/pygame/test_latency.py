@@ -0,0 +1,97 @@
+import io
+
+import pytest
+
+from devkit.pygame.latency import LatencyMonitor, enabled
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_latency() -> None:
+    clock = Clock()
+    monitor = LatencyMonitor(clock)
+    monitor.presented(bytearray(2))
+
+    monitor.input(0)
+    clock.now = 0.01
+    monitor.input(1)
+    clock.now = 0.02
+    monitor.presented(bytearray(2))  # no change
+    clock.now = 0.03
+    monitor.presented(bytearray(b"\x01\x00"))
+
+    clock.now = 0.04
+    monitor.input(0)
+    clock.now = 0.045
+    monitor.presented(bytearray(b"\x01\x01"))
+
+    assert monitor.latencies == {0: [pytest.approx(0.03), pytest.approx(0.005)],
+                                 1: [pytest.approx(0.02)]}
+
+
+def test_unseen() -> None:
+    clock = Clock()
+    monitor = LatencyMonitor(clock)
+    monitor.presented(bytearray(1))
+    monitor.input(3)
+    clock.now = 0.5
+    monitor.input(2)
+    clock.now = 1.2
+    monitor.presented(bytearray(1))
+    assert monitor.unseen == {3: 1}
+    clock.now = 1.3
+    monitor.presented(bytearray(b"\x01"))
+    assert monitor.latencies == {2: [pytest.approx(0.8)]}
+
+
+def test_unseen_before_a_change() -> None:
+    """Inputs that time out are unseen, even when the frame that's
+    presented next has changed.
+    """
+    clock = Clock()
+    monitor = LatencyMonitor(clock)
+    monitor.presented(bytearray(1))
+    monitor.input(3)
+    clock.now = 5
+    monitor.input(2)
+    clock.now = 5.1
+    monitor.presented(bytearray(b"\x01"))
+    assert monitor.unseen == {3: 1}
+    assert monitor.latencies == {2: [pytest.approx(0.1)]}
+
+
+def test_report() -> None:
+    clock = Clock()
+    monitor = LatencyMonitor(clock)
+    out = io.StringIO()
+    monitor.report(out)
+    assert out.getvalue() == "button-to-photon latency: no inputs\n"
+
+    for i in range(1, 21):
+        monitor.input(0)
+        clock.now += i / 1000
+        monitor.presented(bytearray([i]))
+    monitor.input(1)
+    clock.now += 2
+    monitor.presented(bytearray([i]))
+
+    out = io.StringIO()
+    monitor.report(out)
+    assert out.getvalue() == """\
+button-to-photon latency (ms):
+  button inputs     min  median     p95     max
+  A          20     1.0    11.0    19.0    20.0
+  1 B input(s) changed nothing within 1.0s
+"""
+
+
+def test_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("DEVKIT_LATENCY", raising=False)
+    assert not enabled()
+    monkeypatch.setenv("DEVKIT_LATENCY", "1")
+    assert enabled()
@@ -0,0 +1,65 @@
+import math
+import random
+
+import pytest
+
+from target.pong import Ball, Player
+
+np = pytest.importorskip("numpy")
+
+from devkit.sim.batch import BallBatch  # noqa: E402
+
+
+def make_balls(count: int, **kwargs: float) -> list[Ball]:
+    balls = [Ball(**kwargs) for _ in range(count)]
+    for ball in balls:
+        ball.spin = random.uniform(-1, 1)
+    return balls
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_scalar(seed: int) -> None:
+    """A batch follows the same paths as the balls it was made from."""
+    random.seed(seed)
+    # keep the spin small enough that no ball ever needs nudging
+    # towards a player, which would draw from different RNGs
+    balls = make_balls(200, max_english=0.2, speedup=0.05, spin_decay=0.5)
+    batch = BallBatch.from_balls(balls)
+    players = [Player(None, None, 0), Player(None, None, 16)]
+
+    for frame in range(240):
+        for i, p in enumerate(players):
+            p.y = 3.5 + 2.5 * math.sin(frame / (7 + 5 * i))
+            p.vy = 0.2 * math.cos(frame / 9)
+
+        batch.update(1 / 60, [[p.y] for p in players], [[p.vy] for p in players])
+        for ball in balls:
+            ball.update(1 / 60, players)
+
+        for attr in ("x", "y", "vx", "vy", "spin"):
+            expect = [getattr(ball, attr) for ball in balls]
+            np.testing.assert_allclose(getattr(batch, attr), expect, atol=1e-9)
+
+    # check the paddles actually got involved
+    in_play = batch.in_play()
+    assert 0 < in_play.sum() < len(balls)
+
+
+def test_reset() -> None:
+    batch = BallBatch(1000, rng=np.random.default_rng(23))
+    batch.reset(speed=7)
+    assert (batch.x == 8.5).all()
+    assert ((0.6 <= batch.y) & (batch.y <= 6.4)).all()
+    np.testing.assert_allclose(np.hypot(batch.vx, batch.vy), 7)
+    assert (batch.spin == 0).all()
+    assert batch.in_play().all()
+    assert 400 < (batch.vx < 0).sum() < 600
+
+
+def test_zero_delta_t() -> None:
+    random.seed(5)
+    batch = BallBatch.from_balls(make_balls(10))
+    before = batch.x.copy(), batch.y.copy()
+    batch.update(0, 3.5)
+    np.testing.assert_array_equal(batch.x, before[0])
+    np.testing.assert_array_equal(batch.y, before[1])
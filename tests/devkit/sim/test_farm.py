@@ -0,0 +1,68 @@
+import json
+
+from dataclasses import replace
+
+import pytest
+
+from devkit.sim.farm import (
+    BallParams,
+    GameResult,
+    GameSpec,
+    main,
+    run_game,
+    run_games,
+    summarize,
+)
+
+SPECS = [
+    GameSpec(seed=seed, bots=("random", "tracker"), max_seconds=10)
+    for seed in range(4)
+]
+
+
+def outcome(result: GameResult) -> tuple[object, ...]:
+    # everything except the frame costs, which aren't reproducible
+    return result.spec, result.frames, result.collisions, result.winner
+
+
+def test_reproducible() -> None:
+    assert outcome(run_game(SPECS[0])) == outcome(run_game(SPECS[0]))
+
+
+def test_rally_is_counted() -> None:
+    result = run_game(SPECS[1])
+    assert result.frames > 0
+    assert result.collisions >= result.returns
+    assert result.frame_ns_max >= result.frame_ns_mean > 0
+
+
+def test_tracker_beats_idle() -> None:
+    spec = replace(SPECS[0], bots=("idle", "tracker"), max_seconds=60)
+    results = [run_game(replace(spec, seed=seed)) for seed in range(10)]
+    assert all(r.winner == 1 for r in results)
+
+
+def test_pool_matches_serial() -> None:
+    parallel = run_games(SPECS, jobs=2)
+    serial = run_games(SPECS, jobs=1)
+    assert list(map(outcome, parallel)) == list(map(outcome, serial))
+
+
+def test_summarize() -> None:
+    other = BallParams(max_english=0.1)
+    specs = SPECS + [replace(spec, ball=other) for spec in SPECS]
+    summaries = summarize(map(run_game, specs))
+    assert len(summaries) == 2
+    assert [s["max_english"] for s in summaries] == [BallParams().max_english, 0.1]
+    for summary in summaries:
+        assert summary["games"] == len(SPECS)
+        assert (summary["timeouts"]
+                + summary["left_wins"]
+                + summary["right_wins"]) == len(SPECS)
+
+
+def test_main(capsys: pytest.CaptureFixture[str]) -> None:
+    main(["-n", "2", "-j", "1", "--max-seconds", "5",
+          "--speedup", "0.01", "0.04", "--json"])
+    summaries = json.loads(capsys.readouterr().out)
+    assert [s["speedup"] for s in summaries] == [0.01, 0.04]
@@ -0,0 +1,101 @@
+import threading
+
+from time import monotonic, sleep
+
+import pytest
+
+import machine
+
+from devkit.stubs.micropython.machine import drive
+
+
+def test_pin() -> None:
+    pin = machine.Pin(2, machine.Pin.OUT, value=0)
+    assert pin.value() == 0
+    pin.on()
+    assert pin() == 1
+    pin.off()
+    assert machine.Pin(2).value() == 0  # same pin
+    pin(5)
+    assert pin.value() == 1
+    assert repr(pin) == "Pin(2)"
+
+
+def test_irq() -> None:
+    pin = machine.Pin(3, machine.Pin.IN, machine.Pin.PULL_UP)
+    assert pin.value() == 1
+    edges = []
+    pin.irq(lambda p: edges.append((p, p.value())), machine.Pin.IRQ_FALLING)
+
+    drive(3, 0)
+    drive(3, 0)  # no edge
+    drive(3, 1)  # not a falling edge
+    drive(3, 0)
+    assert edges == [(pin, 0), (pin, 0)]
+
+    pin.irq(lambda p: edges.append((p, p.value())))  # both edges
+    drive(3, 1)
+    assert edges[-1] == (pin, 1)
+
+    pin.irq(None)
+    drive(3, 0)
+    assert len(edges) == 3
+
+
+def test_periodic_timer() -> None:
+    ticks = []
+    timer = machine.Timer(mode=machine.Timer.PERIODIC, freq=200,
+                          callback=ticks.append)
+    sleep(0.1)
+    timer.deinit()
+    count = len(ticks)
+    assert 10 < count < 30
+    assert set(ticks) == {timer}
+    sleep(0.02)
+    assert len(ticks) == count
+
+
+def test_one_shot_timer() -> None:
+    fired = threading.Event()
+    timer = machine.Timer()
+    timer.init(mode=machine.Timer.ONE_SHOT, period=10,
+               callback=lambda t: fired.set())
+    assert fired.wait(1)
+    timer.deinit()
+
+
+def test_deinit_from_callback() -> None:
+    ticks = []
+
+    def callback(timer: machine.Timer) -> None:
+        ticks.append(timer)
+        timer.deinit()
+
+    machine.Timer(period=1, callback=callback)
+    sleep(0.05)
+    assert len(ticks) == 1
+
+
+@pytest.mark.parametrize(
+    "kwargs,message", (
+        ({}, "freq or period required"),
+        ({"freq": 0}, "freq=0"),
+        ({"period": -1}, "period=-1"),
+    ))
+def test_timer_errors(kwargs: dict[str, float], message: str) -> None:
+    with pytest.raises(ValueError) as e:
+        machine.Timer().init(**kwargs)
+    assert str(e.value) == message
+
+
+def test_idle() -> None:
+    start = monotonic()
+    machine.idle()  # nothing happens, so a millisecond
+    assert monotonic() - start < 0.1
+
+    timer = machine.Timer(freq=1000)
+    try:
+        for _ in range(5):
+            machine.idle()
+    finally:
+        timer.deinit()
@@ -0,0 +1,145 @@
+import random
+import tracemalloc
+
+import pytest
+
+import micropython
+
+from devkit import allocations
+from devkit.allocations import SUPPORTED
+from devkit.headless import PicoScroll as HeadlessPicoScroll
+from devkit.stubs.micropython import micropython as stub
+
+from target.engine import Display
+from target.pong import Ball
+
+
+def test_const() -> None:
+    assert micropython.const(23) == 23
+
+
+@pytest.mark.parametrize("decorator", (micropython.native, micropython.viper))
+def test_emitters(decorator: object) -> None:
+    def func() -> int:
+        return 5
+
+    assert decorator(func) is func  # type: ignore[operator]
+
+
+def test_alloc_emergency_exception_buf() -> None:
+    micropython.alloc_emergency_exception_buf(100)
+
+
+def test_mem_info(capsys: pytest.CaptureFixture[str]) -> None:
+    micropython.mem_info()
+    assert capsys.readouterr().out.startswith("GC: not tracing")
+
+    tracemalloc.start()
+    try:
+        micropython.mem_info()
+    finally:
+        tracemalloc.stop()
+    assert capsys.readouterr().out.startswith("GC: used: ")
+
+
+def sum_of(values: list[int]) -> int:
+    micropython.heap_lock()
+    total = i = 0
+    while i < len(values):  # CPython allocates iterators for loops
+        total += values[i]
+        i += 1
+    micropython.heap_unlock()
+    return total
+
+
+def copy_of(values: list[int]) -> list[int]:
+    micropython.heap_lock()
+    values = values[:]
+    micropython.heap_unlock()
+    return values
+
+
+def test_heap_lock() -> None:
+    assert micropython.heap_locked() == 0
+    assert sum_of([1, 2, 3]) == 6
+    assert micropython.heap_locked() == 0
+
+
+@pytest.mark.skipif(not SUPPORTED, reason="needs CPython 3.11")
+def test_heap_lock_allocation() -> None:
+    with pytest.raises(MemoryError) as e:
+        copy_of([1, 2, 3])
+    assert str(e.value) == (
+        "memory allocation failed, heap is locked"
+        f" ({__file__}:{copy_of.__code__.co_firstlineno + 2})")
+    assert micropython.heap_locked() == 0
+
+
+def test_heap_lock_nesting() -> None:
+    micropython.heap_lock()
+    micropython.heap_lock()
+    assert micropython.heap_locked() == 2
+    assert micropython.heap_unlock() == 1
+    assert micropython.heap_unlock() == 0
+    assert micropython.heap_unlock() == 0
+
+
+def test_heap_lock_unsupported(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(allocations, "SUPPORTED", False)
+    assert copy_of([1, 2, 3]) == [1, 2, 3]  # allocates, but isn't caught
+    micropython.heap_lock()
+    micropython.heap_lock()
+    assert micropython.heap_locked() == 2
+    assert micropython.heap_unlock() == 1
+    assert micropython.heap_unlock() == 0
+
+
+def test_exports() -> None:
+    assert not hasattr(micropython, "sys")
+    assert not hasattr(micropython, "BOXED_FLOATS")
+
+
+def test_kbd_intr() -> None:
+    micropython.kbd_intr(-1)
+    micropython.kbd_intr(3)
+
+
+@pytest.mark.skipif(not SUPPORTED, reason="needs CPython 3.11")
+def test_display_set_pixel(monkeypatch: pytest.MonkeyPatch) -> None:
+    display = Display(HeadlessPicoScroll(), gamma=3)
+    set_pixel = display.set_pixel
+    micropython.heap_lock()
+    set_pixel(16, 6, 255)
+    micropython.heap_unlock()
+
+    # rounding a fractional level needs float arithmetic
+    with pytest.raises(MemoryError):
+        micropython.heap_lock()
+        set_pixel(3, 4, 170.5)
+        micropython.heap_unlock()
+
+    # but nothing else
+    monkeypatch.setattr(stub, "BOXED_FLOATS", False)
+    micropython.heap_lock()
+    set_pixel(3, 4, 170.5)
+    micropython.heap_unlock()
+
+
+@pytest.mark.skipif(not SUPPORTED, reason="needs CPython 3.11")
+def test_ball_draw(monkeypatch: pytest.MonkeyPatch) -> None:
+    random.seed(2)
+    ball = Ball()
+    ball.x, ball.y = 3.25, 4.75
+    set_pixel = Display(HeadlessPicoScroll(), gamma=3).set_pixel
+
+    # drawing needs float arithmetic
+    with pytest.raises(MemoryError):
+        micropython.heap_lock()
+        ball.draw(set_pixel)
+        micropython.heap_unlock()
+
+    # but nothing else
+    monkeypatch.setattr(stub, "BOXED_FLOATS", False)
+    micropython.heap_lock()
+    ball.draw(set_pixel)
+    micropython.heap_unlock()
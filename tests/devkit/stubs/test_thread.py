@@ -0,0 +1,30 @@
+import _thread as builtin_thread
+
+from devkit.stubs.micropython import _thread
+
+
+def test_same_names() -> None:
+    for name in ("start_new_thread", "allocate_lock", "get_ident",
+                 "stack_size", "exit", "LockType"):
+        assert hasattr(builtin_thread, name)
+        assert hasattr(_thread, name)
+
+
+def test_start_new_thread() -> None:
+    done = _thread.allocate_lock()
+    done.acquire()
+    result = []
+
+    def run(a: int, b: int) -> None:
+        result.append((a + b, _thread.get_ident()))
+        done.release()
+        _thread.exit()
+
+    _thread.start_new_thread(run, (1, 2))
+    assert done.acquire(1, 5)
+    assert result[0][0] == 3
+    assert result[0][1] != _thread.get_ident()
+
+
+def test_stack_size() -> None:
+    assert isinstance(_thread.stack_size(), int)
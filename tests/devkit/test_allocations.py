@@ -0,0 +1,129 @@
+import random
+
+from io import StringIO
+from linecache import getline
+
+import pytest
+
+from target.engine import PicoScroll
+from target.pong import RUNNING, Game
+
+from devkit import allocations
+from devkit.allocations import (
+    SUPPORTED, AllocationTracker, assert_allocates_at_most,
+)
+from devkit.headless import PicoScroll as HeadlessPicoScroll
+from devkit.sim.farm import insert_coin
+
+pytestmark = pytest.mark.skipif(not SUPPORTED, reason="needs CPython 3.11")
+
+
+class Ticker:
+    def __init__(self, allocate: bool, arithmetic: bool = True) -> None:
+        self.allocate = allocate
+        self.arithmetic = arithmetic
+        self.kept: list[object] = []
+        self.value = 1.5
+
+    def tick(self, delta_t: float) -> None:
+        if self.allocate:
+            self.kept.append([delta_t])
+        if self.arithmetic:
+            self.value = self.value * delta_t + 1
+
+
+@pytest.mark.parametrize("floats", (True, False))
+def test_counts(floats: bool) -> None:
+    ticker = Ticker(allocate=True)
+    with AllocationTracker(ticker, paths=[__file__], floats=floats) as t:
+        for _ in range(20):
+            ticker.tick(0.5)
+    assert len(t.ticks) == 20
+
+    lines = {getline(*key).strip(): stats for key, stats in t.lines.items()}
+    assert lines["self.kept.append([delta_t])"].count == 20
+    if floats:
+        assert t.allocations_per_tick == 2
+        assert lines["self.value = self.value * delta_t + 1"].count == 20
+    else:
+        assert t.allocations_per_tick == 1
+        assert "self.value = self.value * delta_t + 1" not in lines
+
+
+def test_uninstall() -> None:
+    ticker = Ticker(allocate=False)
+    tick = ticker.tick
+    with AllocationTracker(ticker) as tracker:
+        assert ticker.tick != tick
+        with pytest.raises(RuntimeError):
+            tracker.install()
+    assert ticker.tick == tick
+
+
+def pong(running: bool) -> Game:
+    random.seed(1)
+    scroll = HeadlessPicoScroll()
+    game = Game(PicoScroll(scroll), max_framerate=None)
+    if running:
+        insert_coin(game, scroll, 1 / 60)
+        while game.state is not RUNNING:
+            game.tick(1 / 60)
+    return game
+
+
+def allocating_lines(tracker: AllocationTracker) -> set[str]:
+    return {getline(*key).strip() for key in tracker.lines}
+
+
+class GeneratorTicker:
+    def __init__(self) -> None:
+        self.flags = [False, False, False]
+
+    def tick(self, delta_t: float) -> None:
+        if any(flag for flag in self.flags):
+            self.flags[0] = False
+
+
+def test_generators() -> None:
+    ticker = GeneratorTicker()
+    with AllocationTracker(ticker, paths=[__file__]) as tracker:
+        for _ in range(20):
+            ticker.tick(1 / 60)
+    assert "if any(flag for flag in self.flags):" \
+        in allocating_lines(tracker)
+
+
+def test_pong_waiting() -> None:
+    game = pong(running=False)
+    with AllocationTracker(game) as tracker:
+        for _ in range(30):
+            game.tick(1 / 60)
+    assert "debounce -= delta_t" in allocating_lines(tracker)
+
+
+def test_pong_running() -> None:
+    game = pong(running=True)
+    with AllocationTracker(game) as tracker:
+        for _ in range(30):
+            game.tick(1 / 60)
+    assert "v2 = (y - y1) * 255" in allocating_lines(tracker)  # Player.draw
+
+    report = StringIO()
+    tracker.report(report)
+    assert "target/pong.py:" in report.getvalue()
+
+
+def test_assert_allocates_at_most() -> None:
+    assert_allocates_at_most(Ticker(allocate=False, arithmetic=False), 0,
+                             paths=[__file__])
+    with pytest.raises(AssertionError) as e:
+        assert_allocates_at_most(Ticker(allocate=True, arithmetic=False), 0,
+                                 paths=[__file__])
+    assert str(e.value).startswith("tick ran 1 allocating lines (max 0):\n")
+
+
+def test_unsupported_interpreter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(allocations, "SUPPORTED", False)
+    with pytest.raises(RuntimeError) as e:
+        AllocationTracker(Ticker(allocate=False))
+    assert str(e.value).startswith("allocation tracking needs CPython 3.11")
@@ -0,0 +1,129 @@
+import os
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from devkit.assets import AssetError, compile_assets, main  # noqa: E402
+
+from engine import RLEBitmap  # noqa: E402
+
+RESOURCES = Path(__file__).parent.parent.parent / "resources"
+
+TEST_BITMAP = b"^E^@>*\x14\x00A\x006\x086\x01]Q="  # test_show_bitmap_1d.py
+
+
+def save(path: Path, rows: list[list[int]]) -> None:
+    Image.fromarray(np.array(rows, dtype=np.uint8), "L").save(path)
+
+
+def load(output: Path) -> dict[str, object]:
+    namespace: dict[str, object] = {}
+    exec(output.read_text(), namespace)
+    del namespace["__builtins__"]
+    return namespace
+
+
+def test_bitmap_1d(tmp_path: Path) -> None:
+    shutil.copy(RESOURCES / "test" / "bitmap_1d.png", tmp_path)
+    output = tmp_path / "assets.py"
+    compile_assets(str(tmp_path), str(output))
+    assert load(output) == {"BITMAP_1D": TEST_BITMAP}
+
+
+def test_kinds(tmp_path: Path) -> None:
+    save(tmp_path / "dot.png", [[0, 255], [127, 128]])
+    save(tmp_path / "ramp.grey.png", [[0, 1, 2], [253, 254, 255]])
+    save(tmp_path / "frames.2x1.png", [[255, 0, 0, 255], [0, 0, 0, 0]])
+    save(tmp_path / "tiles.grey.1x1.png", [[7, 8], [9, 10]])
+    output = tmp_path / "assets.py"
+    compile_assets(str(tmp_path), str(output))
+    assert load(output) == {
+        "DOT": b"\x00\x03",
+        "RAMP": b"\x00\x01\x02\xfd\xfe\xff",
+        "FRAMES": (b"\x01\x00", b"\x00\x01", b"\x00\x00", b"\x00\x00"),
+        "TILES": (b"\x07", b"\x08", b"\x09", b"\x0a"),
+    }
+
+
+def test_rle(tmp_path: Path) -> None:
+    message = [[0] * 40 + [255, 0, 255] * 20 + [0] * 40] * 2
+    save(tmp_path / "message.rle.png", message)
+    save(tmp_path / "fade.grey.rle.png", [[0, 0, 0, 0, 9], [0, 0, 0, 0, 8]])
+    save(tmp_path / "frames.rle.1x1.png", [[255, 0]])
+    output = tmp_path / "assets.py"
+    compile_assets(str(tmp_path), str(output))
+    assets = load(output)
+    assert assets["FADE"] == b"\x01\x02\x05\x00\x85\x00\x01\x09\x08"
+    assert assets["FRAMES"] == (b"\x00\x01\x01\x00\x00\x01",
+                                b"\x00\x01\x01\x00\x00\x00")
+
+    bitmap = RLEBitmap(assets["MESSAGE"])
+    assert (bitmap.width, bitmap.height, bitmap.grey) == (140, 2, False)
+    assert len(assets["MESSAGE"]) < 140 // 2
+    out = bytearray(17)
+    bitmap.decode(35, out)
+    assert out == bytes(5) + b"\x03\x00\x03" * 4
+
+
+def test_long_lines(tmp_path: Path) -> None:
+    save(tmp_path / "wide.grey.png", [list(range(256)) for _ in range(2)])
+    output = tmp_path / "assets.py"
+    compile_assets(str(tmp_path), str(output))
+    assert load(output) == {"WIDE": bytes(range(256)) * 2}
+    assert max(map(len, output.read_text().split("\n")[1:])) <= 84
+
+
+def test_rebuild(tmp_path: Path) -> None:
+    save(tmp_path / "a.png", [[255]])
+    save(tmp_path / "b.png", [[0]])
+    output = tmp_path / "assets.py"
+
+    report = compile_assets(str(tmp_path), str(output))
+    assert (report.compiled, report.reused) == (["a.png", "b.png"], [])
+    first = output.read_text()
+
+    report = compile_assets(str(tmp_path), str(output))
+    assert (report.compiled, report.reused) == ([], ["a.png", "b.png"])
+    assert output.read_text() == first
+
+    save(tmp_path / "b.png", [[255]])
+    os.remove(tmp_path / "a.png")
+    save(tmp_path / "c.png", [[0]])
+    report = compile_assets(str(tmp_path), str(output))
+    assert (report.compiled, report.reused) == (["b.png", "c.png"], [])
+    assert load(output) == {"B": b"\x01", "C": b"\x00"}
+
+
+@pytest.mark.parametrize(
+    "filename,rows,message", (
+        ("2x.png", [[0]], "2x.png: can't make a name from this"),
+        ("tall.png", [[0]] * 9, "tall.png: 1-bit bitmaps can't be 9 rows high"),
+        ("frames.2x2.png", [[0, 0, 0]] * 2,
+         "frames.2x2.png: 3x2 isn't a whole number of 2x2 frames"),
+        ("A.grey.png", [[0]], "A.grey.png and a.png are both A"),
+        ("tall.grey.rle.png", [[0]] * 256,
+         "tall.grey.rle.png: RLE bitmaps can't be 256 rows high"),
+    ))
+def test_errors(tmp_path: Path, filename: str, rows: list[list[int]],
+                message: str) -> None:
+    save(tmp_path / "a.png", [[0]])
+    save(tmp_path / filename, rows)
+    with pytest.raises(AssetError) as e:
+        compile_assets(str(tmp_path), str(tmp_path / "assets.py"))
+    assert str(e.value) == message
+
+
+def test_main(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    output = tmp_path / "assets.py"
+    assert main([str(RESOURCES / "test"), "-o", str(output)]) == 0
+    assert capsys.readouterr().out == f"wrote {output}: 1 compiled, 0 unchanged\n"
+
+    save(tmp_path / "2x.png", [[0]])
+    assert main([str(tmp_path), "-o", str(output)]) == 1
+    assert capsys.readouterr().err == \
+        "error: 2x.png: can't make a name from this\n"
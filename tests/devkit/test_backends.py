@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from devkit import backends
+from devkit.headless import PicoScroll as HeadlessPicoScroll
+from devkit.headless import RecordingPicoScroll
+
+from target.engine import PicoScroll
+from target.pong import Game
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(backends, "BACKENDS", dict(backends.BACKENDS))
+    monkeypatch.setattr(backends, "_selected", None)
+    monkeypatch.delenv(backends.ENV_VAR, raising=False)
+
+
+def test_default() -> None:
+    assert backends.selected() == "pygame"
+
+
+def test_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(backends.ENV_VAR, "headless")
+    assert backends.selected() == "headless"
+    assert backends.load() is HeadlessPicoScroll
+    backends.select("recording")
+    assert backends.selected() == "recording"
+    backends.select(None)
+    assert backends.selected() == "headless"
+
+
+def test_select() -> None:
+    backends.select("headless")
+    scroll = backends.PicoScroll()
+    assert type(scroll) is HeadlessPicoScroll
+    assert scroll.BUTTON_Y == backends.PicoScroll.BUTTON_Y
+
+
+def test_unknown() -> None:
+    message = ("unknown backend 'nonesuch' (choose from"
+               " headless, pygame, pygame-threaded, recording)")
+    with pytest.raises(ValueError) as e:
+        backends.select("nonesuch")
+    assert str(e.value) == message
+    with pytest.raises(ValueError) as e:
+        backends.load("nonesuch")
+    assert str(e.value) == message
+
+
+def test_register() -> None:
+    made = []
+
+    def factory(*args: object) -> HeadlessPicoScroll:
+        made.append(args)
+        return HeadlessPicoScroll()
+
+    backends.register("custom", factory)
+    backends.select("custom")
+    backends.PicoScroll(1, 2)
+    assert made == [(1, 2)]
+
+
+def test_recording() -> None:
+    backends.select("recording")
+    scroll = PicoScroll()  # from target.engine
+    game = Game(scroll, max_framerate=None)
+    for _ in range(3):
+        game.tick(1 / 60)
+    provider = game.display.provider
+    assert type(provider) is RecordingPicoScroll
+    assert len(provider.frames) == 1  # nothing moves until a coin's in
+    assert provider.frames[0][8]  # the net
+
+    provider = RecordingPicoScroll(max_frames=2)
+    for level in range(3):
+        provider.set_pixel(0, 0, level)
+        provider.show()
+    assert [frame[0] for frame in provider.frames] == [1, 2]
+
+
+def test_device_code_does_not_import_pygame() -> None:
+    env = dict(os.environ)
+    env[backends.ENV_VAR] = "headless"
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    code = ("import sys, target.pong;"
+            " target.pong.Game(max_framerate=None);"
+            " print('pygame' in sys.modules)")
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env, capture_output=True, text=True, check=True)
+    assert result.stdout == "False\n"
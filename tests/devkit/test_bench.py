@@ -0,0 +1,103 @@
+import json
+
+from pathlib import Path
+
+import pytest
+
+from devkit import bench
+from devkit.bench import Benchmark, Result, compare, main, measure, to_json
+
+from target.pong import COUNTDOWN, RUNNING, Game
+
+
+def test_measure() -> None:
+    calls: list[None] = []
+    result = measure(
+        Benchmark("test", lambda: lambda: calls.append(None), 10),
+        repeat=3,
+    )
+    assert len(calls) == 3 * (10 + 1)  # including warmup
+    assert result.name == "test"
+    assert 0 < result.ns <= result.median_ns
+    assert result.budget_fraction == result.ns / bench.FRAME_BUDGET_NS
+
+
+def test_compare() -> None:
+    baseline = to_json([Result("a", 100, 100), Result("b", 100, 100)])
+    results = [Result("a", 119, 200), Result("b", 121, 121), Result("c", 1, 1)]
+    assert compare(results, baseline, 0.2) == ["b: 121ns > 120ns (+21%)"]
+
+
+def test_every_benchmark_runs(
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    assert main(["--scale", "0.01", "--repeat", "1"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == len(bench.BENCHMARKS)
+    assert all(line.endswith(" of a frame") for line in lines)
+
+
+@pytest.mark.parametrize(
+    "name,state", (
+        ("game.tick[countdown]", COUNTDOWN),
+        ("game.tick[running]", RUNNING),
+    ))
+def test_state_is_kept(
+        monkeypatch: pytest.MonkeyPatch,
+        name: str,
+        state: object,
+) -> None:
+    """Ticks are all of the named state, however many are made."""
+    [benchmark] = [b for b in bench.BENCHMARKS if b.name == name]
+    func = benchmark.setup()
+
+    states = []
+    tick = Game.tick
+
+    def recording_tick(game: Game, delta_t: float) -> None:
+        states.append(game.state)
+        tick(game, delta_t)
+
+    monkeypatch.setattr(Game, "tick", recording_tick)
+    for _ in range(600):  # 10s of play
+        func()
+    assert all(s is state for s in states)
+
+
+def test_emulator_show_redraws(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every call of emulator.show redraws every LED, not none."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    [benchmark] = [b for b in bench.BENCHMARKS if b.name == "emulator.show"]
+    func = benchmark.setup()
+
+    from devkit.pygame import PicoScroll
+    drawn = []
+    draw = PicoScroll._draw
+
+    def recording_draw(scroll: PicoScroll, fb: bytearray) -> None:
+        old = bytes(scroll._drawn)
+        draw(scroll, fb)
+        drawn.append(sum(a != b for a, b in zip(old, scroll._drawn)))
+
+    monkeypatch.setattr(PicoScroll, "_draw", recording_draw)
+    for _ in range(3):
+        func()
+    assert drawn[1:] == [17 * 7] * 2
+
+
+def test_baseline(tmp_path: Path) -> None:
+    output = tmp_path / "output.json"
+    args = ["-k", "set_pixel", "--scale", "0.1", "--repeat", "1"]
+    assert main(args + ["-o", str(output)]) == 0
+
+    results = json.loads(output.read_text())["results"]
+    assert list(results) == ["display.set_pixel"]
+    assert main(args + ["-b", str(output), "-t", "100"]) == 0
+
+    results["display.set_pixel"]["ns"] /= 1000
+    output.write_text(json.dumps({"results": results}))
+    assert main(args + ["-b", str(output)]) == 1
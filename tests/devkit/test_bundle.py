@@ -0,0 +1,174 @@
+import ast
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+from devkit.bundle import BundleError, build, bundle, find_modules, main
+from devkit.headless import PicoScroll as HeadlessPicoScroll
+
+
+def write_modules(path: Path, **modules: str) -> list[str]:
+    for name, source in modules.items():
+        (path / f"{name}.py").write_text(source)
+    return [str(path)]
+
+
+def test_find_modules() -> None:
+    assert [m.name for m in find_modules("pong")] == ["engine", "pong"]
+    assert [m.name for m in find_modules("target.engine")] == ["engine"]
+
+
+def test_pong() -> None:
+    source = bundle("pong")
+    tree = ast.parse(source)
+
+    for node in ast.walk(tree):
+        assert not isinstance(node, ast.Assert)
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef)):
+            assert ast.get_docstring(node) is None
+        if isinstance(node, ast.ImportFrom):
+            assert node.module not in ("engine", "target.engine")
+
+    assert source.count("from micropython import const") == 1
+    assert "_S_TO_US = const(1000000)" in source
+    assert "_US_TO_S = 1 / _S_TO_US" in source  # not an int
+    assert source.count("if __name__ == '__main__':") == 1
+
+
+def test_pong_runs() -> None:
+    namespace: dict[str, object] = {"__name__": "pong"}
+    exec(bundle("pong"), namespace)
+
+    Game = namespace["Game"]
+    PicoScroll = namespace["PicoScroll"]
+    game = Game(PicoScroll(HeadlessPicoScroll()),  # type: ignore[operator]
+                max_framerate=None)
+    for _ in range(10):
+        game.tick(1 / 60)
+
+
+def test_docstring_only_bodies(tmp_path: Path) -> None:
+    paths = write_modules(tmp_path, main='''\
+"""Module."""
+class C:
+    """Class."""
+def f():
+    """Function."""
+    assert False
+''')
+    source = bundle("main", paths)
+    assert "Module." not in source
+    assert "Class." not in source
+    assert "assert" not in source
+    assert source.count("pass") == 2
+    compile(source, "main.py", "exec")
+
+
+def test_aliases_and_main_checks(tmp_path: Path) -> None:
+    paths = write_modules(
+        tmp_path,
+        lib='X = 1\nif __name__ == "__main__":\n    print("lib")\n',
+        main='from lib import X as Y\nif __name__ == "__main__":\n    main()\n',
+    )
+    source = bundle("main", paths)
+    assert "from lib import" not in source
+    assert "Y = X" in source
+    assert "X = const(1)" in source
+    assert "print" not in source
+    assert "main()" in source
+
+
+def test_reassigned_constants(tmp_path: Path) -> None:
+    paths = write_modules(tmp_path, main="""\
+A = 1
+B = 2
+B = 3
+C = 4
+D = True
+def f():
+    global C
+    C = 5
+""")
+    source = bundle("main", paths)
+    assert "A = const(1)" in source
+    assert "B = 2" in source
+    assert "C = 4" in source
+    assert "D = True" in source
+
+
+def test_same_import_twice(tmp_path: Path) -> None:
+    paths = write_modules(
+        tmp_path,
+        lib="import random\nfrom math import pi\n",
+        main="import random\nfrom math import pi\nfrom lib import *\n",
+    )
+    bundle("main", paths)
+
+
+@pytest.mark.parametrize(
+    "main_source,message", (
+        ("X = 2\nfrom lib import *\n", "X is defined in both lib and main"),
+        ("from cmath import pi\nfrom lib import *\n",
+         "pi is defined in both lib and main"),
+        ("import lib\n", "use 'from lib import ...' instead of 'import lib'"),
+        ("def f():\n    from lib import X\n",
+         "imports of lib must be at module level"),
+        ("from . import lib\n", "relative imports aren't supported"),
+        ("from nowhere import *\nfrom main import *\n",
+         "circular import of main from main"),
+    ))
+def test_errors(tmp_path: Path, main_source: str, message: str) -> None:
+    paths = write_modules(
+        tmp_path,
+        lib="X = 1\nfrom math import pi\n",
+        main=main_source,
+    )
+    with pytest.raises(BundleError) as e:
+        bundle("main", paths)
+    assert str(e.value) == message
+
+
+def test_missing_module(tmp_path: Path) -> None:
+    with pytest.raises(BundleError) as e:
+        bundle("main", [str(tmp_path)])
+    assert str(e.value) == "no module named main"
+
+
+def test_build(tmp_path: Path) -> None:
+    report = build("pong", str(tmp_path))
+    assert report.modules == ("engine", "pong")
+    assert (tmp_path / "pong.py").stat().st_size == report.bundle_bytes
+    assert report.bundle_bytes < report.source_bytes
+    assert report.source_compile_ns > 0
+    assert report.bundle_compile_ns > 0
+    assert report.mpy_bytes is None
+
+
+@pytest.mark.skipif(not shutil.which("mpy-cross"),
+                    reason="mpy-cross not installed")
+def test_build_mpy(tmp_path: Path) -> None:
+    report = build("pong", str(tmp_path), mpy_cross=shutil.which("mpy-cross"))
+    assert report.mpy_bytes == (tmp_path / "pong.mpy").stat().st_size
+    assert report.mpy_bytes < report.bundle_bytes
+
+
+def test_build_mpy_fails(tmp_path: Path) -> None:
+    with pytest.raises(BundleError) as e:
+        build("pong", str(tmp_path), mpy_cross="false")
+    assert str(e.value).startswith("false failed")
+
+
+def test_main(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["-o", str(tmp_path), "--no-mpy"]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith(f"bundled engine, pong into {tmp_path}\n")
+    assert "unbundled (2 modules)" in out
+    assert "precompiled" not in out
+    assert (tmp_path / "pong.py").exists()
+
+
+def test_main_error(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["nonesuch", "--no-mpy"]) == 1
+    assert capsys.readouterr().err == "error: no module named nonesuch\n"
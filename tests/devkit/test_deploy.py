@@ -0,0 +1,154 @@
+import json
+import shutil
+import subprocess
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from devkit import deploy as module
+from devkit.deploy import (
+    MANIFEST,
+    DeployError,
+    DirectoryTransport,
+    MpremoteTransport,
+    deploy,
+    main,
+    open_transport,
+    target_modules,
+)
+
+
+@pytest.fixture
+def sources(tmp_path: Path) -> list[str]:
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    for name, text in (("engine.py", "X = 1\n"),
+                       ("pong.py", "from engine import X\n"),
+                       ("assets.py", "BALL = b'\\x01'\n")):
+        (source_dir / name).write_text(text)
+    return sorted(str(path) for path in source_dir.iterdir())
+
+
+@pytest.fixture
+def board(tmp_path: Path) -> DirectoryTransport:
+    return DirectoryTransport(str(tmp_path / "board"))
+
+
+def test_incremental(sources: list[str], board: DirectoryTransport) -> None:
+    report = deploy(board, sources)
+    assert report.sent == ["assets.py", "engine.py", "pong.py"]
+    assert report.bytes_sent == sum(Path(p).stat().st_size for p in sources)
+    assert board.read("pong.py") == b"from engine import X\n"
+    manifest = json.loads(board.read(MANIFEST) or b"")
+    assert sorted(manifest["files"]) == report.sent
+
+    report = deploy(board, sources)
+    assert report.sent == []
+    assert report.unchanged == ["assets.py", "engine.py", "pong.py"]
+
+    Path(sources[1]).write_text("X = 2\n")
+    report = deploy(board, sources)
+    assert report.sent == ["engine.py"]
+    assert board.read("engine.py") == b"X = 2\n"
+
+    report = deploy(board, sources[1:])
+    assert report.sent == []
+    assert report.removed == ["assets.py"]
+    assert board.read("assets.py") is None
+
+    report = deploy(board, sources[1:], force=True)
+    assert report.sent == ["engine.py", "pong.py"]
+
+
+def test_bad_manifest(sources: list[str], board: DirectoryTransport) -> None:
+    for manifest in (b"not json", b"[]", b'{"format": 99, "files": {}}'):
+        board.write(MANIFEST, manifest)
+        assert len(deploy(board, sources).sent) == 3
+
+
+def test_name_clash(sources: list[str], board: DirectoryTransport) -> None:
+    with pytest.raises(DeployError) as e:
+        deploy(board, sources + sources[:1])
+    assert str(e.value).endswith("there's already a file named assets.py")
+
+
+@pytest.mark.skipif(not shutil.which("mpy-cross"),
+                    reason="mpy-cross not installed")
+def test_precompiled(sources: list[str], board: DirectoryTransport) -> None:
+    deploy(board, sources)
+    report = deploy(board, sources, mpy_cross=shutil.which("mpy-cross"))
+    assert report.sent == ["assets.mpy", "engine.mpy", "pong.mpy"]
+    assert report.removed == ["assets.py", "engine.py", "pong.py"]
+    assert (board.read("engine.mpy") or b"").startswith(b"M")
+
+
+def test_precompile_fails(sources: list[str], board: DirectoryTransport) -> None:
+    with pytest.raises(DeployError):
+        deploy(board, sources, mpy_cross="false")
+
+
+def test_target_modules() -> None:
+    names = [Path(path).name for path in target_modules()]
+    assert "engine.py" in names
+    assert "pong.py" in names
+
+
+def test_open_transport(tmp_path: Path) -> None:
+    transport = open_transport(str(tmp_path))
+    assert isinstance(transport, DirectoryTransport)
+    transport = open_transport("mpremote")
+    assert isinstance(transport, MpremoteTransport)
+    assert transport.command == ["mpremote"]
+    transport = open_transport("mpremote:a0")
+    assert isinstance(transport, MpremoteTransport)
+    assert transport.command == ["mpremote", "connect", "a0"]
+
+
+def test_mpremote(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+    copied = []
+
+    def run(args: list[str], **kwargs: Any) -> "subprocess.CompletedProcess[bytes]":
+        calls.append(args)
+        if args[-3] == "cp":
+            copied.append(Path(args[-2]).read_bytes())
+        missing = args[-1] == ":missing.py"
+        return subprocess.CompletedProcess(
+            args, int(missing), b"" if missing else b"X = 1\n", b"")
+
+    monkeypatch.setattr(module.subprocess, "run", run)
+    transport = MpremoteTransport("a0")
+    assert transport.read("engine.py") == b"X = 1\n"
+    assert transport.read("missing.py") is None
+    transport.write("engine.py", b"X = 2\n")
+    transport.remove("engine.py")
+    assert [call[:5] for call in calls] == [
+        ["mpremote", "connect", "a0", "fs", "cat"],
+        ["mpremote", "connect", "a0", "fs", "cat"],
+        ["mpremote", "connect", "a0", "fs", "cp"],
+        ["mpremote", "connect", "a0", "fs", "rm"],
+    ]
+    assert calls[2][-1] == ":engine.py"
+    assert copied == [b"X = 2\n"]
+
+    monkeypatch.undo()
+    transport = MpremoteTransport(mpremote="nonesuch-mpremote")
+    with pytest.raises(DeployError) as e:
+        transport.read("engine.py")
+    assert str(e.value) == "nonesuch-mpremote not found"
+
+
+def test_main(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    board = tmp_path / "board"
+    assert main([str(board), "--no-mpy"]) == 0
+    out = capsys.readouterr().out
+    assert "sent engine.py\n" in out
+    assert main([str(board), "--no-mpy"]) == 0
+    assert capsys.readouterr().out.startswith("0 sent (0 bytes), ")
+
+
+def test_main_error(capsys: pytest.CaptureFixture[str], tmp_path: Path) -> None:
+    assert main([str(tmp_path), "--mpy-cross", "false"]) == 1
+    assert capsys.readouterr().err.startswith("error: false failed")
@@ -0,0 +1,49 @@
+import sys
+
+from typing import Any
+
+import pytest
+
+from devkit.instrument import Tick, shorten, wrap_tick
+
+
+class Ticker:
+    def __init__(self) -> None:
+        self.ticks: list[float] = []
+
+    def tick(self, delta_t: float) -> None:
+        self.ticks.append(delta_t)
+
+
+class Subticker(Ticker):
+    pass
+
+
+@pytest.mark.parametrize("cls", (Ticker, Subticker))
+def test_wrap_tick(cls: type[Ticker]) -> None:
+    wrapped, other = cls(), cls()
+    calls = []
+
+    def wrapper(tick: Tick, instance: Any, delta_t: float) -> None:
+        calls.append(delta_t)
+        tick(instance, delta_t * 2)
+
+    unwrap = wrap_tick(wrapped, wrapper)
+    wrapped.tick(1)
+    other.tick(2)
+    assert calls == [1]
+    assert wrapped.ticks == [2]
+    assert other.ticks == [2]
+
+    unwrap()
+    assert ("tick" in cls.__dict__) == (cls is Ticker)
+    wrapped.tick(3)
+    assert calls == [1]
+    assert wrapped.ticks == [2, 3]
+
+
+def test_shorten(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sys, "path", ["", "/src", "/src/lib"])
+    assert shorten("/src/lib/module.py") == "module.py"
+    assert shorten("/src/main.py") == "main.py"
+    assert shorten("/elsewhere/main.py") == "/elsewhere/main.py"
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from devkit import backends, pong
+from devkit.headless import PicoScroll
+from devkit.pong import main
+
+
+class Quitter(PicoScroll):
+    """Quits after a few frames' worth of button checks."""
+    def __init__(self) -> None:
+        super().__init__()
+        self._checks = 0
+
+    def is_pressed(self, button: int) -> bool:
+        self._checks += 1
+        if self._checks == 4 * 30:
+            raise SystemExit
+        return super().is_pressed(button)
+
+
+@pytest.fixture(autouse=True)
+def quitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(backends, "BACKENDS", dict(backends.BACKENDS))
+    monkeypatch.setattr(backends, "_selected", None)
+    backends.register("quitter", Quitter)
+    backends.select("quitter")
+
+
+def test_play() -> None:
+    with pytest.raises(SystemExit):
+        main([])
+
+
+def test_profile(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    output = tmp_path / "pong.collapsed"
+    with pytest.raises(SystemExit):
+        main(["--profile=5", "--profile-output", str(output)])
+    out = capsys.readouterr().out
+    assert out.startswith("profiled ")
+    assert out.endswith(f"wrote {output}\n")
+    assert output.read_text().startswith("tick (target/pong.py:")
+
+
+def test_bad_profile(capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit) as e:
+        main(["--profile=0"])
+    assert e.value.code == 2
+    assert "N must be at least 1" in capsys.readouterr().err
+
+
+def test_reload(monkeypatch: pytest.MonkeyPatch) -> None:
+    providers = []
+
+    class HotReloader:
+        def __init__(self, provider: PicoScroll) -> None:
+            providers.append(provider)
+
+        def run(self) -> None:
+            pass
+
+    monkeypatch.setattr(pong, "HotReloader", HotReloader)
+    main(["--reload"])
+    assert [type(provider) for provider in providers] == [Quitter]
+
+
+def test_reload_or_profile(capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit):
+        main(["--reload", "--profile"])
+    assert "not allowed with" in capsys.readouterr().err
@@ -0,0 +1,95 @@
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from target.engine import PicoScroll
+from target.pong import Game
+
+from devkit.headless import PicoScroll as HeadlessPicoScroll
+from devkit.profiler import SamplingProfiler, collapsed_stacks, label
+from devkit.sim.farm import insert_coin
+
+
+def game() -> Game:
+    return Game(PicoScroll(HeadlessPicoScroll()), max_framerate=None)
+
+
+def test_samples_every_nth_tick() -> None:
+    profiled, other = game(), game()
+    tick = Game.tick
+    with SamplingProfiler(profiled, every=3) as profiler:
+        assert Game.tick is not tick
+        for _ in range(10):
+            profiled.tick(1 / 60)
+            other.tick(1 / 60)
+    assert Game.tick is tick
+    assert profiler.ticks == 10
+    assert profiler.sampled_ticks == 4  # 0, 3, 6 and 9
+
+    stats = profiler.stats()
+    (game_tick,) = [func for func in stats if func[2] == "tick"]
+    assert stats[game_tick][1] == 4  # calls
+    assert not any("_lsprof" in func[2] for func in stats)
+
+
+def test_inherited_tick_is_restored() -> None:
+    class Subclass(Game):
+        __slots__ = ()
+
+    ticker = Subclass(PicoScroll(HeadlessPicoScroll()), max_framerate=None)
+    with SamplingProfiler(ticker):
+        assert "tick" in Subclass.__dict__
+        ticker.tick(1 / 60)
+    assert "tick" not in Subclass.__dict__
+
+
+def test_every() -> None:
+    with pytest.raises(ValueError):
+        SamplingProfiler(game(), every=0)
+
+
+def test_write_collapsed(tmp_path: Path) -> None:
+    scroll = HeadlessPicoScroll()
+    ticker = Game(PicoScroll(scroll), max_framerate=None)
+    insert_coin(ticker, scroll, 1 / 60)
+    with SamplingProfiler(ticker, every=1) as profiler:
+        for _ in range(20):
+            ticker.tick(1 / 60)
+    path = tmp_path / "pong.collapsed"
+    profiler.write_collapsed(str(path))
+    lines = path.read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, us = line.rsplit(" ", 1)
+        assert stack.startswith("tick (target/pong.py:")
+        assert int(us) > 0
+    assert any(";_draw (target/pong.py:" in line for line in lines)
+
+    report = StringIO()
+    profiler.report(report)
+    assert report.getvalue().startswith("profiled 20 of 20 frames\n")
+
+
+def test_collapsed_stacks() -> None:
+    """Time is split between callers in proportion to their calls."""
+    main = ("main.py", 1, "main")
+    a = ("main.py", 10, "a")
+    b = ("main.py", 20, "b")
+    leaf = ("~", 0, "<built-in method leaf>")
+    stats = {
+        # func: (primitive calls, calls, self time, total time, callers)
+        main: (1, 1, 0.001, 0.010, {}),
+        a: (1, 1, 0.001, 0.003, {main: (1, 1, 0.001, 0.003)}),
+        b: (1, 1, 0.001, 0.006, {main: (1, 1, 0.001, 0.006)}),
+        leaf: (3, 3, 0.007, 0.007, {a: (1, 1, 0.002, 0.002),
+                                    b: (2, 2, 0.005, 0.005)}),
+    }
+    assert label(a) == "a (main.py:10)"
+    assert collapsed_stacks(stats) == {
+        "main (main.py:1)": 1000,
+        "main (main.py:1);a (main.py:10)": 1000,
+        "main (main.py:1);a (main.py:10);<built-in method leaf>": 2000,
+        "main (main.py:1);b (main.py:20)": 1000,
+        "main (main.py:1);b (main.py:20);<built-in method leaf>": 5000,
+    }
@@ -0,0 +1,159 @@
+import os
+import sys
+import threading
+
+from importlib import import_module
+from io import StringIO
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Any
+
+import pytest
+
+from devkit.headless import RecordingPicoScroll
+from devkit.reload import HotReloader, Watcher, purge
+
+GAME = """\
+from time import sleep
+
+LEVEL = {level}
+
+
+class Game:
+    def __init__(self, provider):
+        self.provider = provider
+
+    def tick(self, delta_t):
+        self.provider.set_pixel(0, 0, LEVEL)
+        self.provider.show()
+
+    def run(self):
+        while True:
+            self.tick(0.005)
+            sleep(0.005)
+"""
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def write(path: Path, text: str) -> None:
+    """Write `path`, making sure its modification time changes."""
+    mtime = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text)
+    if path.stat().st_mtime_ns <= mtime:
+        os.utime(path, ns=(mtime + 1000, mtime + 1000))
+
+
+@pytest.fixture
+def package(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A package, hot_reload_test, with a game module in it."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    package = tmp_path / "hot_reload_test"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    write(package / "game.py", GAME.format(level=1))
+    yield package
+    for name in list(sys.modules):
+        if name.startswith("hot_reload_test") or name == "game":
+            del sys.modules[name]
+
+
+def test_watcher(package: Path) -> None:
+    clock = Clock()
+    watcher = Watcher([str(package)], interval=0.5, clock=clock)
+    game = str(package / "game.py")
+    assert watcher.changed() == []
+
+    write(package / "game.py", GAME.format(level=2))
+    assert watcher.changed() == []  # too soon to check
+    clock.now = 0.5
+    assert watcher.changed() == [game]
+    clock.now = 1
+    assert watcher.changed() == []
+
+    (package / "notes.txt").write_text("not code")
+    write(package / "other.py", "")
+    (package / "game.py").unlink()
+    clock.now = 1.5
+    assert watcher.changed() == [game, str(package / "other.py")]
+
+
+def test_purge(package: Path) -> None:
+    (package.parent / "game.py").write_text(
+        "from hot_reload_test.game import *  # noqa\n")
+    shim = import_module("game")
+    module = import_module("hot_reload_test.game")
+    assert shim.LEVEL == module.LEVEL == 1
+
+    assert sorted(purge([str(package)])) == [
+        "game", "hot_reload_test", "hot_reload_test.game"]
+    assert "game" not in sys.modules
+    assert "devkit.reload" in sys.modules
+
+
+class Quitter(RecordingPicoScroll):
+    """Exits when told to, the next time it's shown."""
+    def __init__(self) -> None:
+        super().__init__(max_frames=1)
+        self.quit = False
+
+    def show(self) -> None:
+        if self.quit:
+            raise SystemExit
+        super().show()
+
+
+def test_hot_reload(package: Path) -> None:
+    provider = Quitter()
+    output = StringIO()
+    reloader = HotReloader(
+        provider,
+        lambda provider: import_module("hot_reload_test.game").Game(provider),
+        paths=[str(package)],
+        interval=0.02,
+        file=output,
+    )
+    exits = []
+
+    def run() -> None:
+        try:
+            reloader.run()
+        except SystemExit:
+            exits.append(True)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+
+    def wait_for(level: int) -> Any:
+        deadline = monotonic() + 5
+        while not provider.frames or provider.frames[-1][0] != level:
+            assert monotonic() < deadline, output.getvalue()
+            sleep(0.005)
+        return reloader.game
+
+    try:
+        first_game = wait_for(1)
+        write(package / "game.py", GAME.format(level=2))
+        assert wait_for(2) is not first_game
+
+        write(package / "game.py", "this isn't Python")
+        deadline = monotonic() + 5
+        while "SyntaxError" not in output.getvalue():
+            assert monotonic() < deadline
+            sleep(0.005)
+        write(package / "game.py", GAME.format(level=3))
+        wait_for(3)
+    finally:
+        provider.quit = True
+        thread.join()
+
+    assert exits == [True]
+    assert len(reloader.edit_latencies) == 2
+    assert max(reloader.edit_latencies) < 1
+    assert output.getvalue().count("reloading: game.py changed\n") == 3
@@ -0,0 +1,184 @@
+import os
+import socket
+import sys
+import termios
+import threading
+
+from argparse import Namespace
+from contextlib import ExitStack
+from io import BytesIO
+from time import monotonic, sleep
+from types import SimpleNamespace
+
+import pytest
+
+import micropython
+
+from devkit import backends
+from devkit.headless import RecordingPicoScroll
+from devkit.stream import _open_reader, _open_writer, main, parse_address
+
+from target import stream
+from target.engine import Display
+from target.stream import Decoder, Encoder, receive
+
+
+class Quitter(RecordingPicoScroll):
+    """Inserts a coin, then ends the game soon after."""
+    def __init__(self) -> None:
+        super().__init__()
+        self._checks = 0
+
+    def is_pressed(self, button: int) -> bool:
+        self._checks += 1
+        if self._checks == 120:
+            raise SystemExit
+        self.press(self.BUTTON_A, self._checks < 30)
+        return super().is_pressed(button)
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(backends, "BACKENDS", dict(backends.BACKENDS))
+    monkeypatch.setattr(backends, "_selected", None)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def test_parse_address() -> None:
+    assert parse_address("example.com:23") == ("example.com", 23)
+    assert parse_address(":23") == ("localhost", 23)
+
+
+def test_send(
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+) -> None:
+    local = Quitter()
+    backends.register("quitter", lambda: local)
+
+    drawn = []
+    show = Display.show
+
+    def recording_show(display: Display) -> None:
+        drawn.append(bytes(display._frame))
+        show(display)
+
+    monkeypatch.setattr(Display, "show", recording_show)
+
+    with socket.create_server(("localhost", 0)) as server:
+        port = server.getsockname()[1]
+        sender = threading.Thread(target=main, args=(
+            ["send", "--connect", f"localhost:{port}", "--backend", "quitter"],))
+        sender.start()
+        conn, _ = server.accept()
+        with conn:
+            received = RecordingPicoScroll()
+            receive(conn.recv_into, received)
+        sender.join()
+
+    assert len(drawn) > 10
+    changed = [b for a, b in zip([None] + drawn, drawn) if a != b]
+    assert list(local.frames) == changed  # unchanged frames aren't shown
+    assert received.frames == local.frames
+    assert capsys.readouterr().out.startswith(
+        f"sent {len(local.frames)} frames (1 keyframes) in ")
+
+
+def test_receive() -> None:
+    received = RecordingPicoScroll()
+    backends.register("recording", lambda: received)
+
+    address = f"localhost:{free_port()}"
+    receiver = threading.Thread(target=main, args=(
+        ["receive", "--listen", address, "--backend", "recording"],))
+    receiver.start()
+
+    deadline = monotonic() + 5
+    while True:
+        try:
+            conn = socket.create_connection(parse_address(address))
+            break
+        except ConnectionRefusedError:
+            assert monotonic() < deadline
+            sleep(0.01)
+    frames = [bytes(119), bytes(range(119)), bytes(range(1, 120))]
+    with conn:
+        encoder = Encoder(conn.sendall, 119)
+        for frame in frames:
+            encoder.send(frame)
+    receiver.join()
+
+    assert list(received.frames) == frames
+
+
+def test_device(tmp_path: pytest.TempPathFactory) -> None:
+    path = f"{tmp_path}/ttyACM0"
+    with open(path, "wb") as f:
+        Encoder(f.write, 119).send(bytes(range(119)))
+
+    received = RecordingPicoScroll()
+    backends.register("recording", lambda: received)
+    main(["receive", "--device", path, "--backend", "recording"])
+    assert list(received.frames) == [bytes(range(119))]
+
+    local = Quitter()
+    backends.register("quitter", lambda: local)
+    main(["send", "--device", path, "--backend", "quitter"])
+    with open(path, "rb") as f:
+        assert f.read(1) == b"K"
+
+
+def test_serial_devices_are_raw() -> None:
+    controller, device = os.openpty()
+    opts = Namespace(device=os.ttyname(device))
+    cooked = termios.tcgetattr(device)
+    frame = b"K" + bytes(range(119))  # with b"\x03", b"\n" and b"\r"
+    try:
+        with ExitStack() as stack:
+            readinto = _open_reader(opts, stack)
+            write = _open_writer(opts, stack)
+            iflag, oflag, _, lflag = termios.tcgetattr(device)[:4]
+            assert not iflag & termios.ICRNL
+            assert not oflag & termios.OPOST
+            assert not lflag & (termios.ICANON | termios.ISIG)
+
+            os.write(controller, frame)
+            decoder = Decoder(readinto, 119)
+            assert decoder.read_frame()
+            assert decoder.frame == frame[1:]
+
+            write(frame)
+            received = b""
+            while len(received) < len(frame):
+                received += os.read(controller, len(frame))
+            assert received == frame
+        assert termios.tcgetattr(device) == cooked
+    finally:
+        os.close(controller)
+        os.close(device)
+
+
+def test_device_sends(monkeypatch: pytest.MonkeyPatch) -> None:
+    local = Quitter()
+    backends.register("quitter", lambda: local)
+    backends.select("quitter")
+    stdout = BytesIO()
+    monkeypatch.setattr(sys, "stdout", SimpleNamespace(buffer=stdout))
+    kbd_intr: list[int] = []
+    monkeypatch.setattr(micropython, "kbd_intr", kbd_intr.append)
+
+    with pytest.raises(SystemExit):
+        stream.send("target.pong", keyframe_interval=1000)
+    assert kbd_intr == [-1]
+
+    stdout.seek(0)
+    received = RecordingPicoScroll()
+    receive(stdout.readinto, received)
+    assert len(received.frames) > 2
+    assert received.frames == local.frames
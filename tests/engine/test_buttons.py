@@ -0,0 +1,64 @@
+import copy
+
+import pytest
+
+from devkit.headless import PicoScroll as HeadlessPicoScroll
+
+from engine import PicoScroll
+
+
+@pytest.mark.parametrize("irq", (False, True))
+def test_buttons(irq: bool) -> None:
+    scroll = HeadlessPicoScroll()
+    buttons = PicoScroll(scroll, irq_buttons=irq).buttons
+    assert not buttons.any_pressed()
+
+    scroll.press(scroll.BUTTON_X)
+    assert buttons.X.is_pressed()
+    assert buttons.X.is_pressed()
+    assert not buttons.A.is_pressed()
+    assert buttons.any_pressed()
+
+    scroll.press(scroll.BUTTON_X, False)
+    assert not buttons.X.is_pressed()
+
+
+def test_irq_buttons_latch() -> None:
+    scroll = HeadlessPicoScroll()
+    buttons = PicoScroll(scroll, irq_buttons=True).buttons
+
+    # a press between two reads isn't missed, but is only seen once
+    scroll.press(scroll.BUTTON_B)
+    scroll.press(scroll.BUTTON_B, False)
+    assert buttons.B.is_pressed()
+    assert not buttons.B.is_pressed()
+
+
+def test_irq_buttons_dont_poll() -> None:
+    class Unpollable(HeadlessPicoScroll):
+        def is_pressed(self, button: int) -> bool:
+            raise AssertionError("polled")
+
+    scroll = Unpollable()
+    buttons = PicoScroll(scroll, irq_buttons=True).buttons
+    scroll.press(scroll.BUTTON_Y)
+    assert buttons.Y.is_pressed()
+    scroll.press(scroll.BUTTON_Y, False)
+
+
+def test_irq_buttons_need_an_unpolled_provider() -> None:
+    class Polled(HeadlessPicoScroll):
+        buttons_are_polled = True
+
+    with pytest.raises(ValueError):
+        PicoScroll(Polled(), irq_buttons=True)
+    PicoScroll(Polled())
+
+
+def test_copy() -> None:
+    scroll = HeadlessPicoScroll()
+    buttons = copy.copy(PicoScroll(scroll).buttons)
+    scroll.press(scroll.BUTTON_A)
+    assert buttons.A.is_pressed()
+    with pytest.raises(AttributeError):
+        buttons.Z
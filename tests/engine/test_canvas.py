@@ -0,0 +1,109 @@
+import pytest
+
+from devkit.headless import RecordingPicoScroll
+
+from engine import Display
+
+TICKER = b"\x7f\x08\x08\x7f\x00\x7f\x49\x41"  # "HE"
+
+
+@pytest.fixture
+def scroll() -> RecordingPicoScroll:
+    return RecordingPicoScroll()
+
+
+@pytest.fixture
+def display(scroll: RecordingPicoScroll) -> Display:
+    return Display(scroll)
+
+
+def rows(frame: bytes, width: int = 17) -> list[bytes]:
+    return [frame[i:i + width] for i in range(0, len(frame), width)]
+
+
+def test_size(display: Display) -> None:
+    canvas = display.canvas(40)
+    assert canvas.size == (40, 7)
+    assert display.canvas(17, 9).size == (17, 9)
+
+
+@pytest.mark.parametrize("size", ((16, 7), (17, 6)))
+def test_too_small(display: Display, size: tuple[int, int]) -> None:
+    with pytest.raises(ValueError) as e:
+        display.canvas(*size)
+    assert str(e.value) == f"{size[0]}x{size[1]} is smaller than the display"
+
+
+def test_scrolling(scroll: RecordingPicoScroll, display: Display) -> None:
+    canvas = display.canvas(40, 9)
+    for x in range(40):
+        canvas.set_pixel(x, 0, x)
+        canvas.set_pixel(x, 8, 255 - x)
+
+    canvas.show()
+    canvas.scroll_to(23, 2)
+    canvas.show()
+    canvas.scroll_by(-3, 0.5)
+    canvas.show()
+
+    frames = scroll.frames
+    top_left, bottom_right, bottom_middle = (rows(frame) for frame in frames)
+    assert top_left[0] == bytes(range(17))
+    assert top_left[1:] == [bytes(17)] * 6
+    assert bottom_right[-1] == bytes(range(255 - 23, 255 - 40, -1))
+    assert bottom_right[:-1] == [bytes(17)] * 6
+    assert (canvas.x, canvas.y) == (20, 2)  # y was truncated
+    assert bottom_middle[-1] == bytes(range(255 - 20, 255 - 37, -1))
+
+
+@pytest.mark.parametrize(
+    "args,position", (
+        ((-5,), (0, 0)),
+        ((30, -1), (23, 0)),
+        ((100, 100), (23, 2)),
+    ))
+def test_scroll_limits(display: Display,
+                       args: tuple[int, ...],
+                       position: tuple[int, int]) -> None:
+    canvas = display.canvas(40, 9)
+    canvas.scroll_to(*args)
+    assert (canvas.x, canvas.y) == position
+
+
+def test_gamma(scroll: RecordingPicoScroll, display: Display) -> None:
+    display.gamma = 2
+    canvas = display.canvas(20)
+    canvas.set_pixel(0, 0, 128)
+    canvas.show()
+    assert scroll.frames[-1][0] == 64
+
+
+def test_ticker(scroll: RecordingPicoScroll, display: Display) -> None:
+    canvas = display.canvas(17 + len(TICKER) + 17)
+    canvas.draw_bitmap_1d(TICKER, 255, 17)
+    canvas.draw_bitmap_1d(b"\x01", 255, -1)  # off the canvas
+    canvas.scroll_to(17)
+    canvas.show()
+    frame = rows(scroll.frames[-1])
+    assert frame[0][:8] == b"\xff\x00\x00\xff\x00\xff\xff\xff"
+    assert frame[3][:8] == b"\xff\xff\xff\xff\x00\xff\xff\x00"
+    assert frame[6][:8] == b"\xff\x00\x00\xff\x00\xff\xff\xff"
+    assert frame[0][8:] == bytes(9)
+
+    canvas.clear()
+    canvas.show()
+    assert scroll.frames[-1] == bytes(119)
+
+
+@pytest.mark.parametrize("y", (-1, -6, -7, 1, 6))
+def test_bitmap_partly_off_canvas(
+        scroll: RecordingPicoScroll, display: Display, y: int) -> None:
+    canvas = display.canvas(17)
+    canvas.draw_bitmap_1d(b"\x7f\x01\x40", 255, 0, y)
+    canvas.show()
+    frame = rows(scroll.frames[-1])
+    for row in range(7):
+        bit = row - y
+        expected = [0 <= bit < 7, bit == 0, bit == 6]
+        assert frame[row][:3] == bytes(255 if e else 0 for e in expected), row
+        assert frame[row][3:] == bytes(14)
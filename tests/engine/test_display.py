@@ -0,0 +1,116 @@
+from unittest.mock import Mock
+
+import pytest
+
+from devkit.headless import RecordingPicoScroll
+
+from engine import Display
+
+
+@pytest.fixture
+def scroll() -> RecordingPicoScroll:
+    return RecordingPicoScroll()
+
+
+@pytest.mark.parametrize("buffered", (False, True))
+def test_unchanged_frames_are_skipped(
+        scroll: RecordingPicoScroll, buffered: bool) -> None:
+    display = Display(scroll, buffered=buffered)
+    display.show()  # the first is always shown
+    display.show()
+    display.set_pixel(1, 0, 9)
+    display.show()
+    display.clear()
+    display.set_pixel(1, 0, 9)
+    display.show()
+    display.set_pixels(bytes(17 * 7))
+    display.show()
+    assert list(scroll.frames) == [
+        bytes(17 * 7),
+        b"\x00\x09" + bytes(17 * 7 - 2),
+        bytes(17 * 7),
+    ]
+    assert display.frames_shown == 5
+    assert display.frames_skipped == 2
+
+
+def test_gamma_is_applied_first(scroll: RecordingPicoScroll) -> None:
+    display = Display(scroll, gamma=3)
+    display.set_pixel(0, 0, 1)  # 0 after gamma correction
+    display.show()
+    display.set_pixel(0, 0, 2)  # still 0
+    display.show()
+    assert display.frames_skipped == 1
+
+
+@pytest.mark.parametrize("buffered", (False, True))
+def test_fractional_levels_are_rounded(
+        scroll: RecordingPicoScroll, buffered: bool) -> None:
+    """Levels are within half a lookup table step of computing the
+    curve per pixel, as was done before there was a table.
+    """
+    display = Display(scroll, gamma=3, buffered=buffered)
+    canvas = display.canvas(17)
+    for i in range(2551):
+        v = i / 10
+        expected = round(255 * ((v / 255) ** 3))
+        display.set_pixel(0, 0, v)
+        canvas.set_pixel(0, 0, v)
+        canvas.draw_bitmap_1d(b"\x01", v, 1)
+        levels = display._frame[0], canvas._pixels[0], canvas._pixels[1]
+        assert all(abs(level - expected) <= 2 for level in levels), v
+
+    display.set_pixel(0, 0, 254.9)
+    assert display._frame[0] == 255  # not 252, as truncating gave
+
+
+@pytest.mark.parametrize("buffered", (False, True))
+def test_set_pixels(scroll: RecordingPicoScroll, buffered: bool) -> None:
+    display = Display(scroll, gamma=3, buffered=buffered)
+    display.set_pixels(bytes([128, 255]) + bytes(17 * 7 - 2))
+    display.show()
+    assert scroll.frames[0][:3] == bytes([32, 255, 0])  # as set_pixel does
+
+    with pytest.raises(ValueError):
+        display.set_pixels(bytes(17 * 7 + 1))
+    with pytest.raises(ValueError):
+        display.set_pixels(bytes(17))
+    assert len(display._frame) == 17 * 7
+
+
+def test_buffered_drawing_skips_the_provider() -> None:
+    provider = Mock(spec=RecordingPicoScroll())
+    provider.get_width.return_value = 17
+    provider.get_height.return_value = 7
+    display = Display(provider, buffered=True)
+    display.clear()
+    display.set_pixel(16, 6, 255)
+    provider.clear.assert_not_called()
+    provider.set_pixel.assert_not_called()
+    display.show()
+    display.show()
+    provider.set_pixels.assert_called_once_with(bytes(17 * 7 - 1) + b"\xff")
+    provider.show.assert_called_once_with()
+
+
+class GammaPicoScroll(RecordingPicoScroll):
+    """Applies gamma correction itself, if it's asked to."""
+    def __init__(self, accept: bool) -> None:
+        super().__init__()
+        self.accept = accept
+        self.offered: list[float] = []
+
+    def negotiate_gamma(self, gamma: float) -> bool:
+        self.offered.append(gamma)
+        return self.accept
+
+
+@pytest.mark.parametrize("accept", (False, True))
+def test_negotiated_gamma(accept: bool) -> None:
+    scroll = GammaPicoScroll(accept)
+    display = Display(scroll, gamma=3)
+    display.gamma = 2
+    assert scroll.offered == [3, 2]
+    display.set_pixel(0, 0, 128)
+    display.show()
+    assert scroll.frames[0][0] == (128 if accept else 64)
@@ -32,3 +32,33 @@ def test_set_unlimited(framerate: Any) -> None:
     t = FrameTicker()
     t.max_framerate = framerate
     assert t.max_framerate is None
+
+
+class Ticks(Exception):
+    pass
+
+
+class CountingTicker(FrameTicker):
+    def __init__(self, ticks: int, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.ticks = ticks
+        self.deltas: list[float] = []
+
+    def tick(self, delta_t: float) -> None:
+        self.deltas.append(delta_t)
+        if len(self.deltas) == self.ticks:
+            raise Ticks
+
+
+def test_run_with_timer() -> None:
+    t = CountingTicker(20, max_framerate=200)
+    with pytest.raises(Ticks):
+        t.run_with_timer()
+    mean = sum(t.deltas[1:]) / len(t.deltas[1:])
+    assert mean == pytest.approx(1 / 200, rel=0.5)
+
+
+def test_run_with_timer_needs_a_rate() -> None:
+    t = CountingTicker(1, max_framerate=None)
+    with pytest.raises(ValueError):
+        t.run_with_timer()
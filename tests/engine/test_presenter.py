@@ -0,0 +1,83 @@
+import time
+
+from devkit.headless import RecordingPicoScroll
+
+from engine import Display, PicoScroll, Presenter
+
+
+class SlowPicoScroll(RecordingPicoScroll):
+    SHOW_SECONDS = 0.01
+
+    def show(self) -> None:
+        time.sleep(self.SHOW_SECONDS)
+        super().show()
+
+
+def test_frames_arrive() -> None:
+    scroll = RecordingPicoScroll()
+    presenter = Presenter(scroll)
+    display = Display(presenter)
+    display.set_pixel(0, 0, 255)
+    display.show()
+    presenter.close()
+    assert presenter.frames_shown == 1
+    assert presenter.frames_pushed == 1
+    assert list(scroll.frames) == [b"\xff" + bytes(17 * 7 - 1)]
+
+
+def test_clear() -> None:
+    scroll = RecordingPicoScroll()
+    presenter = Presenter(scroll)
+    presenter.set_pixels(b"\x01" * (17 * 7))
+    presenter.clear()
+    presenter.show()
+    presenter.close()
+    assert list(scroll.frames) == [bytes(17 * 7)]
+
+
+def test_show_leaves_main_loop() -> None:
+    """The provider's `show()` cost disappears from the main loop."""
+    def main_loop_seconds(display: Display) -> float:
+        start = time.perf_counter()
+        for i in range(20):
+            display.set_pixel(0, 0, i)
+            display.show()
+        return time.perf_counter() - start
+
+    direct = main_loop_seconds(Display(SlowPicoScroll()))
+    assert direct >= 20 * SlowPicoScroll.SHOW_SECONDS
+
+    scroll = SlowPicoScroll()
+    presenter = Presenter(scroll)
+    presented = main_loop_seconds(Display(presenter))
+    presenter.close()
+    assert presented < direct / 4
+    assert presenter.frames_shown == 20
+    assert 1 <= presenter.frames_pushed <= 20
+    assert scroll.frames[-1] == b"\x13" + bytes(17 * 7 - 1)
+
+
+def test_buttons_read_the_provider() -> None:
+    scroll = RecordingPicoScroll()
+    game = PicoScroll(scroll, presenter=True)
+    assert game.presenter is not None
+    assert not game.buttons.A.is_pressed()
+    scroll.press(scroll.BUTTON_A)
+    assert game.buttons.A.is_pressed()
+    game.presenter.close()
+
+
+class GammaPicoScroll(RecordingPicoScroll):
+    def negotiate_gamma(self, gamma: float) -> bool:
+        return gamma == 3
+
+
+def test_negotiate_gamma() -> None:
+    presenter = Presenter(RecordingPicoScroll())
+    assert not presenter.negotiate_gamma(3)
+    presenter.close()
+
+    presenter = Presenter(GammaPicoScroll())
+    assert presenter.negotiate_gamma(3)
+    assert not presenter.negotiate_gamma(2)
+    presenter.close()
@@ -75,3 +75,15 @@ def test_no_unnecessary_sleeping(sleep_us: Mock):
     sleep(1e-3)
     c.wait_us()
     sleep_us.assert_not_called()
+
+
+@patch("target.engine.ticks_us")
+@patch("target.engine.sleep_us")
+def test_sub_microsecond_interval(sleep_us: Mock, ticks_us: Mock):
+    c = RateLimiter(1e9)
+    assert c.min_interval_us == approx(0.001)
+
+    ticks_us.return_value = 100
+    c.wait_us()
+    c.wait_us()
+    sleep_us.assert_called_once_with(1)  # not unlimited
@@ -0,0 +1,84 @@
+import pytest
+
+from devkit.headless import RecordingPicoScroll
+
+from engine import Display, RLEBitmap
+
+# 1-bit, 7 rows, 9 columns: a wide "HE", packed as a literal, a run
+# of three 0x08s, and more literals
+TICKER = (b"\x00\x07\x09\x00"
+          b"\x00\x7f" b"\x80\x08" b"\x04\x7f\x00\x7f\x49\x41")
+TICKER_COLUMNS = b"\x7f\x08\x08\x08\x7f\x00\x7f\x49\x41"
+
+
+def unpacked(bitmap: RLEBitmap, offset: int, count: int) -> bytes:
+    out = bytearray(b"\xaa" * count * (bitmap.height if bitmap.grey else 1))
+    bitmap.decode(offset, out)
+    return bytes(out)
+
+
+def test_header() -> None:
+    bitmap = RLEBitmap(TICKER)
+    assert (bitmap.width, bitmap.height, bitmap.grey) == (9, 7, False)
+
+
+@pytest.mark.parametrize("offset", range(-9, 10))
+def test_decode(offset: int) -> None:
+    padded = bytes(9) + TICKER_COLUMNS + bytes(9)
+    expected = padded[offset + 9:offset + 9 + 5]
+    assert unpacked(RLEBitmap(TICKER), offset, 5) == expected
+
+
+def test_runs() -> None:
+    # 1-bit, 1 row, 300 columns, of 130 + 130 + 40 repeats
+    data = b"\x00\x01\x2c\x01" b"\xff\x01" b"\xff\x00" b"\xa5\x01"
+    bitmap = RLEBitmap(data)
+    assert len(bitmap._index_pos) == 10
+    assert unpacked(bitmap, 125, 10) == b"\x01" * 5 + b"\x00" * 5
+    assert unpacked(bitmap, 255, 10) == b"\x00" * 5 + b"\x01" * 5
+    assert unpacked(bitmap, 295, 10) == b"\x01" * 5 + b"\x00" * 5
+
+
+def test_greyscale() -> None:
+    # 2 rows, 3 columns: (1, 2), (0, 0), (0, 9)
+    bitmap = RLEBitmap(b"\x01\x02\x03\x00" b"\x01\x01\x02" b"\x80\x00" b"\x00\x09")
+    assert bitmap.grey
+    assert unpacked(bitmap, -1, 5) == b"\x00\x00\x01\x02\x00\x00\x00\x09\x00\x00"
+
+
+@pytest.mark.parametrize(
+    "data,message", (
+        (b"\x02\x07\x00\x00", "kind=2"),
+        (b"\x00\x07\x02\x00\x00\x01", "bad packets"),  # too short
+        (b"\x00\x07\x01\x00\x01\x01\x02", "bad packets"),  # too long
+        (b"\x00\x07\x01\x00\x00\x01\x00", "bad packets"),  # trailing data
+    ))
+def test_errors(data: bytes, message: str) -> None:
+    with pytest.raises(ValueError) as e:
+        RLEBitmap(data)
+    assert str(e.value) == message
+
+
+def test_draw() -> None:
+    scroll = RecordingPicoScroll()
+    display = Display(scroll)
+    display.set_pixel(16, 6, 7)
+    RLEBitmap(TICKER).draw(display, -11, 255)
+    display.show()
+    frame = scroll.frames[-1]
+    assert frame[:11] == bytes(11)
+    assert frame[11:17] == b"\xff\x00\x00\x00\xff\x00"
+    assert frame[17 * 3 + 11:17 * 4] == b"\xff\xff\xff\xff\xff\x00"
+    assert frame[-1] == 7  # blank pixels are left alone
+
+
+def test_draw_greyscale() -> None:
+    scroll = RecordingPicoScroll()
+    display = Display(scroll)
+    bitmap = RLEBitmap(b"\x01\x02\x03\x00" b"\x01\x01\x02" b"\x80\x00" b"\x00\x09")
+    bitmap.draw(display, 0)
+    display.show()
+    frame = scroll.frames[-1]
+    assert frame[:3] == b"\x01\x00\x00"
+    assert frame[17:20] == b"\x02\x00\x09"
+    assert frame[34:] == bytes(17 * 5)
@@ -0,0 +1,118 @@
+from collections.abc import Callable
+
+import pytest
+
+from pytest import approx
+
+from engine import Scheduler
+from target import engine
+
+
+class Clock:
+    def __init__(self, now: int = 0):
+        self.now = now
+        self.sleeps: list[int] = []
+
+    def ticks_us(self) -> int:
+        return self.now
+
+    def sleep_us(self, us: int) -> None:
+        self.sleeps.append(us)
+        self.now += us
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock(now=123)
+    monkeypatch.setattr(engine, "ticks_us", clock.ticks_us)
+    monkeypatch.setattr(engine, "sleep_us", clock.sleep_us)
+    return clock
+
+
+def recorder(clock: Clock, name: str,
+             log: list[tuple[int, str, float]]) -> Callable[[float], None]:
+    def task(delta_t: float) -> None:
+        log.append((clock.now - 123, name, delta_t))
+    return task
+
+
+def test_rates(clock: Clock) -> None:
+    log: list[tuple[int, str, float]] = []
+    s = Scheduler()
+    s.add(recorder(clock, "fast", log), 250)
+    s.add(recorder(clock, "slow", log), 100)
+
+    for _ in range(8):
+        clock.sleep_us(s.run_pending())
+    assert clock.sleeps == [4000, 4000, 2000, 2000, 4000, 4000, 4000, 4000]
+    assert log == [
+        (0, "fast", 0),
+        (0, "slow", 0),
+        (4000, "fast", approx(0.004)),
+        (8000, "fast", approx(0.004)),
+        (10000, "slow", approx(0.01)),
+        (12000, "fast", approx(0.004)),
+        (16000, "fast", approx(0.004)),
+        (20000, "fast", approx(0.004)),  # added first, so runs first
+        (20000, "slow", approx(0.01)),
+        (24000, "fast", approx(0.004)),
+    ]
+
+
+def test_falling_behind(clock: Clock) -> None:
+    log: list[tuple[int, str, float]] = []
+    s = Scheduler()
+    s.add(recorder(clock, "task", log), 1000)
+    s.run_pending()
+    clock.now += 1500  # late, but not a whole interval
+    assert s.run_pending() == 500
+    clock.now += 5200  # missed some
+    assert s.run_pending() == 1000
+    assert [entry[0] for entry in log] == [0, 1500, 6700]
+
+
+def test_remove(clock: Clock) -> None:
+    log: list[tuple[int, str, float]] = []
+    s = Scheduler()
+    tasks = [s.add(recorder(clock, str(i), log), rate)
+             for i, rate in enumerate((1, 2, 3, 4))]
+    assert len(s) == 4
+    s.remove(tasks[0])
+    s.remove(tasks[3])
+    assert len(s) == 2
+    with pytest.raises(ValueError) as e:
+        s.remove(tasks[0])
+    assert str(e.value) == "task not scheduled"
+    s.run_pending()
+    assert [entry[1] for entry in log] == ["1", "2"]
+
+
+def test_run(clock: Clock) -> None:
+    s = Scheduler()
+    calls = []
+
+    def once(delta_t: float) -> None:
+        calls.append(clock.now)
+        if len(calls) == 3:
+            s.remove(task)
+
+    task = s.add(once, 50)
+    s.run()
+    assert calls == [123, 20123, 40123]
+
+
+@pytest.mark.parametrize("rate", (None, 0, -1))
+def test_bad_rate(clock: Clock, rate: float) -> None:
+    with pytest.raises(ValueError) as e:
+        Scheduler().add(print, rate)
+    assert str(e.value) == f"rate={rate}"
+
+
+def test_rebase(clock: Clock) -> None:
+    s = Scheduler()
+    log: list[tuple[int, str, float]] = []
+    s.add(recorder(clock, "task", log), 1)
+    for _ in range(400):
+        clock.sleep_us(s.run_pending())
+    assert s._now < engine._REBASE_US
+    assert log[-1] == (399_000_000, "task", approx(1))
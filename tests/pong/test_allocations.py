@@ -0,0 +1,86 @@
+import gc
+import random
+import sys
+import tracemalloc
+
+import pytest
+
+from target import __path__ as target_path
+from target.engine import PicoScroll
+from target.pong import COUNTDOWN, INSERT_COIN, PLAYER_SCORED, RUNNING, Game
+
+from devkit.allocations import SUPPORTED, AllocationTracker
+from devkit.headless import PicoScroll as HeadlessPicoScroll
+from devkit.sim.bots import DOWN, UP, TrackingBot
+from devkit.sim.farm import PLAYER_BUTTONS, insert_coin
+
+pytestmark = pytest.mark.skipif(not SUPPORTED, reason="needs CPython 3.11")
+
+DELTA_T = 1 / 60
+
+TARGET_ONLY = [tracemalloc.Filter(True, f"{path}/*") for path in target_path]
+
+
+def game_in(state: object) -> tuple[Game, HeadlessPicoScroll]:
+    random.seed(3)
+    scroll = HeadlessPicoScroll()
+    game = Game(PicoScroll(scroll), max_framerate=None)
+    if state is not INSERT_COIN:
+        insert_coin(game, scroll, DELTA_T)
+    while game.state is not state:
+        game.tick(DELTA_T)
+    return game, scroll
+
+
+def play(game: Game, scroll: HeadlessPicoScroll, ticks: int) -> None:
+    bots = [TrackingBot(random.Random(0)) for _ in game.players]
+    for _ in range(ticks):
+        if game.state is RUNNING:
+            for bot, player, (up, down) in zip(
+                    bots, game.players, PLAYER_BUTTONS):
+                move = bot.move(player, game.ball)
+                scroll.press(up, move == UP)
+                scroll.press(down, move == DOWN)
+        game.tick(DELTA_T)
+
+
+def snapshot() -> tracemalloc.Snapshot:
+    gc.collect()  # also empties CPython's free lists
+    return tracemalloc.take_snapshot().filter_traces(TARGET_ONLY)
+
+
+@pytest.mark.parametrize(
+    "state,ticks", (
+        (INSERT_COIN, 300),
+        (COUNTDOWN, 60),  # lasts 2s
+        (RUNNING, 300),
+        (PLAYER_SCORED, 300),
+    ))
+def test_no_net_allocations(state: object, ticks: int) -> None:
+    # coverage's tracer allocates as it sees new lines
+    old_trace = sys.gettrace()
+    sys.settrace(None)
+    tracemalloc.start()
+    try:
+        game, scroll = game_in(state)
+        play(game, scroll, 30)  # warm up
+        before = snapshot()
+        play(game, scroll, ticks)
+        after = snapshot()
+    finally:
+        tracemalloc.stop()
+        sys.settrace(old_trace)
+    assert game.state is state  # no transitions
+
+    stats = after.compare_to(before, "lineno")
+    assert sum(stat.count_diff for stat in stats) <= 0, \
+        [stat for stat in stats if stat.count_diff]
+
+
+def test_running_allocations_per_tick() -> None:
+    game, scroll = game_in(RUNNING)
+    with AllocationTracker(game, floats=False) as tracker:
+        play(game, scroll, 100)
+    # what's left is mostly CPython's for-loop iterators, which
+    # MicroPython keeps on the stack
+    assert tracker.allocations_per_tick < 6
@@ -53,6 +53,32 @@ def test_bounce(start_pos, delta, expect_pos):
     assert (ball.x, ball.y) == pytest.approx(expect_pos)
 
 
+@pytest.mark.parametrize("seed", range(10))
+def test_predicted_matches_swept(seed):
+    """Skipping the sweep between predicted events changes nothing."""
+    random.seed(seed)
+    game = Game(NonCallableMock())
+    players = game.players
+    predicted = game.ball
+    swept = Ball()
+
+    for frame in range(600):
+        if frame % 120 == 0:
+            predicted.reset()
+            for attr in ("x", "y", "vx", "vy", "spin"):
+                setattr(swept, attr, getattr(predicted, attr))
+        for i, p in enumerate(players):
+            p.y = 3.5 + 2.5 * math.sin(frame / (17 + 6 * i))
+            p.vy = 0.1 * math.cos(frame / 11)
+
+        swept.invalidate()
+        swept.update(1 / 60, players)
+        predicted.update(1 / 60, players)
+
+        assert (predicted.x, predicted.y) == pytest.approx((swept.x, swept.y))
+        assert (predicted.vx, predicted.vy) == pytest.approx((swept.vx, swept.vy))
+
+
 @patch("target.engine._PicoScroll")
 def test_no_draw_offscreen(picoscroll_cls: Mock):
     pixels_set = 0
@@ -69,6 +95,8 @@ def test_no_draw_offscreen(picoscroll_cls: Mock):
         assert 0 <= v < 256
 
     picoscroll = NonCallableMock()
+    picoscroll.get_width.return_value = 17
+    picoscroll.get_height.return_value = 7
     picoscroll.set_pixel = _set_pixel
 
     picoscroll_cls.return_value = picoscroll
@@ -0,0 +1,76 @@
+import logging
+import sys
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from devkit.headless import PicoScroll as HeadlessPicoScroll
+
+from target.engine import (
+    IRQButton, PicoScroll, Presenter, RLEBitmap, Scheduler,
+)
+from target.pong import CountdownAnimation, Game, ScoreAnimation
+
+logger = logging.getLogger(__name__)
+
+
+def game() -> Game:
+    return Game(PicoScroll(HeadlessPicoScroll()))
+
+
+def presenter() -> Presenter:
+    presenter = Presenter(HeadlessPicoScroll())
+    presenter.close()
+    return presenter
+
+
+FACTORIES: dict[str, Callable[[], Any]] = {
+    "Game": game,
+    "RateLimiter": lambda: game()._limiter,
+    "Scheduler": Scheduler,
+    "Display": lambda: game().display,
+    "Canvas": lambda: game().display.canvas(40),
+    "RLEBitmap": lambda: RLEBitmap(b"\x00\x07\x00\x00"),
+    "Presenter": presenter,
+    "Buttons": lambda: game().buttons,
+    "Button": lambda: game().buttons.A,
+    "IRQButton": lambda: IRQButton(12),
+    "PicoScroll": lambda: PicoScroll(HeadlessPicoScroll()),
+    "Player": lambda: game().players[0],
+    "Ball": lambda: game().ball,
+    "CountdownAnimation": CountdownAnimation,
+    "ScoreAnimation": ScoreAnimation,
+}
+
+
+def instance_size(obj: Any) -> int:
+    """The bytes an instance takes, not counting what it refers to."""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def slot_count(cls: type) -> int:
+    return sum(len(getattr(c, "__slots__", ())) for c in cls.__mro__)
+
+
+@pytest.mark.parametrize("name", FACTORIES)
+def test_instance_size(name: str) -> None:
+    obj = FACTORIES[name]()
+    cls = type(obj)
+    assert cls.__name__ == name
+    size = instance_size(obj)
+    logger.info(f"{name}: {size} bytes per instance")
+    assert not hasattr(obj, "__dict__"), f"{name} has an instance dict"
+    # an object header, a GC header, and a pointer per slot
+    assert size <= sys.getsizeof(object()) + 16 + 8 * slot_count(cls)
+
+
+def test_buttons() -> None:
+    buttons = game().buttons
+    assert [buttons.A, buttons.B, buttons.X, buttons.Y] == list(buttons)
+    with pytest.raises(AttributeError):
+        buttons.Z
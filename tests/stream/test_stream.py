@@ -0,0 +1,143 @@
+import logging
+import random
+
+from io import BytesIO
+
+import pytest
+
+from target.engine import PicoScroll
+from target.pong import Game
+from target.stream import Decoder, Encoder, StreamingPicoScroll, receive
+
+from devkit.headless import RecordingPicoScroll
+from devkit.sim.bots import DOWN, UP, TrackingBot
+from devkit.sim.farm import PLAYER_BUTTONS, insert_coin
+
+logger = logging.getLogger(__name__)
+d = logger.info
+
+DELTA_T = 1 / 60
+
+
+def decode(data: bytes, num_pixels: int = 119) -> list[bytes]:
+    decoder = Decoder(BytesIO(data).readinto, num_pixels)
+    frames = []
+    while decoder.read_frame():
+        frames.append(bytes(decoder.frame))
+    return frames
+
+
+def test_roundtrip() -> None:
+    rng = random.Random(5)
+    frames = []
+    frame = bytearray(119)
+    for _ in range(50):
+        for _ in range(rng.choice((0, 1, 10, 58, 59, 119))):
+            frame[rng.randrange(119)] = rng.randrange(256)
+        frames.append(bytes(frame))
+
+    stream = BytesIO()
+    encoder = Encoder(stream.write, 119, keyframe_interval=20)
+    for frame in frames:
+        encoder.send(frame)
+    assert decode(stream.getvalue()) == frames
+    assert encoder.frames_sent == 50
+    assert encoder.bytes_sent == len(stream.getvalue())
+
+
+def test_encoding() -> None:
+    stream = BytesIO()
+    encoder = Encoder(stream.write, 4, keyframe_interval=3)
+    encoder.send(b"\x01\x02\x03\x04")  # first
+    encoder.send(b"\x01\x02\x03\x04")
+    encoder.send(b"\x01\x09\x03\x04")
+    encoder.send(b"\x01\x09\x03\x04")  # interval
+    encoder.send(b"\x01\x09\x03\x05")
+    encoder.send(b"\x02\x09\x03\x06")  # delta isn't smaller
+    assert stream.getvalue() == (
+        b"K\x01\x02\x03\x04"
+        b"D\x00"
+        b"D\x01\x01\x09"
+        b"K\x01\x09\x03\x04"
+        b"D\x01\x03\x05"
+        b"K\x02\x09\x03\x06")
+    assert encoder.keyframes_sent == 3
+
+
+def test_too_many_pixels() -> None:
+    with pytest.raises(ValueError):
+        Encoder(BytesIO().write, 257)
+
+
+def test_joining_late() -> None:
+    assert decode(b"D\x01\x00\x07K\x01\x02D\x01\x00\x03", 2) == [
+        b"\x01\x02", b"\x03\x02"]
+
+
+@pytest.mark.parametrize(
+    "data,exc_type,message", (
+        (b"K\x01", EOFError, "stream ended mid-frame"),
+        (b"D\x01\x00", EOFError, "stream ended mid-frame"),
+        (b"D\x02", ValueError, "bad delta size 2"),
+        (b"X", ValueError, "bad frame type 88"),
+    ))
+def test_errors(data: bytes, exc_type: type[Exception], message: str) -> None:
+    with pytest.raises(exc_type) as e:
+        decode(data, 2)
+    assert str(e.value) == message
+
+
+def test_provider() -> None:
+    stream = BytesIO()
+    local = RecordingPicoScroll()
+    scroll = StreamingPicoScroll(stream.write, local)
+    local.press(scroll.BUTTON_X)
+    assert scroll.is_pressed(scroll.BUTTON_X)
+    assert not StreamingPicoScroll(stream.write).is_pressed(scroll.BUTTON_X)
+
+    scroll.set_pixel(16, 6, 200)
+    scroll.show()
+    scroll.show_bitmap_1d(bytearray(b"\x7f\x01"), 100, -15)
+    scroll.show()
+    scroll.clear()
+    scroll.set_pixels(bytes(range(119)))
+    scroll.show()
+    assert decode(stream.getvalue()) == list(local.frames)
+    assert local.frames[1][15:17] == b"\x64\x64"  # the bitmap's first column
+    assert local.frames[1][-2:] == b"\x64\x00"
+
+
+def test_receive() -> None:
+    scroll = RecordingPicoScroll()
+    frames = [bytes(119), bytes(range(119))]
+    stream = BytesIO()
+    encoder = Encoder(stream.write, 119)
+    for frame in frames:
+        encoder.send(frame)
+    stream.seek(0)
+    receive(stream.readinto, scroll)
+    assert list(scroll.frames) == frames
+
+
+def test_pong_session() -> None:
+    random.seed(3)
+    stream = BytesIO()
+    local = RecordingPicoScroll()
+    scroll = StreamingPicoScroll(stream.write, local)
+    game = Game(PicoScroll(scroll), max_framerate=None)
+
+    insert_coin(game, local, DELTA_T)
+    bots = [TrackingBot(random.Random(0)) for _ in game.players]
+    for _ in range(60 * 60):
+        for bot, player, (up, down) in zip(bots, game.players, PLAYER_BUTTONS):
+            move = bot.move(player, game.ball)
+            local.press(up, move == UP)
+            local.press(down, move == DOWN)
+        game.tick(DELTA_T)
+
+    encoder = scroll.encoder
+    bytes_per_frame = encoder.bytes_sent / encoder.frames_sent
+    d(f"{encoder.frames_sent} frames, {encoder.keyframes_sent} keyframes,"
+      f" {encoder.bytes_sent} bytes, {bytes_per_frame:.1f} bytes per frame")
+    assert decode(stream.getvalue()) == list(local.frames)
+    assert bytes_per_frame < 24  # a keyframe is 120